@@ -0,0 +1,46 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+export async function POST(request: NextRequest) {
+    try {
+        const body = await request.json();
+
+        // PYTHON_API_URL is just the base (e.g., http://backend:8081), append /analyze/stream
+        const PYTHON_BASE_URL = process.env.PYTHON_API_URL || 'http://localhost:8080';
+        const ANALYZE_STREAM_URL = `${PYTHON_BASE_URL.replace(/\/analyze$/, '')}/analyze/stream`;
+
+        console.log(`Sending streaming analysis request to: ${ANALYZE_STREAM_URL}`);
+
+        const response = await fetch(ANALYZE_STREAM_URL, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(body),
+        });
+
+        if (!response.ok) {
+            throw new Error(`Analysis stream request failed: ${response.statusText}`);
+        }
+
+        // Forward the NDJSON event stream as-is
+        const stream = response.body;
+        if (!stream) {
+            throw new Error('No response body');
+        }
+
+        return new Response(stream, {
+            headers: {
+                'Content-Type': 'application/x-ndjson; charset=utf-8',
+                'Cache-Control': 'no-cache',
+                'Transfer-Encoding': 'chunked',
+            },
+        });
+
+    } catch (error) {
+        console.error('Analysis stream API error:', error);
+        return NextResponse.json(
+            { error: 'İlaç analizi sırasında bir hata oluştu' },
+            { status: 500 }
+        );
+    }
+}
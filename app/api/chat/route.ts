@@ -21,6 +21,11 @@ export async function POST(request: NextRequest) {
             body: JSON.stringify(body),
         });
 
+        // Expired session: pass the 404 through so the client re-sends its context
+        if (response.status === 404) {
+            return NextResponse.json(await response.json(), { status: 404 });
+        }
+
         if (!response.ok) {
             throw new Error(`Chat request failed: ${response.statusText}`);
         }
@@ -36,6 +41,7 @@ export async function POST(request: NextRequest) {
                 'Content-Type': 'text/plain; charset=utf-8',
                 'Cache-Control': 'no-cache',
                 'Transfer-Encoding': 'chunked',
+                'X-Chat-Session': response.headers.get('X-Chat-Session') || '',
             },
         });
 
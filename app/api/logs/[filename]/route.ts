@@ -1,30 +1,27 @@
 import { NextRequest, NextResponse } from 'next/server';
-import fs from 'fs';
-import path from 'path';
+
+// PYTHON_API_URL is just the base (e.g., http://backend:8081)
+const PYTHON_BASE_URL = (process.env.PYTHON_API_URL || 'http://localhost:8080').replace(/\/analyze$/, '');
 
 export async function GET(
     request: NextRequest,
     { params }: { params: Promise<{ filename: string }> }
 ) {
     try {
+        // The route segment carries the log_id
         const { filename } = await params;
-        const logsDir = path.join(process.cwd(), 'backend_logs');
-        const filePath = path.join(logsDir, filename);
-
-        // Security check - ensure file is within logs directory
-        if (!filePath.startsWith(logsDir)) {
-            return NextResponse.json({ error: 'Invalid file path' }, { status: 400 });
-        }
+        const response = await fetch(`${PYTHON_BASE_URL}/logs/${encodeURIComponent(filename)}`, {
+            cache: 'no-store',
+        });
 
-        // Check if file exists
-        if (!fs.existsSync(filePath)) {
+        if (response.status === 404) {
             return NextResponse.json({ error: 'Log file not found' }, { status: 404 });
         }
+        if (!response.ok) {
+            throw new Error(`Log request failed: ${response.statusText}`);
+        }
 
-        // Read and parse log file
-        const fileContent = fs.readFileSync(filePath, 'utf-8');
-        const logData = JSON.parse(fileContent);
-
+        const logData = await response.json();
         return NextResponse.json(logData);
     } catch (error) {
         console.error('Error reading log file:', error);
@@ -1,38 +1,24 @@
-import { NextResponse } from 'next/server';
-import fs from 'fs';
-import path from 'path';
+import { NextRequest, NextResponse } from 'next/server';
 
-export async function GET() {
+// PYTHON_API_URL is just the base (e.g., http://backend:8081)
+const PYTHON_BASE_URL = (process.env.PYTHON_API_URL || 'http://localhost:8080').replace(/\/analyze$/, '');
+
+export async function GET(request: NextRequest) {
     try {
-        const logsDir = path.join(process.cwd(), 'backend_logs');
+        // Filters and the pagination cursor are passed through to the backend log index
+        const query = request.nextUrl.searchParams.toString();
+        const response = await fetch(`${PYTHON_BASE_URL}/logs${query ? `?${query}` : ''}`, {
+            cache: 'no-store',
+        });
 
-        // Check if directory exists
-        if (!fs.existsSync(logsDir)) {
-            return NextResponse.json({ logs: [] });
+        if (!response.ok) {
+            throw new Error(`Logs request failed: ${response.statusText}`);
         }
 
-        // Read all JSON files
-        const files = fs.readdirSync(logsDir)
-            .filter(file => file.endsWith('.json') && file.includes('analyze'))
-            .sort((a, b) => b.localeCompare(a)); // Sort newest first
-
-        // Parse basic info from filenames
-        const logs = files.map(filename => {
-            const parts = filename.split('__');
-            const timestamp = parts[0].replace(/_/g, ':').replace(/-/g, '/');
-            const endpoint = parts[1] ? `/${parts[1].split('_')[0]}` : '/unknown';
-
-            return {
-                filename,
-                timestamp,
-                endpoint,
-                method: 'POST' // Analyze endpoints are POST
-            };
-        });
-
-        return NextResponse.json({ logs });
+        const data = await response.json();
+        return NextResponse.json(data);
     } catch (error) {
         console.error('Error reading logs:', error);
-        return NextResponse.json({ error: 'Failed to read logs', logs: [] }, { status: 500 });
+        return NextResponse.json({ error: 'Failed to read logs', logs: [], next_cursor: null }, { status: 500 });
     }
 }
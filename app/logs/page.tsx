@@ -4,12 +4,17 @@ import { useState, useEffect } from 'react';
 import { ChevronDown, ChevronUp, Clock, AlertCircle, CheckCircle, FileText, Activity, Database, Brain, Sparkles } from 'lucide-react';
 
 interface LogFile {
-    filename: string;
+    log_id: string;
     timestamp: string;
     endpoint: string;
     method: string;
+    status_code: number | null;
+    processing_time_ms: number | null;
+    is_error: boolean;
 }
 
+const PAGE_SIZE = 50;
+
 interface PipelineStep {
     step: number;
     name: string;
@@ -40,26 +45,40 @@ export default function LogsPage() {
     const [selectedLog, setSelectedLog] = useState<LogDetail | null>(null);
     const [expandedSteps, setExpandedSteps] = useState<Set<number>>(new Set());
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     useEffect(() => {
         fetchLogs();
     }, []);
 
-    const fetchLogs = async () => {
+    const fetchLogs = async (cursor?: string) => {
+        const params = new URLSearchParams({ endpoint_prefix: '/analyze', limit: String(PAGE_SIZE) });
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
         try {
-            const response = await fetch('/api/logs');
+            const response = await fetch(`/api/logs?${params}`);
             const data = await response.json();
-            setLogs(data.logs || []);
+            setLogs(prev => (cursor ? [...prev, ...(data.logs || [])] : data.logs || []));
+            setNextCursor(data.next_cursor || null);
         } catch (error) {
             console.error('Failed to fetch logs:', error);
         } finally {
             setLoading(false);
+            setLoadingMore(false);
         }
     };
 
-    const fetchLogDetail = async (filename: string) => {
+    const loadMore = () => {
+        if (!nextCursor || loadingMore) return;
+        setLoadingMore(true);
+        fetchLogs(nextCursor);
+    };
+
+    const fetchLogDetail = async (logId: string) => {
         try {
-            const response = await fetch(`/api/logs/${filename}`);
+            const response = await fetch(`/api/logs/${logId}`);
             const data = await response.json();
             setSelectedLog(data);
             setExpandedSteps(new Set([0, 1, 2, 3])); // Expand all steps by default
@@ -85,9 +104,9 @@ export default function LogsPage() {
             case 1:
                 return <Activity className="w-5 h-5 text-green-500" />;
             case 2:
-                return <Brain className="w-5 h-5 text-purple-500" />;
-            case 3:
                 return <Sparkles className="w-5 h-5 text-yellow-500" />;
+            case 3:
+                return <Brain className="w-5 h-5 text-purple-500" />;
             default:
                 return <FileText className="w-5 h-5 text-gray-500" />;
         }
@@ -121,14 +140,14 @@ export default function LogsPage() {
                     {/* Log List */}
                     <div className="lg:col-span-1 bg-white dark:bg-gray-800 rounded-lg shadow-lg p-6">
                         <h2 className="text-xl font-semibold mb-4 text-gray-900 dark:text-white">
-                            Log Dosyaları ({logs.length})
+                            Loglar ({logs.length}{nextCursor ? '+' : ''})
                         </h2>
                         <div className="space-y-2 max-h-[calc(100vh-250px)] overflow-y-auto">
                             {logs.map((log) => (
                                 <button
-                                    key={log.filename}
-                                    onClick={() => fetchLogDetail(log.filename)}
-                                    className={`w-full text-left p-4 rounded-lg transition-all ${selectedLog?.log_id === log.filename.split('__')[1]?.split('.')[0]
+                                    key={log.log_id}
+                                    onClick={() => fetchLogDetail(log.log_id)}
+                                    className={`w-full text-left p-4 rounded-lg transition-all ${selectedLog?.log_id === log.log_id
                                         ? 'bg-blue-50 dark:bg-blue-900/30 border-2 border-blue-500'
                                         : 'bg-gray-50 dark:bg-gray-700 hover:bg-gray-100 dark:hover:bg-gray-600'
                                         }`}
@@ -148,12 +167,32 @@ export default function LogsPage() {
                                             </div>
                                             <div className="flex items-center gap-1 text-xs text-gray-500 dark:text-gray-400">
                                                 <Clock className="w-3 h-3" />
-                                                {log.timestamp}
+                                                {new Date(log.timestamp).toLocaleString('tr-TR')}
+                                                {log.processing_time_ms !== null && (
+                                                    <span className="ml-2">{log.processing_time_ms.toFixed(0)} ms</span>
+                                                )}
                                             </div>
                                         </div>
+                                        {log.status_code !== null && (
+                                            <span className={`text-xs font-semibold ${log.status_code < 400
+                                                ? 'text-green-600 dark:text-green-400'
+                                                : 'text-red-600 dark:text-red-400'
+                                                }`}>
+                                                {log.status_code}
+                                            </span>
+                                        )}
                                     </div>
                                 </button>
                             ))}
+                            {nextCursor && (
+                                <button
+                                    onClick={loadMore}
+                                    disabled={loadingMore}
+                                    className="w-full p-3 rounded-lg text-sm font-medium text-blue-600 dark:text-blue-400 bg-gray-50 dark:bg-gray-700 hover:bg-gray-100 dark:hover:bg-gray-600 disabled:opacity-50"
+                                >
+                                    {loadingMore ? 'Yükleniyor...' : 'Daha fazla yükle'}
+                                </button>
+                            )}
                             {logs.length === 0 && (
                                 <div className="text-center py-8 text-gray-500 dark:text-gray-400">
                                     Henüz log bulunmuyor
@@ -1,11 +1,10 @@
 """
-Configuration and client initialization.
-Loads environment variables and creates the LLM client.
+Configuration.
+Loads environment variables and defines the settings shared by the backend.
 """
 
 import os
 from pathlib import Path
-from openai import OpenAI
 
 
 def load_env():
@@ -26,12 +25,112 @@ load_env()
 FAL_KEY = os.getenv("FAL_KEY")
 OPENFDA_BASE_URL = "https://api.fda.gov/drug/label.json"
 LLM_MODEL = "anthropic/claude-sonnet-4.6"
+LLM_BASE_URL = "https://fal.run/openrouter/router/openai/v1"
 
-# FAL AI client (OpenRouter proxy, OpenAI-compatible)
-llm_client = OpenAI(
-    base_url="https://fal.run/openrouter/router/openai/v1",
-    api_key="not-needed",
-    default_headers={
-        "Authorization": f"Key {FAL_KEY}",
-    },
-)
+# OpenFDA connection pool & fan-out
+OPENFDA_TIMEOUT_SECONDS = float(os.getenv("OPENFDA_TIMEOUT_SECONDS", "30"))
+OPENFDA_MAX_CONCURRENCY = int(os.getenv("OPENFDA_MAX_CONCURRENCY", "8"))
+OPENFDA_MAX_CONNECTIONS = int(os.getenv("OPENFDA_MAX_CONNECTIONS", "20"))
+
+# Batched lookups — uncached names per OR-ed OpenFDA query, and that query's result limit
+OPENFDA_BATCH_SIZE = int(os.getenv("OPENFDA_BATCH_SIZE", "10"))
+OPENFDA_BATCH_LIMIT = int(os.getenv("OPENFDA_BATCH_LIMIT", "100"))
+
+# OpenFDA label cache (in-memory, LRU + TTL)
+FDA_CACHE_MAX_ENTRIES = int(os.getenv("FDA_CACHE_MAX_ENTRIES", "1000"))
+FDA_CACHE_TTL_SECONDS = float(os.getenv("FDA_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+# Negative cache for OpenFDA misses — not-found names vs. 429/5xx/transport failures
+FDA_NEGATIVE_CACHE_TTL_SECONDS = float(os.getenv("FDA_NEGATIVE_CACHE_TTL_SECONDS", "600"))
+FDA_ERROR_CACHE_TTL_SECONDS = float(os.getenv("FDA_ERROR_CACHE_TTL_SECONDS", "30"))
+
+# Optional persistent label cache (SQLite) shared across restarts and workers — disabled when unset
+FDA_PERSISTENT_CACHE_DIR = os.getenv("FDA_PERSISTENT_CACHE_DIR")
+FDA_PERSISTENT_CACHE_TTL_SECONDS = float(os.getenv("FDA_PERSISTENT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Offline label index built by `python -m backend.ingest_labels` — OPENFDA_OFFLINE disables network fallback
+OPENFDA_SNAPSHOT_PATH = os.getenv("OPENFDA_SNAPSHOT_PATH")
+OPENFDA_OFFLINE = os.getenv("OPENFDA_OFFLINE", "false").lower() in ("1", "true", "yes")
+
+# Analysis result cache — identical regimens (same labels) skip the LLM stage
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "500"))
+ANALYSIS_CACHE_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "3600"))
+
+# /analyze/batch — per-patient evaluations running at once
+ANALYSIS_BATCH_CONCURRENCY = int(os.getenv("ANALYSIS_BATCH_CONCURRENCY", "4"))
+
+# Analysis job queue — SQLite job store, worker pool size, queue bound, finished-job retention,
+# and the lease a worker holds on a running job (renewed while it runs, re-queued once it lapses)
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "backend_jobs/jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "200"))
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", "86400"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+
+# Request logs — "files" writes one JSON file per request; "buffered" queues entries for a
+# background writer producing rotating JSONL segments (optionally gzip-compressed)
+LOG_MODE = os.getenv("LOG_MODE", "files")
+LOG_QUEUE_MAX = int(os.getenv("LOG_QUEUE_MAX", "10000"))
+LOG_DROP_POLICY = os.getenv("LOG_DROP_POLICY", "drop_new")  # drop_new | drop_oldest | block
+LOG_SEGMENT_MAX_BYTES = int(os.getenv("LOG_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024)))
+LOG_SEGMENT_MAX_SECONDS = float(os.getenv("LOG_SEGMENT_MAX_SECONDS", "3600"))
+LOG_FLUSH_INTERVAL_SECONDS = float(os.getenv("LOG_FLUSH_INTERVAL_SECONDS", "1.0"))
+LOG_COMPRESS = os.getenv("LOG_COMPRESS", "false").lower() in ("1", "true", "yes")
+LOG_INDEX_ENABLED = os.getenv("LOG_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Anamnesis document parsing — worker processes, per-document timeout, PDF pages per parallel task
+DOC_PARSE_WORKERS = int(os.getenv("DOC_PARSE_WORKERS", "2"))
+DOC_PARSE_TIMEOUT_SECONDS = float(os.getenv("DOC_PARSE_TIMEOUT_SECONDS", "30"))
+DOC_PARSE_PAGES_PER_TASK = int(os.getenv("DOC_PARSE_PAGES_PER_TASK", "20"))
+
+# Anamnesis extraction — results cached per document text (SHA-256); longer documents are
+# pre-filtered to their demographics/diagnosis/medication sections, about this many chars
+ANAMNESIS_CACHE_MAX_ENTRIES = int(os.getenv("ANAMNESIS_CACHE_MAX_ENTRIES", "200"))
+ANAMNESIS_CACHE_TTL_SECONDS = float(os.getenv("ANAMNESIS_CACHE_TTL_SECONDS", "86400"))
+ANAMNESIS_PREFILTER_CHARS = int(os.getenv("ANAMNESIS_PREFILTER_CHARS", "8000"))
+# Rule-based extraction at or above this confidence (0–1) is used without an LLM call
+ANAMNESIS_RULES_MIN_CONFIDENCE = float(os.getenv("ANAMNESIS_RULES_MIN_CONFIDENCE", "0.95"))
+
+# Chat sessions — context registered on the first turn, idle sessions expire; messages kept per session
+CHAT_SESSION_MAX_ENTRIES = int(os.getenv("CHAT_SESSION_MAX_ENTRIES", "1000"))
+CHAT_SESSION_TTL_SECONDS = float(os.getenv("CHAT_SESSION_TTL_SECONDS", "7200"))
+CHAT_SESSION_MAX_MESSAGES = int(os.getenv("CHAT_SESSION_MAX_MESSAGES", "50"))
+# Chat streaming — tokens are coalesced into one write until this many chars or ms have accumulated
+CHAT_STREAM_FLUSH_CHARS = int(os.getenv("CHAT_STREAM_FLUSH_CHARS", "128"))
+CHAT_STREAM_FLUSH_MS = float(os.getenv("CHAT_STREAM_FLUSH_MS", "40"))
+# Mark the static chat prompt prefix cacheable (cache_control) for providers with prompt caching
+LLM_PROMPT_CACHING = os.getenv("LLM_PROMPT_CACHING", "true").lower() in ("1", "true", "yes")
+
+# Request limits — max request body (enforced while it streams in); JSON bodies up to
+# LOG_BODY_MAX_BYTES are captured for the request log, larger ones are logged without a body
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(15 * 1024 * 1024)))
+LOG_BODY_MAX_BYTES = int(os.getenv("LOG_BODY_MAX_BYTES", str(64 * 1024)))
+
+# Evaluation prompt — token budget (~4 chars/token) for the OpenFDA payload; 0 disables trimming
+LLM_PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "6000"))
+
+# Drug-name resolution — minimum confidence for a close spelling to be offered as a suggestion
+DRUG_NAME_MIN_CONFIDENCE = float(os.getenv("DRUG_NAME_MIN_CONFIDENCE", "0.75"))
+
+# Background health prober — OpenFDA/LLM probe interval and timeout, probes kept per upstream
+HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "30"))
+HEALTH_PROBE_TIMEOUT_SECONDS = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "5"))
+HEALTH_PROBE_WINDOW = int(os.getenv("HEALTH_PROBE_WINDOW", "20"))
+
+# LLM gateway — per-call deadlines (seconds, whole call incl. hedge), connection pool, retries;
+# hedged second request past the operation's p95; circuit breaker failing fast during outages
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "45"))
+LLM_CHAT_TIMEOUT_SECONDS = float(os.getenv("LLM_CHAT_TIMEOUT_SECONDS", "20"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "0"))
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "2"))
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+# FAL AI (OpenRouter proxy, OpenAI-compatible) — clients live in backend.services.llm_gateway
+LLM_HEADERS = {
+    "Authorization": f"Key {FAL_KEY}",
+}
@@ -0,0 +1,85 @@
+"""
+Build the offline OpenFDA label index from the openFDA `drug/label` bulk download.
+
+Usage:
+    python -m backend.ingest_labels drug-label-0001-of-0013.json.zip ... --output fda_snapshot/labels.sqlite3
+
+Accepts the downloaded `.json.zip` partitions or extracted `.json` files. Point
+OPENFDA_SNAPSHOT_PATH at the output file to serve labels from it; set
+OPENFDA_OFFLINE=true to never fall back to the network.
+"""
+
+import argparse
+import os
+import time
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, Tuple
+
+import ijson  # streaming parser — keeps memory flat on ~1 GB partitions
+
+from backend.services.label_index import LabelIndexWriter
+from backend.services.openfda import trim_label
+
+
+@contextmanager
+def _open_partition(path: Path) -> Iterator[IO[bytes]]:
+    """Open a partition for binary reading; zip archives are closed with their member."""
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as archive:
+            member = next(name for name in archive.namelist() if name.endswith(".json"))
+            with archive.open(member) as f:
+                yield f
+        return
+    with open(path, "rb") as f:
+        yield f
+
+
+def _iter_labels(path: Path) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """Yield (raw_label, meta_last_updated) pairs from one bulk partition."""
+    with _open_partition(path) as f:
+        last_updated = next(ijson.items(f, "meta.last_updated"), None)
+    with _open_partition(path) as f:
+        for label in ijson.items(f, "results.item", use_float=True):
+            yield label, last_updated
+
+
+def ingest(files: list, output: Path) -> Dict[str, Any]:
+    """Ingest bulk partitions into a fresh index file, swapped in atomically."""
+    start = time.time()
+    tmp_output = output.with_suffix(output.suffix + ".tmp")
+    if tmp_output.exists():
+        tmp_output.unlink()
+
+    writer = LabelIndexWriter(tmp_output)
+    last_updated = None
+    for file in files:
+        print(f"📥 Ingesting {file}...")
+        for raw, meta_last_updated in _iter_labels(Path(file)):
+            last_updated = meta_last_updated or last_updated
+            writer.add({"found": True, "label": trim_label(raw), "meta_last_updated": meta_last_updated})
+        print(f"   {writer.label_count} labels so far")
+
+    writer.set_meta("last_updated", last_updated or "")
+    writer.set_meta("ingested_at", time.strftime("%Y-%m-%dT%H:%M:%S"))
+    writer.set_meta("label_count", str(writer.label_count))
+    writer.close()
+    os.replace(tmp_output, output)
+
+    return {
+        "output": str(output),
+        "labels": writer.label_count,
+        "size_mb": round(output.stat().st_size / 1024 / 1024, 1),
+        "elapsed_s": round(time.time() - start, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the offline OpenFDA label index.")
+    parser.add_argument("files", nargs="+", help="openFDA drug/label bulk partitions (.json or .json.zip)")
+    parser.add_argument("--output", default="fda_snapshot/labels.sqlite3", help="index file to write")
+    args = parser.parse_args()
+
+    summary = ingest(args.files, Path(args.output))
+    print(f"✅ Index ready: {summary}")
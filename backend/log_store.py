@@ -0,0 +1,285 @@
+"""
+Indexed log store — SQLite index over request/error log entries.
+
+BackendLogger writes every entry here as well as to its files/segments, so
+the logs viewer can filter, paginate and aggregate without listing or parsing
+`backend_logs/`. Entries are stored zlib-compressed; the summary columns are
+indexed on timestamp, endpoint, status and processing time.
+
+Backfill existing history with:
+    python -m backend.log_store backend_logs
+"""
+
+import argparse
+import gzip
+import json
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    log_id TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    method TEXT,
+    status_code INTEGER,
+    processing_time_ms REAL,
+    is_error INTEGER NOT NULL,
+    entry BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs (ts, log_id);
+CREATE INDEX IF NOT EXISTS idx_logs_endpoint_ts ON logs (endpoint, ts);
+CREATE INDEX IF NOT EXISTS idx_logs_status_ts ON logs (status_code, ts);
+CREATE INDEX IF NOT EXISTS idx_logs_time ON logs (processing_time_ms);
+"""
+
+_SUMMARY_COLUMNS = "log_id, timestamp, endpoint, method, status_code, processing_time_ms, is_error, ts"
+
+MAX_PAGE_SIZE = 200
+
+
+def _row(entry: Dict[str, Any]) -> tuple:
+    timestamp = entry.get("timestamp") or datetime.now().isoformat()
+    is_error = entry.get("type") == "ERROR"
+    return (
+        entry["log_id"],
+        datetime.fromisoformat(timestamp).timestamp(),
+        timestamp,
+        entry.get("endpoint", "unknown"),
+        entry.get("method"),
+        entry.get("status_code", 500 if is_error else None),
+        entry.get("processing_time_ms"),
+        int(is_error),
+        zlib.compress(json.dumps(entry, ensure_ascii=False, default=str).encode("utf-8")),
+    )
+
+
+_HOUR = "strftime('%Y-%m-%dT%H:00', ts, 'unixepoch', 'localtime')"
+
+
+def _rank_sql(percent: int) -> str:
+    """SQL for the nearest rank ceil(percent/100 · n), within [1, n] for n ≥ 1 (integer arithmetic)."""
+    return f"((n * {percent} + 99) / 100)"
+
+
+class LogStore:
+    """SQLite-backed, indexed store of log entries."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add_many(self, entries: Iterable[Dict[str, Any]]) -> None:
+        rows = [_row(entry) for entry in entries if entry.get("log_id")]
+        if not rows:
+            return
+        try:
+            with self._connect() as conn:
+                conn.executemany("INSERT OR REPLACE INTO logs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error as e:
+            print(f"Log store write error: {e}")
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        self.add_many([entry])
+
+    def get(self, log_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute("SELECT entry FROM logs WHERE log_id = ?", (log_id,)).fetchone()
+        return json.loads(zlib.decompress(row["entry"])) if row else None
+
+    def query(
+        self,
+        endpoint: Optional[str] = None,
+        endpoint_prefix: Optional[str] = None,
+        status_code: Optional[int] = None,
+        errors_only: bool = False,
+        min_ms: Optional[float] = None,
+        max_ms: Optional[float] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """
+        Newest-first page of log summaries matching the filters.
+
+        `cursor` is the `next_cursor` of the previous page (keyset pagination,
+        so deep pages cost the same as the first).
+        """
+        clauses, params = [], []
+        if endpoint:
+            clauses.append("endpoint = ?")
+            params.append(endpoint)
+        if endpoint_prefix:
+            clauses.append("endpoint GLOB ?")
+            params.append(endpoint_prefix.replace("[", "[[]").replace("*", "[*]").replace("?", "[?]") + "*")
+        if status_code is not None:
+            clauses.append("status_code = ?")
+            params.append(status_code)
+        if errors_only:
+            clauses.append("(is_error = 1 OR status_code >= 400)")
+        if min_ms is not None:
+            clauses.append("processing_time_ms >= ?")
+            params.append(min_ms)
+        if max_ms is not None:
+            clauses.append("processing_time_ms <= ?")
+            params.append(max_ms)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        if cursor:
+            cursor_ts, _, cursor_id = cursor.partition("_")
+            clauses.append("(ts, log_id) < (?, ?)")
+            params += [float(cursor_ts), cursor_id]
+
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            f"SELECT {_SUMMARY_COLUMNS} FROM logs {where} ORDER BY ts DESC, log_id DESC LIMIT ?",
+            params + [limit + 1],
+        ).fetchall()
+
+        logs = [
+            {
+                "log_id": row["log_id"],
+                "timestamp": row["timestamp"],
+                "endpoint": row["endpoint"],
+                "method": row["method"],
+                "status_code": row["status_code"],
+                "processing_time_ms": row["processing_time_ms"],
+                "is_error": bool(row["is_error"]),
+            }
+            for row in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = f"{last['ts']:.6f}_{last['log_id']}"
+        return {"logs": logs, "next_cursor": next_cursor}
+
+    def latency_stats(
+        self,
+        since: float,
+        until: Optional[float] = None,
+        endpoint: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        p50/p95 latency, request and error counts per endpoint per hour.
+
+        Aggregated inside SQLite: only the counts and the rows at the
+        percentile ranks come back, however many entries the window holds.
+        """
+        clauses, params = ["ts >= ?"], [since]
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        if endpoint:
+            clauses.append("endpoint = ?")
+            params.append(endpoint)
+        where = " AND ".join(clauses)
+        conn = self._connect()
+
+        counts = conn.execute(
+            f"SELECT endpoint, {_HOUR} AS hour, COUNT(*) AS count, "
+            "SUM(is_error OR COALESCE(status_code, 0) >= 400) AS errors, MAX(processing_time_ms) AS max_ms "
+            f"FROM logs WHERE {where} GROUP BY endpoint, hour ORDER BY endpoint, hour",
+            params,
+        ).fetchall()
+
+        # Nearest-rank percentiles: the ceil(q·n)-th smallest latency of each bucket
+        p50, p95 = _rank_sql(50), _rank_sql(95)
+        percentiles = conn.execute(
+            "SELECT endpoint, hour, "
+            f"MAX(CASE WHEN rn = {p50} THEN ms END) AS p50_ms, MAX(CASE WHEN rn = {p95} THEN ms END) AS p95_ms "
+            "FROM ("
+            "  SELECT endpoint, hour, ms, COUNT(*) OVER bucket AS n, ROW_NUMBER() OVER (bucket ORDER BY ms) AS rn"
+            f"  FROM (SELECT endpoint, {_HOUR} AS hour, processing_time_ms AS ms FROM logs"
+            f"        WHERE {where} AND processing_time_ms IS NOT NULL)"
+            "  WINDOW bucket AS (PARTITION BY endpoint, hour)"
+            f") WHERE rn IN ({p50}, {p95}) GROUP BY endpoint, hour",
+            params,
+        ).fetchall()
+        by_bucket = {(row["endpoint"], row["hour"]): row for row in percentiles}
+
+        def _ms(value: Optional[float]) -> Optional[float]:
+            return round(value, 2) if value is not None else None
+
+        stats = []
+        for row in counts:
+            ranked = by_bucket.get((row["endpoint"], row["hour"]))
+            stats.append({
+                "endpoint": row["endpoint"],
+                "hour": row["hour"],
+                "count": row["count"],
+                "errors": row["errors"],
+                "p50_ms": _ms(ranked["p50_ms"]) if ranked else None,
+                "p95_ms": _ms(ranked["p95_ms"]) if ranked else None,
+                "max_ms": _ms(row["max_ms"]),
+            })
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        count = self._connect().execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+        return {"path": str(self.path), "entries": count}
+
+
+def _iter_log_files(log_dir: Path) -> Iterator[Dict[str, Any]]:
+    """Entries from per-request JSON files and (gzipped) JSONL segments."""
+    for path in sorted(log_dir.iterdir()):
+        try:
+            if path.suffix == ".json":
+                with open(path, encoding="utf-8") as f:
+                    yield json.load(f)
+            elif path.name.endswith((".jsonl", ".jsonl.gz")):
+                opener = gzip.open if path.suffix == ".gz" else open
+                with opener(path, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            yield json.loads(line)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path.name}: {e}")
+
+
+def backfill(store: LogStore, log_dir: Path, batch_size: int = 1000) -> int:
+    """Index every existing log file in `log_dir`; returns the number of entries."""
+    batch: List[Dict[str, Any]] = []
+    total = 0
+    for entry in _iter_log_files(log_dir):
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            store.add_many(batch)
+            total += len(batch)
+            batch = []
+    store.add_many(batch)
+    return total + len(batch)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index existing backend log files.")
+    parser.add_argument("log_dir", nargs="?", default="backend_logs", help="directory with log files/segments")
+    parser.add_argument("--index", default=None, help="index file (default: <log_dir>/logs.sqlite3)")
+    args = parser.parse_args()
+
+    log_dir = Path(args.log_dir)
+    store = LogStore(Path(args.index) if args.index else log_dir / "logs.sqlite3")
+    print(f"✅ Indexed {backfill(store, log_dir)} entries into {store.path}")
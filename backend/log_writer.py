@@ -0,0 +1,190 @@
+"""
+Buffered background log writer — rotating JSONL segments.
+
+Request handlers only enqueue log entries; a single writer thread serializes
+them in batches into append-only JSONL segment files, rotated by size and by
+age and optionally gzip-compressed. The queue is bounded: when the disk falls
+behind, the drop policy decides between shedding entries and briefly
+blocking the caller. With write_segments=False no segments are written and
+the thread only hands batches to on_batch (the log index in files mode).
+"""
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, IO, List, Optional
+
+DROP_POLICIES = ("drop_new", "drop_oldest", "block")
+
+# Entries written per batch before the segment is flushed
+_MAX_BATCH = 500
+
+_STOP = object()
+
+
+class BufferedLogWriter:
+    """Queue-backed writer thread producing rotating JSONL segments."""
+
+    def __init__(
+        self,
+        log_dir: Path,
+        max_queue: int = 10000,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        segment_max_seconds: float = 3600,
+        flush_interval: float = 1.0,
+        compress: bool = False,
+        drop_policy: str = "drop_new",
+        block_timeout: float = 0.05,
+        on_batch: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        write_segments: bool = True,
+    ):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy {drop_policy!r}, expected one of {DROP_POLICIES}")
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_seconds = segment_max_seconds
+        self.flush_interval = flush_interval
+        self.compress = compress
+        self.drop_policy = drop_policy
+        self.block_timeout = block_timeout
+        # Called from the writer thread with each batch once it is on disk
+        self.on_batch = on_batch
+        self.write_segments = write_segments
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._segment: Optional[IO[bytes]] = None
+        self._segment_path: Optional[Path] = None
+        self._segment_opened = 0.0
+        self._segment_bytes = 0
+        self.written = 0
+        self.dropped = 0
+        self.segments = 0
+
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ── producer side (request handlers) ──────────────────
+
+    def submit(self, entry: Dict[str, Any]) -> bool:
+        """Enqueue an entry without touching the disk; False if it was dropped."""
+        try:
+            if self.drop_policy == "block":
+                self._queue.put(entry, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            pass
+
+        if self.drop_policy == "drop_oldest":
+            try:
+                self._queue.get_nowait()
+                self.dropped += 1
+                self._queue.put_nowait(entry)
+                return True
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped += 1
+        return False
+
+    # ── writer thread ─────────────────────────────────────
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._rotate_if_stale()
+                continue
+
+            batch = [item]
+            while len(batch) < _MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(entry is _STOP for entry in batch)
+            try:
+                self._write([entry for entry in batch if entry is not _STOP])
+            except Exception as e:
+                print(f"Log writer error: {e}")
+            if stop:
+                self._close_segment()
+                return
+
+    def _write(self, batch: list) -> None:
+        if not batch:
+            return
+        if not self.write_segments:
+            self.written += len(batch)
+            self.on_batch(batch)
+            return
+        self._rotate_if_stale()
+        data = "".join(json.dumps(entry, ensure_ascii=False, default=str) + "\n" for entry in batch).encode("utf-8")
+        if self._segment is None:
+            self._open_segment()
+        self._segment.write(data)
+        self._segment.flush()
+        self._segment_bytes += len(data)
+        self.written += len(batch)
+        if self._segment_bytes >= self.segment_max_bytes:
+            self._close_segment()
+        if self.on_batch is not None:
+            self.on_batch(batch)
+
+    def _rotate_if_stale(self) -> None:
+        if self._segment is not None and time.monotonic() - self._segment_opened >= self.segment_max_seconds:
+            self._close_segment()
+
+    def _open_segment(self) -> None:
+        # pid in the name keeps segments from several uvicorn workers apart
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        self._segment_path = self.log_dir / f"segment_{stamp}_{os.getpid()}_{self.segments:04d}{suffix}"
+        raw = open(self._segment_path, "ab")
+        self._segment = gzip.GzipFile(fileobj=raw, mode="ab") if self.compress else raw
+        self._segment_opened = time.monotonic()
+        self._segment_bytes = 0
+        self.segments += 1
+
+    def _close_segment(self) -> None:
+        if self._segment is None:
+            return
+        fileobj = getattr(self._segment, "fileobj", None)
+        self._segment.close()
+        if fileobj is not None:
+            fileobj.close()
+        self._segment = None
+
+    # ── lifecycle ─────────────────────────────────────────
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Drain the queue, close the open segment and stop the thread."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "written": self.written,
+            "dropped": self.dropped,
+            "segments": self.segments,
+            "current_segment": str(self._segment_path) if self._segment is not None else None,
+            "drop_policy": self.drop_policy,
+            "compress": self.compress,
+        }
@@ -1,6 +1,9 @@
 """
 Backend Logger — Request/Response Logging System.
-Writes detailed JSON log files for each API request.
+Writes detailed JSON log files for each API request, or — in buffered mode —
+hands entries to a background writer that batches them into JSONL segments.
+Every entry is also indexed in a SQLite log store for the /logs query API;
+the index is written from a background thread in both modes.
 """
 
 import json
@@ -8,15 +11,33 @@ import logging
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+from backend.config import (
+    LOG_COMPRESS,
+    LOG_DROP_POLICY,
+    LOG_FLUSH_INTERVAL_SECONDS,
+    LOG_INDEX_ENABLED,
+    LOG_MODE,
+    LOG_QUEUE_MAX,
+    LOG_SEGMENT_MAX_BYTES,
+    LOG_SEGMENT_MAX_SECONDS,
+)
+from backend.log_store import LogStore
+from backend.log_writer import BufferedLogWriter
 
 
 class BackendLogger:
     """Detailed logging system for the backend API."""
 
-    def __init__(self, log_dir: str = "backend_logs", enabled: bool = False):
+    def __init__(self, log_dir: str = "backend_logs", enabled: bool = False, mode: str = "files"):
         self.enabled = enabled
         self.log_dir = Path(log_dir)
+        self.mode = mode
+        self.writer: Optional[BufferedLogWriter] = None
+        # Files mode: background thread that only feeds entries to the index
+        self.indexer: Optional[BufferedLogWriter] = None
+        self.store: Optional[LogStore] = None
 
         if self.enabled:
             self.log_dir.mkdir(exist_ok=True)
@@ -25,7 +46,49 @@ class BackendLogger:
                 format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
             )
             self.logger = logging.getLogger("BackendLogger")
-            self.logger.info(f"Backend logging enabled — saving to {self.log_dir}")
+            if LOG_INDEX_ENABLED:
+                self.store = LogStore(self.log_dir / "logs.sqlite3")
+            if mode == "buffered":
+                self.writer = BufferedLogWriter(
+                    self.log_dir,
+                    max_queue=LOG_QUEUE_MAX,
+                    segment_max_bytes=LOG_SEGMENT_MAX_BYTES,
+                    segment_max_seconds=LOG_SEGMENT_MAX_SECONDS,
+                    flush_interval=LOG_FLUSH_INTERVAL_SECONDS,
+                    compress=LOG_COMPRESS,
+                    drop_policy=LOG_DROP_POLICY,
+                    on_batch=self.store.add_many if self.store is not None else None,
+                )
+            elif self.store is not None:
+                self.indexer = BufferedLogWriter(
+                    self.log_dir,
+                    max_queue=LOG_QUEUE_MAX,
+                    flush_interval=LOG_FLUSH_INTERVAL_SECONDS,
+                    drop_policy=LOG_DROP_POLICY,
+                    on_batch=self.store.add_many,
+                    write_segments=False,
+                )
+            self.logger.info(f"Backend logging enabled ({mode}) — saving to {self.log_dir}")
+
+    def _write_entry(self, log_entry: Dict[str, Any], filename: str) -> str:
+        """Persist one entry: queued for the background writer, or as its own JSON file."""
+        if self.writer is not None:
+            if not self.writer.submit(log_entry):
+                self.logger.warning(f"Log queue full — dropped {log_entry['log_id']}")
+            return log_entry["log_id"]
+
+        log_path = self.log_dir / filename
+        with open(log_path, "w", encoding="utf-8") as f:
+            json.dump(log_entry, f, indent=2, ensure_ascii=False)
+        if self.indexer is not None and not self.indexer.submit(log_entry):
+            self.logger.warning(f"Log index queue full — {log_entry['log_id']} not indexed")
+        return str(log_path)
+
+    def close(self) -> None:
+        """Flush buffered entries to disk and to the index."""
+        for writer in (self.writer, self.indexer):
+            if writer is not None:
+                writer.close()
 
     def log_request(
         self,
@@ -62,18 +125,15 @@ class BackendLogger:
 
             safe_endpoint = endpoint.replace("/", "_")
             filename = f"{timestamp.strftime('%Y-%m-%d_%H-%M-%S')}__{safe_endpoint}_{log_id[:8]}.json"
-            log_path = self.log_dir / filename
-
-            with open(log_path, "w", encoding="utf-8") as f:
-                json.dump(log_entry, f, indent=2, ensure_ascii=False)
+            log_ref = self._write_entry(log_entry, filename)
 
             self.logger.info(
                 f"[{method}] {endpoint} | IP: {client_ip} | "
                 f"Status: {status_code} | Time: {processing_time_ms:.2f}ms | "
                 f"Steps: {len(pipeline_steps) if pipeline_steps else 0} | "
-                f"Log: {filename}"
+                f"Log: {log_ref}"
             )
-            return str(log_path)
+            return log_ref
 
         except Exception as e:
             self.logger.error(f"Logging error: {e}")
@@ -109,16 +169,13 @@ class BackendLogger:
 
             safe_endpoint = endpoint.replace("/", "_")
             filename = f"{timestamp.strftime('%Y-%m-%d_%H-%M-%S')}__ERROR_{safe_endpoint}_{log_id[:8]}.json"
-            log_path = self.log_dir / filename
-
-            with open(log_path, "w", encoding="utf-8") as f:
-                json.dump(log_entry, f, indent=2, ensure_ascii=False)
+            log_ref = self._write_entry(log_entry, filename)
 
             self.logger.error(
                 f"[{method}] {endpoint} | IP: {client_ip} | "
-                f"Error: {error_type} — {error_message} | Log: {filename}"
+                f"Error: {error_type} — {error_message} | Log: {log_ref}"
             )
-            return str(log_path)
+            return log_ref
 
         except Exception as e:
             self.logger.error(f"Error logging error: {e}")
@@ -130,10 +187,12 @@ class BackendLogger:
 _backend_logger: BackendLogger = None
 
 
-def init_logger(enabled: bool = False, log_dir: str = "backend_logs"):
-    """Initialise the global logger instance."""
+def init_logger(enabled: bool = False, log_dir: str = "backend_logs", mode: Optional[str] = None):
+    """Initialise the global logger instance (mode defaults to LOG_MODE)."""
     global _backend_logger
-    _backend_logger = BackendLogger(log_dir=log_dir, enabled=enabled)
+    if _backend_logger is not None:
+        _backend_logger.close()
+    _backend_logger = BackendLogger(log_dir=log_dir, enabled=enabled, mode=mode or LOG_MODE)
     return _backend_logger
 
 
@@ -3,23 +3,49 @@ FastAPI application entry point.
 Assembles middleware, routes, and logging into a single app instance.
 """
 
-import json
-import time
+import asyncio
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import ValidationError
 
+from backend.config import LOG_BODY_MAX_BYTES, MAX_REQUEST_BYTES
 from backend.logger import init_logger, get_logger
-from backend.routes import analyze, chat, health, prefetch
+from backend.middleware import RequestMiddleware
+from backend.routes import analyze, chat, health, jobs, logs, metrics, prefetch
+from backend.services.anamnesis import shutdown_parse_pool
+from backend.services.drug_names import get_drug_name_resolver
+from backend.services.health_probe import start_health_prober, stop_health_prober
+from backend.services.jobs import start_job_queue, stop_job_queue
+from backend.services.llm_gateway import close_llm_clients
+from backend.services.openfda import close_openfda_client, init_openfda_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own long-lived resources (upstream connection pools, job workers) for the app's lifetime."""
+    init_openfda_client()
+    # Build the drug-name index off the event loop (large with an offline snapshot)
+    await asyncio.to_thread(get_drug_name_resolver)
+    await start_job_queue()
+    await start_health_prober()
+    yield
+    await stop_health_prober()
+    await stop_job_queue()
+    await close_openfda_client()
+    await close_llm_clients()
+    shutdown_parse_pool()
+    # Drain buffered log entries off the event loop
+    await asyncio.to_thread(get_logger().close)
 
 
 def create_app(enable_logging: bool = True) -> FastAPI:
     """Build and return the FastAPI application."""
     init_logger(enabled=enable_logging, log_dir="backend_logs")
 
-    app = FastAPI(title="Drug Interaction Analysis API")
+    app = FastAPI(title="Drug Interaction Analysis API", lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -37,69 +63,21 @@ def create_app(enable_logging: bool = True) -> FastAPI:
             content={"detail": "Geçersiz istek verisi. Lütfen girdiğiniz bilgileri kontrol edin."},
         )
 
-    # ── Request size limit middleware ──────────────────────
-    @app.middleware("http")
-    async def limit_request_size(request: Request, call_next):
-        # 15 MB max for all requests (file uploads etc.)
-        max_size = 15 * 1024 * 1024
-        content_length = request.headers.get("content-length")
-        if content_length and int(content_length) > max_size:
-            return JSONResponse(
-                status_code=413,
-                content={"detail": "İstek boyutu çok büyük. Maksimum 15 MB."},
-            )
-        return await call_next(request)
-
-    # ── Logging middleware ──────────────────────────────────
-    @app.middleware("http")
-    async def log_requests(request: Request, call_next):
-        start_time = time.time()
-
-        # Read body for logging (make it re-readable)
-        request_body = None
-        if request.method == "POST":
-            try:
-                body_bytes = await request.body()
-                if body_bytes:
-                    request_body = json.loads(body_bytes.decode())
-
-                async def receive():
-                    return {"type": "http.request", "body": body_bytes}
-
-                request._receive = receive
-            except Exception:
-                request_body = None
-
-        response = await call_next(request)
-
-        logger = get_logger()
-        processing_time_ms = (time.time() - start_time) * 1000
-        path = request.url.path
-
-        # Log only non-endpoint-specific requests (endpoints log themselves)
-        if logger.enabled and not any(
-            path.startswith(p) for p in ("/analyze", "/chat", "/health")
-        ):
-            client_ip = request.client.host if request.client else "unknown"
-            user_agent = request.headers.get("user-agent", "unknown")
-            logger.log_request(
-                endpoint=path,
-                method=request.method,
-                client_ip=client_ip,
-                user_agent=user_agent,
-                request_data=request_body or {},
-                response_data={"status": "completed"},
-                status_code=response.status_code,
-                processing_time_ms=processing_time_ms,
-            )
-
-        return response
+    # ── Size limit, metrics and request logging (pure ASGI, never buffers uploads) ──
+    app.add_middleware(
+        RequestMiddleware,
+        max_body_bytes=MAX_REQUEST_BYTES,
+        log_body_max_bytes=LOG_BODY_MAX_BYTES,
+    )
 
     # ── Register routes ────────────────────────────────────
     app.include_router(health.router)
     app.include_router(analyze.router)
     app.include_router(chat.router)
     app.include_router(prefetch.router)
+    app.include_router(jobs.router)
+    app.include_router(logs.router)
+    app.include_router(metrics.router)
 
     return app
 
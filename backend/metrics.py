@@ -0,0 +1,285 @@
+"""
+In-process metrics — counters, gauges and histograms rendered in the
+Prometheus text exposition format at /metrics.
+
+Recording is a dict update under a lock, cheap enough to stay on in
+production independently of BackendLogger. Cache statistics are not
+recorded on the hot path at all: they are read from the registered
+TTLCache/SingleFlight instances when /metrics is scraped.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from backend.services.cache import registered_caches, registered_flights
+
+# Seconds — from a cached label lookup up to a slow LLM evaluation
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Histogram(_Metric):
+    """Bucketed observations (seconds) with sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts incl. +Inf, sum)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            item = self._values.get(key)
+            if item is None:
+                item = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            item[0][index] += 1
+            item[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        """Observe the duration of the `with` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: object) -> int:
+        item = self._values.get(self._key(labels))
+        return sum(item[0]) if item else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+# ──────────────────── registry ────────────────────
+
+_METRICS: List[_Metric] = []
+_COLLECTORS: List[Callable[[], List[str]]] = []
+
+
+def _register(metric: _Metric) -> _Metric:
+    _METRICS.append(metric)
+    return metric
+
+
+def register_collector(collector: Callable[[], List[str]]) -> None:
+    """Add a callable returning exposition lines, evaluated on every scrape."""
+    _COLLECTORS.append(collector)
+
+
+def _collect_caches() -> List[str]:
+    caches = sorted((cache.stats() for cache in registered_caches()), key=lambda s: s["name"])
+    flights = sorted((flight.stats() for flight in registered_flights()), key=lambda s: s["name"])
+    families = [
+        ("drug_api_cache_hits_total", "counter", "Cache lookups answered from memory.", "hits"),
+        ("drug_api_cache_misses_total", "counter", "Cache lookups that missed or had expired.", "misses"),
+        ("drug_api_cache_evictions_total", "counter", "Entries evicted over the cache's entry budget.", "evictions"),
+        ("drug_api_cache_entries", "gauge", "Entries currently cached.", "size"),
+    ]
+    lines = []
+    for name, kind, documentation, field in families:
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{cache="{_escape(s["name"])}"}} {s[field]}' for s in caches]
+    lines += [
+        "# HELP drug_api_coalesced_calls_total Calls that joined an identical in-flight call.",
+        "# TYPE drug_api_coalesced_calls_total counter",
+        *(f'drug_api_coalesced_calls_total{{flight="{_escape(s["name"])}"}} {s["coalesced"]}' for s in flights),
+    ]
+    return lines
+
+
+register_collector(_collect_caches)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines += metric.render()
+    for collector in _COLLECTORS:
+        try:
+            lines += collector()
+        except Exception as e:
+            print(f"Metrics collector error: {e}")
+    return "\n".join(lines) + "\n"
+
+
+# ──────────────────── application metrics ────────────────────
+
+STAGE_SECONDS: Histogram = _register(Histogram(
+    "drug_api_stage_duration_seconds",
+    "Pipeline stage latency: openfda_fetch (per batched OpenFDA request), llm_evaluate, document_parse, anamnesis_rules, anamnesis_extract, chat_ttft.",
+    ["stage"],
+))
+
+UPSTREAM_RESPONSES: Counter = _register(Counter(
+    "drug_api_upstream_responses_total",
+    "Upstream responses by status code (error = no HTTP response).",
+    ["upstream", "status"],
+))
+
+LLM_FALLBACKS: Counter = _register(Counter(
+    "drug_api_llm_fallbacks_total",
+    "LLM calls answered with the fallback response instead of a model result.",
+    ["operation"],
+))
+
+LLM_HEDGED_REQUESTS: Counter = _register(Counter(
+    "drug_api_llm_hedged_requests_total",
+    "Hedged second LLM requests, by operation and which request answered first.",
+    ["operation", "winner"],
+))
+
+LLM_CIRCUIT_REJECTIONS: Counter = _register(Counter(
+    "drug_api_llm_circuit_rejections_total",
+    "LLM calls failed fast because the circuit breaker was open.",
+    ["operation"],
+))
+
+CHAT_STREAMS_ABORTED: Counter = _register(Counter(
+    "drug_api_chat_streams_aborted_total",
+    "Chat streams whose upstream LLM request was aborted because the client disconnected.",
+))
+
+HTTP_IN_FLIGHT: Gauge = _register(Gauge(
+    "drug_api_http_requests_in_flight",
+    "HTTP requests currently being handled.",
+))
+
+HTTP_REQUESTS: Counter = _register(Counter(
+    "drug_api_http_requests_total",
+    "HTTP requests by route template, method and status code.",
+    ["route", "method", "status"],
+))
+
+HTTP_REQUEST_SECONDS: Histogram = _register(Histogram(
+    "drug_api_http_request_duration_seconds",
+    "Request duration until the response was complete, by route template.",
+    ["route"],
+))
+
+
+def upstream_error_status(error: BaseException) -> str:
+    """Status label for a failed upstream call: the HTTP status if there was one."""
+    status: Optional[int] = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return str(status)
+    return "timeout" if "Timeout" in type(error).__name__ else "error"
@@ -0,0 +1,165 @@
+"""
+Request middleware — pure ASGI: body size limit, request metrics and logging.
+
+Nothing here buffers a request body. The size limit is enforced on the
+`http.request` messages as they stream through `receive` (Content-Length is
+only a fast path), so a 15 MB upload costs no extra memory on its way to the
+multipart parser. Only JSON bodies up to LOG_BODY_MAX_BYTES are copied, for
+the request log of routes that do not log themselves.
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.logger import get_logger
+from backend.metrics import HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS, HTTP_REQUESTS
+
+# Routes that write their own, richer log entries
+_SELF_LOGGING_PREFIXES = ("/analyze", "/chat", "/health", "/jobs", "/logs", "/metrics")
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class _RequestTooLarge(Exception):
+    pass
+
+
+class RequestMiddleware:
+    """Size-limit, measure and log every HTTP request without buffering its body."""
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int, log_body_max_bytes: int):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.log_body_max_bytes = log_body_max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.time()
+        content_length = _header(scope, b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            await self._reject(send)
+            self._record(scope, 413, start_time, None)
+            return
+
+        logger = get_logger()
+        path = scope["path"]
+        capture = (
+            logger.enabled
+            and scope["method"] == "POST"
+            and not path.startswith(_SELF_LOGGING_PREFIXES)
+            and (_header(scope, b"content-type") or "").startswith("application/json")
+            and not (content_length and content_length.isdigit() and int(content_length) > self.log_body_max_bytes)
+        )
+        captured: Optional[List[bytes]] = [] if capture else None
+        state: Dict[str, Any] = {"received": 0, "too_large": False, "status": 500, "started": False, "body_done": False}
+
+        async def limited_receive() -> Message:
+            nonlocal captured
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+
+            chunk = message.get("body", b"")
+            state["received"] += len(chunk)
+            state["body_done"] = not message.get("more_body", False)
+            if state["received"] > self.max_body_bytes:
+                # Looks like a client disconnect to the app; the 413 is sent below
+                state["too_large"] = True
+                return {"type": "http.disconnect"}
+            if captured is not None:
+                if state["received"] > self.log_body_max_bytes:
+                    captured = None
+                elif chunk:
+                    captured.append(chunk)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            if state["too_large"]:
+                raise _RequestTooLarge()
+            if message["type"] == "http.response.start":
+                state["started"] = True
+                state["status"] = message["status"]
+            await send(message)
+
+        failed = False
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _RequestTooLarge:
+            pass
+        except Exception:
+            if not state["too_large"]:
+                failed = True
+                raise
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # Unhandled errors become a 500 further out; count them before re-raising
+            if failed:
+                self._record(scope, 500, start_time, None)
+
+        if state["too_large"]:
+            if not state["started"]:
+                await self._reject(send)
+            state["status"] = 413
+            captured = None
+
+        # Routes that failed early (404, 405) never read the body; log it only if it was read in full
+        if not state["body_done"]:
+            captured = None
+
+        self._record(scope, state["status"], start_time, captured)
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps(
+            {"detail": f"İstek boyutu çok büyük. Maksimum {self.max_body_bytes // (1024 * 1024)} MB."},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def _record(self, scope: Scope, status_code: int, start_time: float, captured: Optional[List[bytes]]) -> None:
+        processing_time_ms = (time.time() - start_time) * 1000
+
+        # Route templates keep the label set bounded (/jobs/{job_id}, not one series per id)
+        route = getattr(scope.get("route"), "path", "unmatched")
+        HTTP_REQUESTS.inc(route=route, method=scope["method"], status=status_code)
+        HTTP_REQUEST_SECONDS.observe(processing_time_ms / 1000, route=route)
+
+        logger = get_logger()
+        path = scope["path"]
+        if not logger.enabled or path.startswith(_SELF_LOGGING_PREFIXES):
+            return
+
+        request_body: Dict[str, Any] = {}
+        if captured:
+            try:
+                request_body = json.loads(b"".join(captured))
+            except ValueError:
+                request_body = {}
+
+        client = scope.get("client")
+        logger.log_request(
+            endpoint=path,
+            method=scope["method"],
+            client_ip=client[0] if client else "unknown",
+            user_agent=_header(scope, b"user-agent") or "unknown",
+            request_data=request_body,
+            response_data={"status": "completed"},
+            status_code=status_code,
+            processing_time_ms=processing_time_ms,
+        )
@@ -34,8 +34,18 @@ class AnalysisRequest(BaseModel):
         return [c[:500] for c in v]
 
 
+class BatchAnalysisItem(AnalysisRequest):
+    patient_id: Optional[str] = Field(None, max_length=100)
+
+
+class BatchAnalysisRequest(BaseModel):
+    patients: List[BatchAnalysisItem] = Field(..., min_length=1, max_length=500)
+
+
 class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1, max_length=2000)
+    # Set on follow-up turns; context, patient_info and history are only sent to open a session
+    session_id: Optional[str] = Field(None, max_length=64)
     context: Dict[str, Any] = Field(default_factory=dict)
     patient_info: Dict[str, Any] = Field(default_factory=dict)
     history: List[Dict[str, str]] = Field(default_factory=list, max_length=50)
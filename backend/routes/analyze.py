@@ -1,18 +1,21 @@
-"""Analysis routes — /analyze and /analyze/file."""
+"""Analysis routes — /analyze, /analyze/stream, /analyze/batch and /analyze/file."""
 
 import json
 import time
+from typing import Any, Dict, Tuple
 
 from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import StreamingResponse
 
 from backend.logger import get_logger
 
 # Max file upload size: 10 MB
 _MAX_FILE_SIZE = 10 * 1024 * 1024
 _ALLOWED_EXTENSIONS = {".pdf", ".docx", ".doc", ".txt"}
-from backend.models import AnalysisRequest
-from backend.services.anamnesis import extract_patient_info_from_text, read_file_content
-from backend.services.llm import analyze_with_openai_agent
+from backend.models import AnalysisRequest, BatchAnalysisRequest
+from backend.services.anamnesis import extract_patient_info_from_text_async, parse_document_async, parse_step
+from backend.services.batch import analyze_batch_stream
+from backend.services.llm import analyze_with_openai_agent_async, analyze_with_openai_agent_stream
 
 router = APIRouter()
 
@@ -28,6 +31,27 @@ _ERROR_RESPONSE = {
 }
 
 
+async def read_upload_text(file: UploadFile) -> Tuple[str, Dict[str, Any]]:
+    """Validate an uploaded anamnesis document → (text, parse info); HTTPException on bad input."""
+    filename = (file.filename or "").lower()
+    ext = "." + filename.rsplit(".", 1)[-1] if "." in filename else ""
+    if ext not in _ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Desteklenmeyen dosya formatı. PDF, DOCX veya TXT yükleyin.")
+
+    # Read file (with size limit)
+    content = await file.read()
+    if len(content) > _MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail="Dosya boyutu çok büyük. Maksimum 10 MB.")
+    if len(content) == 0:
+        raise HTTPException(status_code=400, detail="Dosya boş.")
+
+    # Parsed in the worker processes, never on the event loop
+    anamnesis_text, parse_info = await parse_document_async(filename, content)
+    if anamnesis_text.startswith("Error"):
+        raise HTTPException(status_code=400, detail="Dosya okunamadı. Lütfen farklı bir dosya deneyin.")
+    return anamnesis_text, parse_info
+
+
 @router.post("/analyze")
 async def analyze(request: AnalysisRequest, req: Request):
     """Run the full drug-interaction analysis pipeline."""
@@ -35,7 +59,7 @@ async def analyze(request: AnalysisRequest, req: Request):
     start_time = time.time()
 
     try:
-        result_and_pipeline = analyze_with_openai_agent(
+        result_and_pipeline = await analyze_with_openai_agent_async(
             age=request.age,
             gender=request.gender,
             conditions=request.conditions,
@@ -89,6 +113,114 @@ async def analyze(request: AnalysisRequest, req: Request):
         return {**_ERROR_RESPONSE, "clinical_summary": "Analiz sırasında bir hata oluştu. Lütfen tekrar deneyin."}
 
 
+@router.post("/analyze/stream")
+async def analyze_stream(request: AnalysisRequest, req: Request):
+    """
+    Streaming analysis — NDJSON events: per-drug OpenFDA progress, then each
+    evaluation section as soon as the LLM has finished writing it, then the
+    full result.
+    """
+    logger = get_logger()
+    start_time = time.time()
+
+    async def generate():
+        pipeline_steps: list = []
+        result = None
+        try:
+            async for event in analyze_with_openai_agent_stream(
+                age=request.age,
+                gender=request.gender,
+                conditions=request.conditions,
+                current_medications=[
+                    {"name": med.name, "dosage": med.dosage or "N/A"}
+                    for med in request.currentMedications
+                ],
+                new_medications=[
+                    {"name": med.name, "dosage": med.dosage or "N/A"}
+                    for med in request.newMedications
+                ],
+                pipeline_steps=pipeline_steps if logger.enabled else None,
+            ):
+                if event["event"] == "result":
+                    result = event["data"]
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+
+        except Exception as e:
+            print(f"Analysis stream error: {e}")
+            if logger.enabled:
+                logger.log_error(
+                    endpoint="/analyze/stream",
+                    method="POST",
+                    client_ip=req.client.host if req.client else "unknown",
+                    error_message=str(e),
+                    error_type=type(e).__name__,
+                    request_data=request.model_dump(),
+                )
+            error = {**_ERROR_RESPONSE, "clinical_summary": "Analiz sırasında bir hata oluştu. Lütfen tekrar deneyin."}
+            yield json.dumps({"event": "error", "data": error}, ensure_ascii=False) + "\n"
+            return
+
+        if logger.enabled:
+            logger.log_request(
+                endpoint="/analyze/stream",
+                method="POST",
+                client_ip=req.client.host if req.client else "unknown",
+                user_agent=req.headers.get("user-agent", "unknown"),
+                request_data=request.model_dump(),
+                response_data=result,
+                status_code=200,
+                processing_time_ms=(time.time() - start_time) * 1000,
+                pipeline_steps=pipeline_steps,
+            )
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/analyze/batch")
+async def analyze_batch(request: BatchAnalysisRequest, req: Request):
+    """
+    Batch analysis — labels for all patients are fetched once, evaluations run
+    concurrently, and each patient's result is streamed (NDJSON) as it finishes.
+    """
+    logger = get_logger()
+    start_time = time.time()
+
+    async def generate():
+        summary = None
+        try:
+            async for event in analyze_batch_stream(request.patients):
+                if event["event"] == "batch_complete":
+                    summary = event
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+
+        except Exception as e:
+            print(f"Batch analysis error: {e}")
+            yield json.dumps({"event": "error", "message": "Toplu analiz sırasında bir hata oluştu."}, ensure_ascii=False) + "\n"
+            return
+
+        if logger.enabled:
+            logger.log_request(
+                endpoint="/analyze/batch",
+                method="POST",
+                client_ip=req.client.host if req.client else "unknown",
+                user_agent=req.headers.get("user-agent", "unknown"),
+                request_data={"patients": len(request.patients)},
+                response_data=summary,
+                status_code=200,
+                processing_time_ms=(time.time() - start_time) * 1000,
+            )
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/analyze/file")
 async def analyze_file(
     file: UploadFile = File(...),
@@ -100,25 +232,11 @@ async def analyze_file(
     start_time = time.time()
 
     try:
-        # 0. Validate file
-        filename = (file.filename or "").lower()
-        ext = "." + filename.rsplit(".", 1)[-1] if "." in filename else ""
-        if ext not in _ALLOWED_EXTENSIONS:
-            raise HTTPException(status_code=400, detail="Desteklenmeyen dosya formatı. PDF, DOCX veya TXT yükleyin.")
-
-        # 1. Read file (with size limit)
-        content = await file.read()
-        if len(content) > _MAX_FILE_SIZE:
-            raise HTTPException(status_code=413, detail="Dosya boyutu çok büyük. Maksimum 10 MB.")
-        if len(content) == 0:
-            raise HTTPException(status_code=400, detail="Dosya boş.")
-
-        anamnesis_text = read_file_content(file, content)
-        if anamnesis_text.startswith("Error"):
-            raise HTTPException(status_code=400, detail="Dosya okunamadı. Lütfen farklı bir dosya deneyin.")
+        # 0–1. Validate and parse file
+        anamnesis_text, parse_info = await read_upload_text(file)
 
         # 2. Extract patient info
-        extracted_info = extract_patient_info_from_text(anamnesis_text)
+        extracted_info = await extract_patient_info_from_text_async(anamnesis_text)
 
         # 3. Parse new medications
         try:
@@ -127,7 +245,7 @@ async def analyze_file(
             new_meds_list = []
 
         # 4. Run analysis
-        result_and_pipeline = analyze_with_openai_agent(
+        result_and_pipeline = await analyze_with_openai_agent_async(
             age=extracted_info.get("age", 45),
             gender=extracted_info.get("gender", "male"),
             conditions=extracted_info.get("conditions", []),
@@ -138,6 +256,7 @@ async def analyze_file(
 
         if logger.enabled:
             result, pipeline_steps = result_and_pipeline
+            pipeline_steps = [parse_step(parse_info), *pipeline_steps]
         else:
             result = result_and_pipeline
             pipeline_steps = []
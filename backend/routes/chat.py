@@ -1,31 +1,54 @@
 """Chat routes — /chat and /chat/stream."""
 
+import asyncio
 import time
+from typing import AsyncIterator, Callable, List, Optional
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
 
+from backend.config import CHAT_STREAM_FLUSH_CHARS, CHAT_STREAM_FLUSH_MS
 from backend.logger import get_logger
+from backend.metrics import CHAT_STREAMS_ABORTED
 from backend.models import ChatRequest
-from backend.services.chat import chat_with_analysis, chat_with_analysis_stream
+from backend.services.chat import (
+    CHAT_FALLBACK_REPLY,
+    build_prompt_prefix,
+    chat_with_analysis,
+    chat_with_analysis_stream,
+)
+from backend.services.chat_sessions import ChatSession, create_session, get_session
 
 router = APIRouter()
 
 
+def _resolve_session(request: ChatRequest) -> ChatSession:
+    """The request's session, or a new one registered from the context it carries."""
+    if request.session_id:
+        session = get_session(request.session_id)
+        if session is not None:
+            return session
+        if not request.context and not request.patient_info:
+            raise HTTPException(status_code=404, detail="Sohbet oturumu bulunamadı veya süresi doldu.")
+    return create_session(build_prompt_prefix(request.context, request.patient_info), request.history)
+
+
 @router.post("/chat")
 async def chat_endpoint(request: ChatRequest, req: Request):
     """Non-streaming chat endpoint."""
     logger = get_logger()
     start_time = time.time()
+    session = _resolve_session(request)
 
     try:
-        response_text = chat_with_analysis(
+        response_text = await chat_with_analysis(
+            prefix=session.prefix,
+            history=session.snapshot(),
             message=request.message,
-            context=request.context,
-            patient_info=request.patient_info,
-            history=request.history,
         )
-        result = {"reply": response_text}
+        if response_text != CHAT_FALLBACK_REPLY:
+            session.record_turn(request.message, response_text)
+        result = {"reply": response_text, "session_id": session.session_id}
 
         if logger.enabled:
             processing_time_ms = (time.time() - start_time) * 1000
@@ -51,18 +74,91 @@ async def chat_endpoint(request: ChatRequest, req: Request):
         return {"reply": "Hata oluştu, lütfen tekrar deneyin."}
 
 
+async def _wait_for_disconnect(req: Request) -> None:
+    while (await req.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _relay(req: Request, chunks: AsyncIterator[str], on_complete: Callable[[str], None]) -> AsyncIterator[str]:
+    """
+    Forward `chunks` to the client until it disconnects.
+
+    The next upstream chunk is awaited together with the client's disconnect,
+    so closing the chat panel aborts the LLM request immediately instead of
+    at the next write. Chunks are coalesced into one write until
+    CHAT_STREAM_FLUSH_CHARS or CHAT_STREAM_FLUSH_MS is reached; only one
+    upstream read is outstanding while a write is pending, so a slow client
+    slows the upstream down rather than growing a buffer. `on_complete` gets
+    the full reply when the upstream stream ended normally.
+    """
+    loop = asyncio.get_running_loop()
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(req))
+    next_chunk: Optional[asyncio.Future] = None
+    reply: List[str] = []
+    buffer: List[str] = []
+    buffered_chars = 0
+    flush_at = 0.0
+    try:
+        while True:
+            if next_chunk is None:
+                next_chunk = asyncio.ensure_future(anext(chunks))
+            timeout = max(0.0, flush_at - loop.time()) if buffer else None
+            await asyncio.wait({next_chunk, disconnected}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if disconnected.done():
+                CHAT_STREAMS_ABORTED.inc()
+                return
+            if next_chunk.done():
+                done, next_chunk = next_chunk, None
+                try:
+                    chunk = done.result()
+                except StopAsyncIteration:
+                    break
+                # The first chunk goes out at once — it is the time to first token
+                if not buffer:
+                    flush_at = loop.time() + CHAT_STREAM_FLUSH_MS / 1000
+                reply.append(chunk)
+                buffer.append(chunk)
+                buffered_chars += len(chunk)
+                if len(reply) > 1 and buffered_chars < CHAT_STREAM_FLUSH_CHARS and loop.time() < flush_at:
+                    continue
+
+            yield "".join(buffer)
+            buffer.clear()
+            buffered_chars = 0
+
+        if buffer:
+            yield "".join(buffer)
+        on_complete("".join(reply))
+    except asyncio.CancelledError:
+        # StreamingResponse's own disconnect listener got there first
+        CHAT_STREAMS_ABORTED.inc()
+        raise
+    finally:
+        disconnected.cancel()
+        if next_chunk is not None:
+            next_chunk.cancel()
+            await asyncio.wait({next_chunk})
+        await chunks.aclose()
+
+
 @router.post("/chat/stream")
-async def chat_stream_endpoint(request: ChatRequest):
-    """Streaming chat endpoint — returns text/plain chunks."""
+async def chat_stream_endpoint(request: ChatRequest, req: Request):
+    """Streaming chat endpoint — returns text/plain chunks, the session id in X-Chat-Session."""
+    session = _resolve_session(request)
 
-    def generate():
+    def record(reply: str) -> None:
+        if reply and not reply.endswith(CHAT_FALLBACK_REPLY):
+            session.record_turn(request.message, reply)
+
+    async def generate():
+        chunks = chat_with_analysis_stream(
+            prefix=session.prefix,
+            history=session.snapshot(),
+            message=request.message,
+        )
         try:
-            for chunk in chat_with_analysis_stream(
-                message=request.message,
-                context=request.context,
-                patient_info=request.patient_info,
-                history=request.history,
-            ):
+            async for chunk in _relay(req, chunks, record):
                 yield chunk
         except Exception as e:
             print(f"Chat stream endpoint error: {e}")
@@ -71,5 +167,5 @@ async def chat_stream_endpoint(request: ChatRequest):
     return StreamingResponse(
         generate(),
         media_type="text/plain; charset=utf-8",
-        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Chat-Session": session.session_id},
     )
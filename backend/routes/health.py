@@ -1,10 +1,11 @@
 """Health-check and root info routes."""
 
-import httpx
 from fastapi import APIRouter
 
-from backend.config import FAL_KEY, OPENFDA_BASE_URL
+from backend.config import FAL_KEY, OPENFDA_OFFLINE
 from backend.logger import get_logger
+from backend.services.health_probe import get_health_prober
+from backend.services.llm_gateway import gateway_state
 
 router = APIRouter()
 
@@ -16,27 +17,33 @@ async def root():
         "service": "Drug Interaction Analysis API",
         "version": "6.0",
         "status": "running",
-        "data_source": "OpenFDA API (Real-time)",
+        "data_source": "OpenFDA snapshot (offline)" if OPENFDA_OFFLINE else "OpenFDA API (Real-time)",
         "logging_enabled": logger.enabled,
     }
 
 
+@router.get("/health/live")
+async def liveness():
+    """Liveness — the process is serving requests; no I/O."""
+    return {"status": "alive"}
+
+
 @router.get("/health")
 async def health():
+    """Readiness from the background prober's cached upstream state — never waits on the network."""
     logger = get_logger()
-    openfda_status = "unknown"
-    try:
-        with httpx.Client(timeout=5.0) as client:
-            resp = client.get(OPENFDA_BASE_URL, params={"search": 'openfda.generic_name:"aspirin"', "limit": 1})
-            if resp.status_code == 200:
-                openfda_status = "healthy"
-    except Exception:
-        openfda_status = "offline"
+    prober = get_health_prober()
+    upstreams = prober.snapshot() if prober else {"openfda": {"status": "unknown"}, "llm": {"status": "unknown"}}
+    openfda_status = upstreams["openfda"]["status"]
+    llm = gateway_state()
 
+    healthy = openfda_status in ("healthy", "offline-snapshot") and llm["circuit"]["state"] != "open"
     return {
-        "status": "healthy" if openfda_status == "healthy" else "degraded",
+        "status": "healthy" if healthy else "degraded",
         "fal_configured": FAL_KEY is not None,
         "openfda_status": openfda_status,
-        "data_source": "OpenFDA API",
+        "data_source": "OpenFDA snapshot" if OPENFDA_OFFLINE else "OpenFDA API",
         "logging_enabled": logger.enabled,
+        "upstreams": upstreams,
+        "llm": llm,
     }
@@ -0,0 +1,68 @@
+"""Analysis job routes — /jobs/analyze, /jobs/analyze/file and /jobs/{job_id}."""
+
+import json
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+from backend.models import AnalysisRequest
+from backend.routes.analyze import read_upload_text
+from backend.services.jobs import QueueFullError, get_job_queue
+
+router = APIRouter()
+
+
+async def _submit(kind: str, payload: dict) -> JSONResponse:
+    try:
+        job_id = await get_job_queue().submit(kind, payload)
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail="İş kuyruğu dolu. Lütfen daha sonra tekrar deneyin.")
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job_id, "status": "queued", "poll_url": f"/jobs/{job_id}"},
+    )
+
+
+@router.post("/jobs/analyze")
+async def submit_analysis(request: AnalysisRequest):
+    """Queue a drug-interaction analysis and return its job id immediately."""
+    return await _submit("analyze", {
+        "age": request.age,
+        "gender": request.gender,
+        "conditions": request.conditions,
+        "current_medications": [
+            {"name": med.name, "dosage": med.dosage or "N/A"} for med in request.currentMedications
+        ],
+        "new_medications": [
+            {"name": med.name, "dosage": med.dosage or "N/A"} for med in request.newMedications
+        ],
+    })
+
+
+@router.post("/jobs/analyze/file")
+async def submit_file_analysis(
+    file: UploadFile = File(...),
+    new_medications_json: str = Form(...),
+):
+    """Queue an anamnesis-document analysis; the file is parsed now, the LLM stages run in the job."""
+    anamnesis_text, parse_info = await read_upload_text(file)
+    try:
+        new_meds_list = json.loads(new_medications_json)
+    except Exception:
+        new_meds_list = []
+
+    return await _submit("analyze_file", {
+        "filename": file.filename,
+        "anamnesis_text": anamnesis_text,
+        "parse": parse_info,
+        "new_medications": new_meds_list,
+    })
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status, per-stage timings and — once completed — the analysis result."""
+    job = await get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı veya süresi doldu.")
+    return job
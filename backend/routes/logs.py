@@ -0,0 +1,72 @@
+"""Log viewer routes — /logs, /logs/stats and /logs/{log_id}."""
+
+import asyncio
+import time
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from backend.log_store import MAX_PAGE_SIZE, LogStore
+from backend.logger import get_logger
+
+router = APIRouter()
+
+
+def _store() -> LogStore:
+    store = get_logger().store
+    if store is None:
+        raise HTTPException(status_code=503, detail="Log indeksi etkin değil.")
+    return store
+
+
+@router.get("/logs")
+async def list_logs(
+    endpoint: Optional[str] = None,
+    endpoint_prefix: Optional[str] = None,
+    status_code: Optional[int] = None,
+    errors_only: bool = False,
+    min_ms: Optional[float] = None,
+    max_ms: Optional[float] = None,
+    since: Optional[float] = Query(None, description="Unix timestamp (inclusive)"),
+    until: Optional[float] = Query(None, description="Unix timestamp (exclusive)"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+):
+    """Newest-first, cursor-paginated log summaries; pass `next_cursor` back to get the next page."""
+    store = _store()
+    try:
+        return await asyncio.to_thread(
+            store.query,
+            endpoint=endpoint,
+            endpoint_prefix=endpoint_prefix,
+            status_code=status_code,
+            errors_only=errors_only,
+            min_ms=min_ms,
+            max_ms=max_ms,
+            since=since,
+            until=until,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Geçersiz sayfa imleci.")
+
+
+@router.get("/logs/stats")
+async def log_stats(
+    hours: float = Query(24, gt=0, le=24 * 90),
+    endpoint: Optional[str] = None,
+):
+    """p50/p95 latency, request and error counts per endpoint per hour over the last `hours`."""
+    store = _store()
+    buckets = await asyncio.to_thread(store.latency_stats, time.time() - hours * 3600, None, endpoint)
+    return {"hours": hours, "buckets": buckets}
+
+
+@router.get("/logs/{log_id}")
+async def get_log(log_id: str):
+    """Full log entry (request, pipeline steps, response)."""
+    entry = await asyncio.to_thread(_store().get, log_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Log bulunamadı.")
+    return entry
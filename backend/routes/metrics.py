@@ -0,0 +1,14 @@
+"""Metrics route — /metrics in the Prometheus text exposition format."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from backend.metrics import render
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Stage latencies, upstream status codes, LLM fallbacks, cache and HTTP counters."""
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -3,7 +3,7 @@
 from fastapi import APIRouter
 
 from backend.models import PrefetchRequest
-from backend.services.openfda import prefetch_fda_data
+from backend.services.openfda import prefetch_fda_data_async
 
 router = APIRouter()
 
@@ -12,7 +12,7 @@ router = APIRouter()
 async def prefetch_medications(request: PrefetchRequest):
     """Pre-fetch FDA data for selected medications so analysis is faster."""
     try:
-        result = prefetch_fda_data(request.medications)
+        result = await prefetch_fda_data_async(request.medications)
         return {
             "success": True,
             "message": f"Prefetched {result['new_fetches']} drugs, {result['cached']} from cache",
@@ -1,14 +1,39 @@
 """
 Anamnesis document parsing and patient info extraction.
+
+Parsing is CPU-bound (pypdf, python-docx), so the async path runs it in a
+process pool with a per-document timeout; large PDFs are split into page
+ranges extracted in parallel. Structured templates are read by the rule-based
+extractor without an LLM call; otherwise extraction results are cached by the
+SHA-256 of the document text, and long documents are cut down to their
+relevant sections before they reach the LLM.
 """
 
+import asyncio
+import copy
+import hashlib
 import io
 import json
-from typing import Any, Dict
-
-from fastapi import UploadFile
+import re
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from backend.config import llm_client, LLM_MODEL
+from backend.config import (
+    ANAMNESIS_CACHE_MAX_ENTRIES,
+    ANAMNESIS_CACHE_TTL_SECONDS,
+    ANAMNESIS_PREFILTER_CHARS,
+    ANAMNESIS_RULES_MIN_CONFIDENCE,
+    DOC_PARSE_PAGES_PER_TASK,
+    DOC_PARSE_TIMEOUT_SECONDS,
+    DOC_PARSE_WORKERS,
+    LLM_MODEL,
+)
+from backend.metrics import LLM_FALLBACKS, STAGE_SECONDS
+from backend.services import llm_gateway
+from backend.services.anamnesis_rules import extract_patient_info_rules
+from backend.services.cache import SingleFlight, TTLCache
 
 try:
     import pypdf
@@ -21,33 +46,180 @@ except ImportError:
     docx = None
 
 
-def read_file_content(file: UploadFile, content: bytes) -> str:
-    """Extract text from a PDF, Word, or plain-text file."""
-    text = ""
-    filename = file.filename.lower()
+_MISSING_LIBRARY = "Error: Gerekli kütüphane yüklenemedi."
+_UNREADABLE = "Error: Dosya okunamadı."
+
+
+# ──────────────────── extraction (runs in worker processes) ────────────────────
+
+
+def _pdf_page_count(content: bytes) -> int:
+    return len(pypdf.PdfReader(io.BytesIO(content)).pages)
+
+
+def _extract_pdf_pages(content: bytes, start: int = 0, stop: Optional[int] = None) -> str:
+    reader = pypdf.PdfReader(io.BytesIO(content))
+    pages = reader.pages[start:stop]
+    return "\n".join(page.extract_text() or "" for page in pages)
+
+
+def _extract_docx(content: bytes) -> str:
+    document = docx.Document(io.BytesIO(content))
+    return "\n".join(para.text for para in document.paragraphs)
+
+
+def _document_format(filename: str) -> str:
+    filename = filename.lower()
+    if filename.endswith(".pdf"):
+        return "pdf"
+    if filename.endswith(".docx") or filename.endswith(".doc"):
+        return "docx"
+    if filename.endswith(".txt"):
+        return "txt"
+    return ""
+
+
+# ──────────────────── process pool ────────────────────
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+# Tasks of timed-out parses that were already running — each one holds a worker
+_stuck_tasks: Set[Future] = set()
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=max(1, DOC_PARSE_WORKERS))
+    return _parse_pool
+
+
+def _abandon_tasks(pool: ProcessPoolExecutor, tasks: List[Future]) -> None:
+    """
+    Give up on a timed-out parse. Its queued tasks are cancelled; running ones
+    keep their worker until they finish. Only when every worker is held by
+    such a task is the pool stuck, and only then is it recycled, so one slow
+    document does not kill other requests' parses.
+    """
+    for task in tasks:
+        # Tasks of a pool that was already recycled no longer hold a worker
+        if not task.cancel() and not task.done() and pool is _parse_pool:
+            _stuck_tasks.add(task)
+            task.add_done_callback(_stuck_tasks.discard)
+    if len(_stuck_tasks) >= max(1, DOC_PARSE_WORKERS):
+        print(f"♻️ All {len(_stuck_tasks)} parse workers stuck — recycling the pool")
+        _recycle_parse_pool()
+
+
+def _recycle_parse_pool() -> None:
+    """Replace the pool, terminating its workers (queued tasks fail with BrokenProcessPool and are retried)."""
+    global _parse_pool
+    pool, _parse_pool = _parse_pool, None
+    _stuck_tasks.clear()
+    if pool is None:
+        return
+    # A running task cannot be cancelled and the executor has no public way to
+    # stop its workers, so the private _processes map (pid → Process) is used
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_parse_pool() -> None:
+    """Stop the parser processes (called from the app lifespan)."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+
+async def _in_pool(pool: ProcessPoolExecutor, tasks: List[Future], fn, *args) -> Any:
+    """Run fn in the parse pool, recording its task so a timeout can abandon it."""
+    task = pool.submit(fn, *args)
+    tasks.append(task)
+    return await asyncio.wrap_future(task)
+
+
+async def _parse_in_pool(
+    pool: ProcessPoolExecutor,
+    doc_format: str,
+    content: bytes,
+    info: Dict[str, Any],
+    tasks: List[Future],
+) -> str:
+    if doc_format == "docx":
+        return await _in_pool(pool, tasks, _extract_docx, content)
+
+    pages = await _in_pool(pool, tasks, _pdf_page_count, content)
+    info["pages"] = pages
+    step = max(1, DOC_PARSE_PAGES_PER_TASK)
+    ranges = [(start, min(start + step, pages)) for start in range(0, pages, step)] or [(0, 0)]
+    info["tasks"] = len(ranges)
+    parts: List[str] = await asyncio.gather(*(_in_pool(pool, tasks, _extract_pdf_pages, content, a, b) for a, b in ranges))
+    return "\n".join(parts)
+
+
+async def parse_document_async(filename: str, content: bytes) -> Tuple[str, Dict[str, Any]]:
+    """
+    Extract a document's text off the event loop → (text, parse info).
+
+    PDF and Word files are parsed in the process pool, bounded by
+    DOC_PARSE_TIMEOUT_SECONDS; failures come back as text starting with
+    "Error".
+    """
+    doc_format = _document_format(filename)
+    info: Dict[str, Any] = {"format": doc_format, "bytes": len(content), "pages": None, "tasks": 1}
+    start = time.perf_counter()
 
-    try:
-        if filename.endswith(".pdf"):
-            if not pypdf:
-                return "Error: Gerekli kütüphane yüklenemedi."
-            reader = pypdf.PdfReader(io.BytesIO(content))
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
+    if doc_format == "txt":
+        try:
+            text = content.decode("utf-8").strip()
+        except UnicodeDecodeError as e:
+            print(f"File reading error: {e}")
+            text = _UNREADABLE
+    elif doc_format == "" or (doc_format == "pdf" and not pypdf) or (doc_format == "docx" and not docx):
+        text = _MISSING_LIBRARY if doc_format else ""
+    else:
+        # One retry: the pool only breaks when it was recycled because every worker was stuck
+        for attempt in range(2):
+            pool, tasks = _get_parse_pool(), []
+            try:
+                text = await asyncio.wait_for(
+                    _parse_in_pool(pool, doc_format, content, info, tasks), DOC_PARSE_TIMEOUT_SECONDS
+                )
+                text = text.strip()
+                break
+            except asyncio.TimeoutError:
+                print(f"File parsing timed out after {DOC_PARSE_TIMEOUT_SECONDS}s: {filename}")
+                _abandon_tasks(pool, tasks)
+                info["timed_out"] = True
+                text = _UNREADABLE
+                break
+            except BrokenProcessPool:
+                # Replace the pool unless another request already did
+                if _parse_pool is pool:
+                    _recycle_parse_pool()
+                text = _UNREADABLE
+            except Exception as e:
+                print(f"File reading error: {e}")
+                text = _UNREADABLE
+                break
 
-        elif filename.endswith(".docx") or filename.endswith(".doc"):
-            if not docx:
-                return "Error: Gerekli kütüphane yüklenemedi."
-            doc = docx.Document(io.BytesIO(content))
-            for para in doc.paragraphs:
-                text += para.text + "\n"
+    info["characters"] = len(text)
+    info["processing_time_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    STAGE_SECONDS.observe(info["processing_time_ms"] / 1000, stage="document_parse")
+    return text, info
 
-        elif filename.endswith(".txt"):
-            text = content.decode("utf-8")
 
-        return text.strip()
-    except Exception as e:
-        print(f"File reading error: {e}")
-        return "Error: Dosya okunamadı."
+def parse_step(info: Dict[str, Any]) -> Dict[str, Any]:
+    """Pipeline step (step 0) describing how the uploaded document was parsed."""
+    return {
+        "step": 0,
+        "name": "Document Parsing",
+        "description": "Text extraction from the uploaded anamnesis document (process pool)",
+        "input": {"format": info["format"], "bytes": info["bytes"]},
+        "output": {k: v for k, v in info.items() if k not in ("format", "bytes", "processing_time_ms")},
+        "processing_time_ms": info["processing_time_ms"],
+    }
 
 
 _EXTRACTION_PROMPT = """You are a medical AI assistant. Extract patient information from the anamnesis text.
@@ -63,19 +235,164 @@ Extract ONLY explicit current medications used by the patient.
 """
 
 
-def extract_patient_info_from_text(anamnesis_text: str) -> Dict[str, Any]:
-    """Use the LLM to extract structured patient info from free-text anamnesis."""
-    try:
-        response = llm_client.chat.completions.create(
-            model=LLM_MODEL,
-            messages=[
-                {"role": "system", "content": _EXTRACTION_PROMPT},
-                {"role": "user", "content": f"Extract info from this text:\n\n{anamnesis_text}"},
-            ],
-            temperature=0.0,
-            response_format={"type": "json_object"},
+_EXTRACTION_DEFAULTS: Dict[str, Any] = {"age": 45, "gender": "male", "conditions": [], "current_medications": []}
+
+
+# ──────────────────── relevance pre-filter ────────────────────
+
+# Headings/phrases of the sections extraction needs: demographics, diagnoses, medications
+_RELEVANT_RE = re.compile(
+    r"\b(ya[şs]|age|cinsiyet|gender|sex|erkek|kad[ıi]n|male|female|tan[ıi]\w*|te[şs]his\w*|diagnos\w*|"
+    r"hastal[ıi]k\w*|[öo]yk[üu]\w*|history|komorbid\w*|ila[çc]\w*|medication\w*|drugs?|kulland[ıi]\w*|"
+    r"tedavi\w*|re[çc]ete\w*|alerji\w*|allerg\w*)\b",
+    re.IGNORECASE,
+)
+# Medication rows: a dose with a unit, or a dosage form
+_DOSE_RE = re.compile(r"\d+(?:[.,]\d+)?\s*(?:mg|mcg|µg|g|ml|iu|ü|ünite)\b|\b(?:tb|tablet|kaps[üu]l|amp|flakon)\b", re.IGNORECASE)
+
+# Lines kept after a relevant heading (until a blank line), and always from the top (patient header)
+_SECTION_LINES = 30
+_HEADER_LINES = 10
+
+
+def _is_heading(line: str) -> bool:
+    return len(line) <= 80 and (line.endswith(":") or line.isupper())
+
+
+def select_relevant_text(anamnesis_text: str, max_chars: Optional[int] = None) -> str:
+    """
+    Cut a long anamnesis down to the lines likely to hold demographics,
+    diagnoses and medication lists, in document order.
+
+    Kept: the first lines (patient header), every section whose heading
+    matches, and any other line that matches or looks like a medication row
+    (with its neighbours). Texts up to `max_chars` are returned unchanged.
+    """
+    max_chars = ANAMNESIS_PREFILTER_CHARS if max_chars is None else max_chars
+    if max_chars <= 0 or len(anamnesis_text) <= max_chars:
+        return anamnesis_text
+
+    lines = anamnesis_text.splitlines()
+    keep = set(range(min(_HEADER_LINES, len(lines))))
+    section_end = -1
+    for i, raw in enumerate(lines):
+        line = raw.strip()
+        if not line:
+            section_end = -1
+            continue
+        if i <= section_end:
+            keep.add(i)
+            continue
+        relevant = _RELEVANT_RE.search(line)
+        if relevant and _is_heading(line):
+            keep.add(i)
+            section_end = i + _SECTION_LINES
+        elif relevant or _DOSE_RE.search(line):
+            keep.update(range(max(0, i - 1), min(len(lines), i + 2)))
+
+    selected: List[str] = []
+    size = 0
+    previous = -1
+    for i in sorted(keep):
+        line = lines[i]
+        if previous >= 0 and i != previous + 1:
+            line = "…\n" + line
+        if size + len(line) + 1 > max_chars:
+            break
+        selected.append(line)
+        size += len(line) + 1
+        previous = i
+    return "\n".join(selected)
+
+
+# ──────────────────── extraction ────────────────────
+
+# key: SHA-256 of the document text, value: extracted patient info
+EXTRACTION_CACHE = TTLCache(
+    max_entries=ANAMNESIS_CACHE_MAX_ENTRIES,
+    ttl_seconds=ANAMNESIS_CACHE_TTL_SECONDS,
+    name="anamnesis_extractions",
+)
+
+# Concurrent uploads of the same document share one extraction call
+_EXTRACTION_INFLIGHT = SingleFlight(name="anamnesis_extractions")
+
+
+def _extraction_cache_key(anamnesis_text: str) -> str:
+    return hashlib.sha256(anamnesis_text.encode("utf-8")).hexdigest()
+
+
+def _build_extraction_messages(anamnesis_text: str, hints: Optional[Dict[str, Any]] = None) -> list:
+    relevant_text = select_relevant_text(anamnesis_text)
+    if len(relevant_text) < len(anamnesis_text):
+        print(f"✂️ Anamnesis pre-filter: {len(anamnesis_text)} → {len(relevant_text)} chars")
+    user_message = f"Extract info from this text:\n\n{relevant_text}"
+    if hints:
+        user_message += (
+            "\n\nA rule-based pass already read these fields from the document "
+            "(verify them against the text, correct them if needed and fill in what is missing):\n"
+            + json.dumps(hints, ensure_ascii=False)
         )
-        return json.loads(response.choices[0].message.content)
-    except Exception as e:
-        print(f"Extraction error: {e}")
-        return {"age": 45, "gender": "male", "conditions": [], "current_medications": []}
+    return [
+        {"role": "system", "content": _EXTRACTION_PROMPT},
+        {"role": "user", "content": user_message},
+    ]
+
+
+def _rule_based_extraction(anamnesis_text: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """(result if the rule-based pass is confident enough, else None; its partial fields as LLM hints)."""
+    start = time.perf_counter()
+    hints, confidence = extract_patient_info_rules(anamnesis_text)
+    STAGE_SECONDS.observe(time.perf_counter() - start, stage="anamnesis_rules")
+    if confidence >= ANAMNESIS_RULES_MIN_CONFIDENCE:
+        print(f"⚡ Rule-based anamnesis extraction (confidence {confidence}) — skipping LLM call")
+        return {**_EXTRACTION_DEFAULTS, **hints}, hints
+    return None, hints
+
+
+def _extraction_fallback(error: Exception) -> Dict[str, Any]:
+    print(f"Extraction error: {error}")
+    LLM_FALLBACKS.inc(operation="extract")
+    return dict(_EXTRACTION_DEFAULTS)
+
+
+def _cached_extraction(key: str) -> Optional[Dict[str, Any]]:
+    cached = EXTRACTION_CACHE.get(key)
+    if cached is not None:
+        print("⚡ Anamnesis extraction cache hit — skipping LLM call")
+        return copy.deepcopy(cached)
+    return None
+
+
+async def extract_patient_info_from_text_async(anamnesis_text: str) -> Dict[str, Any]:
+    """Use the LLM to extract structured patient info from free-text anamnesis (cached per document)."""
+    extracted, hints = _rule_based_extraction(anamnesis_text)
+    if extracted is not None:
+        return extracted
+
+    key = _extraction_cache_key(anamnesis_text)
+    cached = _cached_extraction(key)
+    if cached is not None:
+        return cached
+
+    async def extract() -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            response = await llm_gateway.complete_async(
+                "extract",
+                model=LLM_MODEL,
+                messages=_build_extraction_messages(anamnesis_text, hints),
+                temperature=0.0,
+                response_format={"type": "json_object"},
+            )
+            extracted = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            # Defaults are not cached — the next upload should retry the LLM
+            return _extraction_fallback(e)
+        finally:
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage="anamnesis_extract")
+
+        EXTRACTION_CACHE.set(key, extracted)
+        return extracted
+
+    return copy.deepcopy(await _EXTRACTION_INFLIGHT.run(key, extract))
@@ -0,0 +1,175 @@
+"""
+Rule-based anamnesis extraction — the deterministic pass run before the LLM.
+
+Structured templates carry fixed fields ("Yaş:", "Cinsiyet:", "Tanılar:") and
+a medication table; regexes and a small table parser read those in
+milliseconds. The result has the same shape as the LLM extraction plus a
+confidence score: the share of the four fields that were found cleanly.
+A medication row only counts fully when its name is in the drug-name
+vocabulary and it carries a dose (unit or frequency) or sits in a table, and
+lines under a diagnosis heading only when they look like list items, so
+free-text sentences under either heading fall back to the LLM.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.services.drug_names import resolve_drug_name
+
+_AGE_RE = re.compile(r"\b(?:ya[şs][ıi]?|age)\s*[:=]\s*(\d{1,3})\b", re.IGNORECASE)
+_AGE_INLINE_RE = re.compile(r"\b(\d{1,3})\s*(?:ya[şs][ıi]nda|yaş|y/o|years? old)\b", re.IGNORECASE)
+_GENDER_RE = re.compile(
+    r"\b(?:cinsiyet[ıi]?|gender|sex)\s*[:=]\s*(erkek|kad[ıi]n|male|female|e|k|m|f)\b",
+    re.IGNORECASE,
+)
+_GENDERS = {"erkek": "male", "e": "male", "male": "male", "m": "male",
+            "kadin": "female", "k": "female", "female": "female", "f": "female"}
+
+_CONDITIONS_LABEL = r"(?:tan[ıi]lar[ıi]?|tan[ıi]s[ıi]|tan[ıi]|diagnos[ie]s|ek hastal[ıi]klar[ıi]?|hastal[ıi]klar[ıi]?|kronik hastal[ıi]klar[ıi]?|komorbiditeler)"
+_MEDICATIONS_LABEL = r"(?:(?:kulland[ıi][ğg][ıi]|mevcut|s[üu]rekli)\s+ila[çc]lar[ıi]?|ila[çc]lar[ıi]?|ila[çc] listesi|(?:current )?medications)"
+_FIELD_RE = {
+    "conditions": re.compile(rf"^\W*{_CONDITIONS_LABEL}\s*(?::|$)\s*(.*)$", re.IGNORECASE),
+    "medications": re.compile(rf"^\W*{_MEDICATIONS_LABEL}\s*(?::|$)\s*(.*)$", re.IGNORECASE),
+}
+# Any other "Label:" line ends the current section (labels carry no digits, dose rows do)
+_ANY_LABEL_RE = re.compile(r"^\W*[^\W\d][^:\d]{1,40}:")
+
+_NONE_RE = re.compile(r"^(?:yok|none|-|—|bilinmiyor|belirtilmemi[şs])\.?$", re.IGNORECASE)
+_BULLET_RE = re.compile(r"^\s*(?:[-•*·▪]|\d{1,2}[.)])\s*")
+_ICD_RE = re.compile(r"^\(?[A-TV-Z]\d{2}(?:\.\d{1,2})?\)?\s*[-–:]?\s*")
+# An unmarked diagnosis line is a short phrase, not a sentence ("Tip 2 diabetes mellitus")
+_CONDITION_MAX_WORDS = 5
+_SENTENCE_MARKS_RE = re.compile(r"[,;]|[.!?]$")
+_TABLE_SPLIT_RE = re.compile(r"\s*\|\s*|\t+|\s{2,}")
+_TABLE_HEADER_RE = re.compile(r"^(?:ila[çc](?: ad[ıi])?|drug|medication|name)$", re.IGNORECASE)
+# Drug name, then a dose starting with a number ("Coumadin 5 mg 1x1", "Metformin 1000mg")
+_MED_ROW_RE = re.compile(r"^(?P<name>[^\W\d][\w\-.'/ ]*?)\s*(?P<dosage>\d.*)?$")
+# A strength with a unit ("5 mg", "0,5mcg", "10 IU") or a frequency ("1x1", "2 × 1")
+_DOSE_RE = re.compile(
+    r"\d+(?:[.,]\d+)?\s*(?:mg|mcg|µg|μg|g|ml|iu|ü|[üu]nite|units?|meq|mmol|%|damla|drops?|puf+s?)(?!\w)"
+    r"|\b\d\s*[x×]\s*\d\b",
+    re.IGNORECASE,
+)
+
+# Field weights for the confidence score
+_WEIGHTS = {"age": 0.25, "gender": 0.2, "conditions": 0.25, "current_medications": 0.3}
+
+
+def _split_list(value: str) -> List[str]:
+    return [item.strip() for item in re.split(r"[,;]", value) if item.strip()]
+
+
+def _clean_item(item: str) -> str:
+    return _ICD_RE.sub("", _BULLET_RE.sub("", item)).strip(" .")
+
+
+def _is_none(value: str) -> bool:
+    return bool(_NONE_RE.match(value.strip()))
+
+
+def _is_condition_row(row: str) -> bool:
+    """A line following the diagnosis label: a bullet, an ICD-coded entry or a short comma-free phrase."""
+    if _BULLET_RE.match(row) or _ICD_RE.match(row):
+        return True
+    return len(row.split()) <= _CONDITION_MAX_WORDS and not _SENTENCE_MARKS_RE.search(row)
+
+
+def _sections(lines: List[str]) -> Dict[str, Tuple[str, List[str]]]:
+    """field → (inline value after the label, following lines until a blank line or another label)."""
+    found: Dict[str, Tuple[str, List[str]]] = {}
+    current: Optional[str] = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            current = None
+            continue
+        field = next((name for name, regex in _FIELD_RE.items() if regex.match(stripped)), None)
+        if field:
+            current = field
+            found.setdefault(field, (_FIELD_RE[field].match(stripped).group(1).strip(), []))
+        elif _ANY_LABEL_RE.match(stripped):
+            current = None
+        elif current:
+            found[current][1].append(stripped)
+    return found
+
+
+def _cells(row: str) -> List[str]:
+    return [cell for cell in _TABLE_SPLIT_RE.split(_BULLET_RE.sub("", row).strip()) if cell]
+
+
+def _is_table_header(row: str) -> bool:
+    cells = _cells(row)
+    return bool(cells) and bool(_TABLE_HEADER_RE.match(cells[0]))
+
+
+def _medication_credit(row: str, med: Dict[str, str]) -> float:
+    """Half for a name the drug-name vocabulary knows, half for a dose unit/frequency or a table row."""
+    credit = 0.0
+    if resolve_drug_name(med["name"])["match"] != "unresolved":
+        credit += 0.5
+    if _DOSE_RE.search(med["dosage"]) or len(_cells(row)) > 1:
+        credit += 0.5
+    return credit
+
+
+def _parse_medication(row: str) -> Optional[Dict[str, str]]:
+    """One medication-table row or list item → {"name", "dosage"}; None if it does not parse."""
+    cells = _cells(row)
+    match = _MED_ROW_RE.match(cells[0]) if cells else None
+    if not match:
+        return None
+    name = match.group("name").strip(" -.")
+    if len(name) < 2:
+        return None
+    dosage = " ".join(part.strip() for part in [match.group("dosage") or "", *cells[1:]] if part.strip())
+    return {"name": name, "dosage": dosage or "N/A"}
+
+
+def extract_patient_info_rules(anamnesis_text: str) -> Tuple[Dict[str, Any], float]:
+    """
+    Deterministic extraction → (patient info, confidence in [0, 1]).
+
+    Fields that were not found are left out of the dict, so it can be passed
+    to the LLM as hints or, when confidence is high, used as the result.
+    """
+    info: Dict[str, Any] = {}
+    confidence = 0.0
+
+    match = _AGE_RE.search(anamnesis_text) or _AGE_INLINE_RE.search(anamnesis_text)
+    if match and 0 < int(match.group(1)) < 120:
+        info["age"] = int(match.group(1))
+        confidence += _WEIGHTS["age"]
+
+    match = _GENDER_RE.search(anamnesis_text)
+    if match:
+        info["gender"] = _GENDERS[match.group(1).lower().replace("ı", "i")]
+        confidence += _WEIGHTS["gender"]
+
+    sections = _sections(anamnesis_text.splitlines())
+
+    if "conditions" in sections:
+        inline, rows = sections["conditions"]
+        listed = [row for row in rows if _is_condition_row(row)]
+        items = [_clean_item(item) for item in _split_list(inline) + [i for row in listed for i in _split_list(row)]]
+        info["conditions"] = [item for item in items if item and not _is_none(item)]
+        # An explicit "yok" counts as found; an empty heading does not. Prose lines
+        # (symptoms, history) are left out and lower the score proportionally
+        if info["conditions"] or any(_is_none(item) for item in items):
+            entries = (1 if inline else 0) + len(rows)
+            confidence += _WEIGHTS["conditions"] * ((1 if inline else 0) + len(listed)) / max(1, entries)
+
+    if "medications" in sections:
+        inline, rows = sections["medications"]
+        candidates = [row for row in _split_list(inline) + rows if not _is_table_header(row)]
+        listed = [row for row in candidates if not _is_none(row)]
+        parsed = [(row, _parse_medication(row)) for row in listed]
+        info["current_medications"] = [med for _, med in parsed if med]
+        if listed:
+            # Rows that did not parse, unknown names and rows without a dose lower the score proportionally
+            credit = sum(_medication_credit(row, med) for row, med in parsed if med)
+            confidence += _WEIGHTS["current_medications"] * credit / len(listed)
+        elif candidates:
+            confidence += _WEIGHTS["current_medications"]
+
+    return info, round(confidence, 3)
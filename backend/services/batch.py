@@ -0,0 +1,93 @@
+"""
+Batch analysis service — ward-wide medication reviews in one request.
+
+Labels for the union of every patient's drugs are fetched once up front
+(batched OpenFDA queries into the shared label cache); per-patient LLM
+evaluations then run concurrently under ANALYSIS_BATCH_CONCURRENCY and are
+reported as each one finishes.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+from backend.config import ANALYSIS_BATCH_CONCURRENCY
+from backend.services.llm import analyze_with_openai_agent_async
+from backend.services.openfda import prefetch_fda_data_async
+
+
+def _medication_dicts(medications: List[Any]) -> List[Dict[str, str]]:
+    return [{"name": med.name, "dosage": med.dosage or "N/A"} for med in medications]
+
+
+async def analyze_batch_stream(
+    patients: List[Any],
+    concurrency: int = ANALYSIS_BATCH_CONCURRENCY,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Analyse many patients (BatchAnalysisItem models), yielding events:
+      {"event": "batch_started", ...}   after the shared label prefetch
+      {"event": "patient", ...}         one per patient, in completion order
+      {"event": "batch_complete", ...}
+    """
+    start = time.time()
+
+    # 1. One label fetch for the union of all drugs
+    unique_drugs = list(dict.fromkeys(
+        med.name.strip()
+        for patient in patients
+        for med in list(patient.currentMedications) + list(patient.newMedications)
+        if med.name and med.name.strip()
+    ))
+    print(f"📋 Batch: {len(patients)} patients, {len(unique_drugs)} unique drugs")
+    prefetch = await prefetch_fda_data_async(unique_drugs) if unique_drugs else {"cached": 0, "new_fetches": 0}
+
+    yield {
+        "event": "batch_started",
+        "patients": len(patients),
+        "unique_drugs": len(unique_drugs),
+        "labels_cached": prefetch["cached"],
+        "labels_fetched": prefetch["new_fetches"],
+        "openfda_ms": round((time.time() - start) * 1000, 2),
+    }
+
+    # 2. Per-patient evaluations — OpenFDA reads now hit the cache
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index: int, patient: Any) -> Dict[str, Any]:
+        async with semaphore:
+            t0 = time.time()
+            event = {"event": "patient", "index": index, "patient_id": patient.patient_id}
+            try:
+                event["result"] = await analyze_with_openai_agent_async(
+                    age=patient.age,
+                    gender=patient.gender,
+                    conditions=patient.conditions,
+                    current_medications=_medication_dicts(patient.currentMedications),
+                    new_medications=_medication_dicts(patient.newMedications),
+                )
+            except Exception as e:
+                print(f"Batch analysis error for patient {index}: {e}")
+                event["error"] = str(e)
+            event["processing_time_ms"] = round((time.time() - t0) * 1000, 2)
+            return event
+
+    tasks = [asyncio.ensure_future(run(i, patient)) for i, patient in enumerate(patients)]
+    failed = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            event = await next_done
+            failed += "error" in event
+            yield event
+    finally:
+        # Client went away — stop the evaluations still waiting for a slot
+        for task in tasks:
+            task.cancel()
+
+    yield {
+        "event": "batch_complete",
+        "patients": len(patients),
+        "succeeded": len(patients) - failed,
+        "failed": failed,
+        "processing_time_ms": round((time.time() - start) * 1000, 2),
+    }
@@ -0,0 +1,132 @@
+"""
+Bounded in-memory cache — LRU eviction, per-entry TTL, and hit/miss statistics —
+plus single-flight coalescing for concurrent async calls.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+# Live instances, read by /metrics at scrape time
+_CACHES: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+_FLIGHTS: "weakref.WeakSet[SingleFlight]" = weakref.WeakSet()
+
+
+def registered_caches() -> List["TTLCache"]:
+    return list(_CACHES)
+
+
+def registered_flights() -> List["SingleFlight"]:
+    return list(_FLIGHTS)
+
+
+class TTLCache:
+    """Thread-safe LRU cache with an entry budget and per-entry expiry."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, name: str = "cache"):
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        _CACHES.add(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value (refreshing its LRU position) or `default`."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Insert or replace an entry, evicting the least recently used ones over budget."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of size and counters for /prefetch, pipeline logs and monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SingleFlight:
+    """Coalesce concurrent async calls for the same key into one in-flight call."""
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._inflight: Dict[Hashable, "asyncio.Task"] = {}
+        self.calls = 0
+        self.coalesced = 0
+        _FLIGHTS.add(self)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    def start(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> "asyncio.Task":
+        """
+        Return the task running for `key`, starting `fn()` if there is none.
+        Never awaits, so callers can register several keys atomically.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return task
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `fn()` — or the identical call already running for `key`."""
+        # Shielded so one cancelled caller does not cancel the call others are waiting on
+        return await asyncio.shield(self.start(key, fn))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "in_flight": len(self._inflight), "calls": self.calls, "coalesced": self.coalesced}
@@ -3,9 +3,12 @@ Chat service — streaming and non-streaming follow-up Q&A over analysis results
 """
 
 import json
-from typing import Any, Dict, List
+import time
+from typing import Any, AsyncIterator, Dict, List
 
-from backend.config import llm_client, LLM_MODEL
+from backend.config import LLM_CHAT_TIMEOUT_SECONDS, LLM_MODEL, LLM_PROMPT_CACHING
+from backend.metrics import LLM_FALLBACKS, STAGE_SECONDS
+from backend.services import llm_gateway
 
 CHAT_SYSTEM_PROMPT = """Sen uzman bir klinik eczacısın. Görevin doktorun sorularına KISA, ÖZ ve NET cevaplar vermek.
 
@@ -18,46 +21,67 @@ KURALLAR:
 6. Üslubun profesyonel ama direkt olsun. "Merhaba", "Tabii ki" gibi giriş kelimelerini kullanma.
 """
 
+# Returned instead of a model reply when the LLM call fails
+CHAT_FALLBACK_REPLY = "Üzgünüm, şu anda cevap veremiyorum."
 
-def _build_messages(
-    message: str,
-    context: Dict[str, Any],
-    patient_info: Dict[str, Any],
-    history: List[Dict[str, str]],
-) -> list:
-    """Build the message list shared by streaming and non-streaming paths."""
-    context_str = json.dumps(context, indent=2, ensure_ascii=False)
-    patient_str = json.dumps(patient_info, indent=2, ensure_ascii=False)
 
-    messages = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
+def _cacheable(text: str) -> Any:
+    """Message content marked as a prompt-cache breakpoint (plain text if caching is off)."""
+    if not LLM_PROMPT_CACHING:
+        return text
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
 
-    messages.append({
-        "role": "user",
-        "content": (
-            f"BAĞLAM BİLGİLERİ:\n\n"
-            f"HASTA BİLGİSİ:\n{patient_str}\n\n"
-            f"MEVCUT ANALİZ SONUCU:\n{context_str}\n\n"
-            f"Bu bağlamı kullanarak soruları cevapla."
-        ),
-    })
 
-    for msg in history:
-        messages.append({"role": msg["role"], "content": msg["content"]})
+def build_prompt_prefix(context: Dict[str, Any], patient_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    System prompt + analysis context, built once per chat session.
 
+    Compact JSON keeps the prefix small, and since it never changes within a
+    session, providers with prompt caching serve it from cache after the first turn.
+    """
+    context_str = json.dumps(context, ensure_ascii=False, separators=(",", ":"))
+    patient_str = json.dumps(patient_info, ensure_ascii=False, separators=(",", ":"))
+
+    return [
+        {"role": "system", "content": _cacheable(CHAT_SYSTEM_PROMPT)},
+        {
+            "role": "user",
+            "content": _cacheable(
+                f"BAĞLAM BİLGİLERİ:\n\n"
+                f"HASTA BİLGİSİ:\n{patient_str}\n\n"
+                f"MEVCUT ANALİZ SONUCU:\n{context_str}\n\n"
+                f"Bu bağlamı kullanarak soruları cevapla."
+            ),
+        },
+    ]
+
+
+def _build_messages(
+    prefix: List[Dict[str, Any]],
+    history: List[Dict[str, str]],
+    message: str,
+) -> list:
+    """Build the message list shared by streaming and non-streaming paths."""
+    messages = list(prefix)
+    messages += [{"role": msg["role"], "content": msg["content"]} for msg in history]
+    if history:
+        # Moving breakpoint: the next turn reuses the cached conversation up to here
+        messages[-1] = {"role": messages[-1]["role"], "content": _cacheable(messages[-1]["content"])}
     messages.append({"role": "user", "content": message})
     return messages
 
 
-def chat_with_analysis(
-    message: str,
-    context: Dict[str, Any],
-    patient_info: Dict[str, Any],
+async def chat_with_analysis(
+    prefix: List[Dict[str, Any]],
     history: List[Dict[str, str]],
+    message: str,
 ) -> str:
     """Non-streaming chat (returns full response at once)."""
     try:
-        messages = _build_messages(message, context, patient_info, history)
-        response = llm_client.chat.completions.create(
+        messages = _build_messages(prefix, history, message)
+        response = await llm_gateway.complete_async(
+            "chat",
+            timeout=LLM_CHAT_TIMEOUT_SECONDS,
             model=LLM_MODEL,
             messages=messages,
             temperature=0.3,
@@ -66,28 +90,44 @@ def chat_with_analysis(
         return response.choices[0].message.content
     except Exception as e:
         print(f"Chat error: {e}")
-        return "Üzgünüm, şu anda cevap veremiyorum."
+        LLM_FALLBACKS.inc(operation="chat")
+        return CHAT_FALLBACK_REPLY
 
 
-def chat_with_analysis_stream(
-    message: str,
-    context: Dict[str, Any],
-    patient_info: Dict[str, Any],
+async def chat_with_analysis_stream(
+    prefix: List[Dict[str, Any]],
     history: List[Dict[str, str]],
-):
-    """Streaming chat — yields text chunks as they arrive from the LLM."""
+    message: str,
+) -> AsyncIterator[str]:
+    """
+    Streaming chat — yields text chunks as they arrive from the LLM.
+
+    Closing the generator (or cancelling the task iterating it) closes the
+    upstream response, so an abandoned chat stops generating tokens at once.
+    """
+    start = time.perf_counter()
+    first_token = True
+    stream = None
     try:
-        messages = _build_messages(message, context, patient_info, history)
-        stream = llm_client.chat.completions.create(
+        messages = _build_messages(prefix, history, message)
+        stream = await llm_gateway.stream_async(
+            "chat_stream",
+            timeout=LLM_CHAT_TIMEOUT_SECONDS,
             model=LLM_MODEL,
             messages=messages,
             temperature=0.3,
             max_tokens=300,
-            stream=True,
         )
-        for chunk in stream:
+        async for chunk in stream:
             if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                if first_token:
+                    STAGE_SECONDS.observe(time.perf_counter() - start, stage="chat_ttft")
+                    first_token = False
                 yield chunk.choices[0].delta.content
     except Exception as e:
         print(f"Chat stream error: {e}")
-        yield "Üzgünüm, şu anda cevap veremiyorum."
+        LLM_FALLBACKS.inc(operation="chat_stream")
+        yield CHAT_FALLBACK_REPLY
+    finally:
+        if stream is not None:
+            await stream.close()
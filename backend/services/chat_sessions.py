@@ -0,0 +1,57 @@
+"""
+Chat sessions — the analysis context is registered once, later turns send only the message.
+
+A session holds the prompt prefix (system prompt + serialized patient/analysis
+context) built on the first turn, and the conversation so far. The prefix is
+byte-identical on every turn, which is what lets provider prompt caching reuse
+it. Sessions live in a TTLCache: idle ones expire, and the entry budget bounds
+memory; the client re-registers its context when its session is gone.
+"""
+
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+
+from backend.config import CHAT_SESSION_MAX_ENTRIES, CHAT_SESSION_MAX_MESSAGES, CHAT_SESSION_TTL_SECONDS
+from backend.services.cache import TTLCache
+
+
+class ChatSession:
+    """Prompt prefix plus the conversation history of one analysis chat."""
+
+    def __init__(self, prefix: List[Dict[str, Any]], history: List[Dict[str, str]]):
+        self.session_id = uuid.uuid4().hex
+        self.prefix = prefix
+        self.history: List[Dict[str, str]] = [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in history
+            if msg.get("role") in ("user", "assistant") and msg.get("content")
+        ][-CHAT_SESSION_MAX_MESSAGES:]
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> List[Dict[str, str]]:
+        with self._lock:
+            return list(self.history)
+
+    def record_turn(self, message: str, reply: str) -> None:
+        """Append a completed question/answer pair, keeping the newest messages."""
+        with self._lock:
+            self.history += [{"role": "user", "content": message}, {"role": "assistant", "content": reply}]
+            del self.history[:-CHAT_SESSION_MAX_MESSAGES]
+
+
+SESSIONS = TTLCache(CHAT_SESSION_MAX_ENTRIES, CHAT_SESSION_TTL_SECONDS, name="chat_sessions")
+
+
+def create_session(prefix: List[Dict[str, Any]], history: List[Dict[str, str]]) -> ChatSession:
+    session = ChatSession(prefix, history)
+    SESSIONS.set(session.session_id, session)
+    return session
+
+
+def get_session(session_id: str) -> Optional[ChatSession]:
+    """The live session, with its expiry pushed back; None if unknown or expired."""
+    session = SESSIONS.get(session_id)
+    if session is not None:
+        SESSIONS.set(session_id, session)
+    return session
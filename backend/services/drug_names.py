@@ -0,0 +1,368 @@
+"""
+Drug-name resolution — maps user-typed names (Turkish brands, typos, salt
+forms, dosage suffixes) to the generic name OpenFDA indexes, with a
+confidence score.
+
+Lookup order: exact generic → local synonym/brand → salt-stripped. Only those
+matches replace the typed name. Anything else is searched under the name as
+typed; close spellings (trigram candidates + bounded edit distance) are
+returned as suggestions only, since neighbouring names are often different
+drugs (prednisone/prednisolone, fosinopril/lisinopril). Results are
+memoized, so repeat names resolve in microseconds.
+"""
+
+import re
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.config import DRUG_NAME_MIN_CONFIDENCE
+from backend.services.label_index import get_label_index
+
+_TURKISH_FOLD = str.maketrans({"ı": "i", "İ": "i", "ş": "s", "Ş": "s", "ç": "c", "Ç": "c",
+                                "ğ": "g", "Ğ": "g", "ö": "o", "Ö": "o", "ü": "u", "Ü": "u"})
+_NON_WORD = re.compile(r"[^\w\s]|_")
+_HAS_DIGIT = re.compile(r"\d")
+
+
+def _fold(name: str) -> str:
+    """Fold Turkish letters to ASCII so "kapsül" and "kapsul" match."""
+    return name.translate(_TURKISH_FOLD).lower()
+
+
+# Local-market brands and Turkish spellings → US generic name
+_LOCAL_SYNONYMS: Dict[str, str] = {
+    # Turkish generic spellings
+    "paracetamol": "acetaminophen",
+    "parasetamol": "acetaminophen",
+    "asetaminofen": "acetaminophen",
+    "adrenalin": "epinephrine",
+    "kloramfenikol": "chloramphenicol",
+    "asetilsalisilik asit": "aspirin",
+    "varfarin": "warfarin",
+    "amlodipin": "amlodipine",
+    "omeprazol": "omeprazole",
+    "pantoprazol": "pantoprazole",
+    "lansoprazol": "lansoprazole",
+    "esomeprazol": "esomeprazole",
+    "furosemid": "furosemide",
+    "digoksin": "digoxin",
+    "amiodaron": "amiodarone",
+    "klopidogrel": "clopidogrel",
+    "levotiroksin": "levothyroxine",
+    "karbamazepin": "carbamazepine",
+    "flukonazol": "fluconazole",
+    "metronidazol": "metronidazole",
+    "azitromisin": "azithromycin",
+    "klaritromisin": "clarithromycin",
+    "siprofloksasin": "ciprofloxacin",
+    "amoksisilin": "amoxicillin",
+    "diklofenak": "diclofenac",
+    "naproksen": "naproxen",
+    "sertralin": "sertraline",
+    "essitalopram": "escitalopram",
+    "fluoksetin": "fluoxetine",
+    "ketiapin": "quetiapine",
+    "prednizolon": "prednisolone",
+    "metilprednizolon": "methylprednisolone",
+    "spironolakton": "spironolactone",
+    "hidroklorotiyazid": "hydrochlorothiazide",
+    "tramadol hidroklorür": "tramadol",
+    # Turkish market brands
+    "parol": "acetaminophen",
+    "minoset": "acetaminophen",
+    "tylol": "acetaminophen",
+    "calpol": "acetaminophen",
+    "coraspin": "aspirin",
+    "ecopirin": "aspirin",
+    "majezik": "flurbiprofen",
+    "arveles": "dexketoprofen",
+    "dolorex": "diclofenac",
+    "voltaren": "diclofenac",
+    "apranax": "naproxen",
+    "nurofen": "ibuprofen",
+    "brufen": "ibuprofen",
+    "pedifen": "ibuprofen",
+    "coumadin": "warfarin",
+    "glifor": "metformin",
+    "glucophage": "metformin",
+    "matofin": "metformin",
+    "beloc": "metoprolol",
+    "concor": "bisoprolol",
+    "norvasc": "amlodipine",
+    "lipitor": "atorvastatin",
+    "ator": "atorvastatin",
+    "crestor": "rosuvastatin",
+    "plavix": "clopidogrel",
+    "lansor": "lansoprazole",
+    "nexium": "esomeprazole",
+    "losec": "omeprazole",
+    "controloc": "pantoprazole",
+    "augmentin": "amoxicillin and clavulanate potassium",
+    "klamoks": "amoxicillin and clavulanate potassium",
+    "cipro": "ciprofloxacin",
+    "desal": "furosemide",
+    "lasix": "furosemide",
+    "coversyl": "perindopril",
+    "delix": "ramipril",
+    "lustral": "sertraline",
+    "cipralex": "escitalopram",
+    "xanax": "alprazolam",
+    "euthyrox": "levothyroxine",
+    "levotiron": "levothyroxine",
+    "eliquis": "apixaban",
+    "xarelto": "rivaroxaban",
+    "pradaxa": "dabigatran",
+    "diovan": "valsartan",
+    "atacand": "candesartan",
+    "lyrica": "pregabalin",
+    "neurontin": "gabapentin",
+    "zyrtec": "cetirizine",
+    "aerius": "desloratadine",
+    "deltacortril": "prednisolone",
+    "prednol": "methylprednisolone",
+    "dideral": "propranolol",
+    "isoptin": "verapamil",
+    "lanoxin": "digoxin",
+    "cordarone": "amiodarone",
+    "prozac": "fluoxetine",
+    "seroquel": "quetiapine",
+    "risperdal": "risperidone",
+    "tegretol": "carbamazepine",
+    "depakin": "valproic acid",
+    "klacid": "clarithromycin",
+    "zitromax": "azithromycin",
+    "flagyl": "metronidazole",
+    "diflucan": "fluconazole",
+}
+
+# Common generics known without an offline snapshot
+_BUILTIN_GENERICS: Set[str] = set(_LOCAL_SYNONYMS.values()) | {
+    "ibuprofen", "metformin", "lisinopril", "enalapril", "losartan", "metoprolol",
+    "atorvastatin", "simvastatin", "pravastatin", "insulin glargine", "glipizide",
+    "gliclazide", "sitagliptin", "empagliflozin", "dapagliflozin", "hydrochlorothiazide",
+    "tramadol", "morphine", "oxycodone", "codeine", "sildenafil", "tadalafil",
+    "allopurinol", "colchicine", "methotrexate", "lithium", "phenytoin", "theophylline",
+    "trimethoprim", "sulfamethoxazole", "doxycycline", "cephalexin", "ketoconazole",
+    "itraconazole", "erythromycin", "rifampin", "tamsulosin", "finasteride", "ondansetron",
+    "metoclopramide", "ranitidine", "famotidine", "citalopram", "paroxetine", "venlafaxine",
+    "duloxetine", "amitriptyline", "mirtazapine", "haloperidol", "olanzapine", "diazepam",
+    "lorazepam", "clonazepam", "zolpidem", "levetiracetam", "lamotrigine", "topiramate",
+    "montelukast", "salbutamol", "albuterol", "fexofenadine", "loratadine", "ticagrelor",
+    "heparin", "enoxaparin", "nitroglycerin", "diltiazem", "nifedipine", "carvedilol",
+    "atenolol", "bisoprolol", "indapamide", "torsemide", "potassium chloride",
+}
+
+# Trailing salt / ester forms that OpenFDA generic names usually omit
+_SALT_WORDS = {_fold(w) for w in (
+    "hydrochloride", "hcl", "hidroklorür", "hidroklorur", "sodium", "sodyum", "potassium",
+    "potasyum", "calcium", "kalsiyum", "magnesium", "magnezyum", "maleate", "maleat",
+    "besylate", "besilate", "besilat", "mesylate", "mesilat", "tartrate", "tartarat",
+    "succinate", "süksinat", "sulfate", "sulphate", "sülfat", "phosphate", "fosfat",
+    "citrate", "sitrat", "fumarate", "fumarat", "acetate", "asetat", "bromide", "bromür",
+    "dihydrate", "monohydrate", "trihydrate", "hyclate", "hemihydrate", "disodium",
+)}
+
+# Dosage-form and strength tokens stripped before matching ("Parol 500 mg tablet")
+_FORM_WORDS = {_fold(w) for w in (
+    "mg", "mcg", "µg", "g", "ml", "iu", "ü", "tablet", "tablets", "tb", "tab", "tabs",
+    "film", "kaplı", "kapli", "coated", "kapsül", "kapsul", "capsule", "capsules", "cap",
+    "şurup", "surup", "syrup", "süspansiyon", "suspension", "ampul", "ampül", "flakon",
+    "injection", "enjeksiyon", "efervesan", "effervescent", "retard", "sr", "xr", "er",
+    "cr", "mr", "la", "fort", "forte", "plus", "damla", "drops", "krem", "cream", "jel", "gel",
+)}
+
+_CONFIDENCE = {"exact": 1.0, "synonym": 0.98, "brand": 0.97, "salt": 0.95}
+_MAX_SUGGESTIONS = 3
+
+
+def _normalize(name: str) -> str:
+    """Fold, drop punctuation, strength and dosage-form tokens."""
+    tokens = _NON_WORD.sub(" ", _fold(name)).split()
+    kept = [t for t in tokens if t not in _FORM_WORDS and not _HAS_DIGIT.search(t)]
+    return " ".join(kept or tokens)
+
+
+def _strip_salts(name: str) -> str:
+    tokens = [t for t in name.split() if t not in _SALT_WORDS]
+    return " ".join(tokens) if tokens else name
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_distance(length: int) -> int:
+    if length <= 4:
+        return 0
+    if length <= 6:
+        return 1
+    if length <= 10:
+        return 2
+    return 3
+
+
+def _bounded_edit_distance(a: str, b: str, max_dist: int) -> int:
+    """Optimal-string-alignment distance, abandoning early once it exceeds max_dist."""
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+            row_min = min(row_min, cur[j])
+        if row_min > max_dist:
+            return max_dist + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class DrugNameResolver:
+    """In-memory name index: exact/synonym dictionary plus a trigram index for fuzzy matches."""
+
+    def __init__(self, names: Iterable[Tuple[str, str, str]], authoritative: bool = False):
+        """
+        Args:
+            names: (name, kind, generic) triples; kind is "generic", "synonym" or "brand".
+            authoritative: True when the vocabulary covers the whole label corpus,
+                so unresolved names can be skipped without an upstream call.
+        """
+        self.authoritative = authoritative
+        self._terms: Dict[str, Tuple[str, str]] = {}
+        self._grams: Dict[str, List[str]] = defaultdict(list)
+
+        for name, kind, generic in names:
+            key = _fold(name)
+            # Keep the strongest mapping when a name appears under several kinds
+            if key in self._terms and self._terms[key][1] == "generic":
+                continue
+            self._terms[key] = (generic, kind)
+
+        for term in self._terms:
+            for gram in _trigrams(term):
+                self._grams[gram].append(term)
+
+        self.resolve = lru_cache(maxsize=4096)(self._resolve)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def _lookup(self, key: str) -> Optional[Tuple[str, str]]:
+        hit = self._terms.get(key)
+        if hit is None:
+            return None
+        generic, kind = hit
+        return generic, "exact" if kind == "generic" else kind
+
+    def _fuzzy(self, key: str) -> List[Tuple[str, int]]:
+        """Vocabulary terms within the length-scaled edit distance, closest first."""
+        max_dist = _max_distance(len(key))
+        if max_dist == 0:
+            return []
+
+        grams = _trigrams(key)
+        counts: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for term in self._grams.get(gram, ()):
+                counts[term] += 1
+
+        # q-gram lemma: each edit destroys at most 3 trigrams
+        min_shared = max(1, len(grams) - 3 * max_dist)
+        matches: List[Tuple[str, int]] = []
+        for term, shared in counts.items():
+            if shared < min_shared:
+                continue
+            dist = _bounded_edit_distance(key, term, max_dist)
+            if dist <= max_dist:
+                matches.append((term, dist))
+        return sorted(matches, key=lambda m: (m[1], m[0]))
+
+    def _suggestions(self, key: str) -> List[Dict[str, Any]]:
+        """Generic names the input may be a misspelling of — never substituted for it."""
+        suggestions: List[Dict[str, Any]] = []
+        for term, dist in self._fuzzy(key):
+            confidence = round(1.0 - dist / max(len(key), len(term)), 3)
+            generic = self._terms[term][0]
+            if confidence >= DRUG_NAME_MIN_CONFIDENCE and all(s["name"] != generic for s in suggestions):
+                suggestions.append({"name": generic, "confidence": confidence})
+            if len(suggestions) == _MAX_SUGGESTIONS:
+                break
+        return suggestions
+
+    def _resolve(self, name: str) -> Dict[str, Any]:
+        key = _normalize(name)
+
+        hit = self._lookup(key)
+        if hit is None:
+            stripped = _strip_salts(key)
+            hit = self._lookup(stripped)
+            if hit is not None:
+                hit = (hit[0], "salt")
+            else:
+                key = stripped
+
+        if hit is not None:
+            generic, match = hit
+            return {"input": name, "resolved": generic, "confidence": _CONFIDENCE[match], "match": match}
+
+        # Unknown name: look it up exactly as typed and only offer close spellings
+        return {
+            "input": name,
+            "resolved": name.strip(),
+            "confidence": 0.0,
+            "match": "unresolved",
+            "suggestions": self._suggestions(key),
+        }
+
+    def resolve_many(self, names: Iterable[str]) -> List[Dict[str, Any]]:
+        """Resolve a whole regimen; duplicate names share one memoized result."""
+        return [self.resolve(name) for name in names]
+
+    def should_query_upstream(self, resolution: Dict[str, Any]) -> bool:
+        """Unresolved names are only worth a network call if our vocabulary is incomplete."""
+        return resolution["match"] != "unresolved" or not self.authoritative
+
+
+# --------------- Global singleton ---------------
+
+_resolver: Optional[DrugNameResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def _vocabulary() -> Iterable[Tuple[str, str, str]]:
+    for generic in _BUILTIN_GENERICS:
+        yield generic, "generic", generic
+    for name, generic in _LOCAL_SYNONYMS.items():
+        yield name, "synonym", generic
+    index = get_label_index()
+    if index:
+        yield from index.iter_names()
+
+
+def get_drug_name_resolver() -> DrugNameResolver:
+    """Return the shared resolver, building its index on first use."""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = DrugNameResolver(_vocabulary(), authoritative=get_label_index() is not None)
+                print(f"🔤 Drug-name index ready: {len(_resolver)} names")
+    return _resolver
+
+
+def resolve_drug_name(name: str) -> Dict[str, Any]:
+    """Resolve one drug name → {"input", "resolved", "confidence", "match"} (+ "suggestions" when unresolved)."""
+    return get_drug_name_resolver().resolve(name)
+
+
+def resolve_drug_names(names: Iterable[str]) -> List[Dict[str, Any]]:
+    """Batch-resolve a regimen."""
+    return get_drug_name_resolver().resolve_many(names)
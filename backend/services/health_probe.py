@@ -0,0 +1,160 @@
+"""
+Background health prober — upstream checks off the request path.
+
+A single task probes OpenFDA and the LLM endpoint every
+HEALTH_PROBE_INTERVAL_SECONDS and keeps the last HEALTH_PROBE_WINDOW results
+per upstream. /health reads that state instead of calling OpenFDA itself,
+so orchestrator probes cost no upstream traffic and never wait on the network.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+from backend.config import (
+    FAL_KEY,
+    HEALTH_PROBE_INTERVAL_SECONDS,
+    HEALTH_PROBE_TIMEOUT_SECONDS,
+    HEALTH_PROBE_WINDOW,
+    LLM_BASE_URL,
+    LLM_HEADERS,
+    OPENFDA_BASE_URL,
+    OPENFDA_OFFLINE,
+)
+from backend.metrics import register_collector
+
+
+class ProbeHistory:
+    """Rolling results of one upstream's probes."""
+
+    def __init__(self, window: int):
+        # (unix time, ok, latency ms, error)
+        self._results: Deque[Tuple[float, bool, float, Optional[str]]] = deque(maxlen=max(1, window))
+        self.consecutive_failures = 0
+
+    def record(self, ok: bool, latency_ms: float, error: Optional[str] = None) -> None:
+        self._results.append((time.time(), ok, latency_ms, error))
+        self.consecutive_failures = 0 if ok else self.consecutive_failures + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        results = list(self._results)
+        if not results:
+            return {"status": "unknown", "probes": 0}
+
+        checked_at, ok, latency_ms, error = results[-1]
+        latencies = sorted(r[2] for r in results if r[1])
+        successes = sum(1 for r in results if r[1])
+        return {
+            "status": "healthy" if ok else "offline",
+            "last_checked": checked_at,
+            "last_latency_ms": round(latency_ms, 1),
+            "last_error": error,
+            "consecutive_failures": self.consecutive_failures,
+            "probes": len(results),
+            "success_rate": round(successes / len(results), 3),
+            "p50_ms": round(latencies[len(latencies) // 2], 1) if latencies else None,
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 1) if latencies else None,
+        }
+
+
+class HealthProber:
+    """Periodically probes the upstreams and caches the outcome."""
+
+    def __init__(self, interval_seconds: float, timeout_seconds: float, window: int):
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.openfda = ProbeHistory(window)
+        self.llm = ProbeHistory(window)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._client = httpx.AsyncClient(timeout=self.timeout_seconds)
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.probe_once()
+            except Exception as e:
+                print(f"Health probe error: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def probe_once(self) -> None:
+        checks = [self._probe(self.llm, "GET", f"{LLM_BASE_URL}/models", headers=LLM_HEADERS)]
+        if not OPENFDA_OFFLINE:
+            checks.append(self._probe(
+                self.openfda, "GET", OPENFDA_BASE_URL,
+                params={"search": 'openfda.generic_name:"aspirin"', "limit": 1},
+            ))
+        await asyncio.gather(*checks)
+
+    async def _probe(self, history: ProbeHistory, method: str, url: str, **kwargs: Any) -> None:
+        """Reachable means a non-5xx answer (a 4xx from the LLM proxy still proves it is up)."""
+        start = time.perf_counter()
+        try:
+            response = await self._client.request(method, url, **kwargs)
+            ok = response.status_code < 500
+            error = None if ok else f"HTTP {response.status_code}"
+        except Exception as e:
+            ok, error = False, type(e).__name__
+        history.record(ok, (time.perf_counter() - start) * 1000, error)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "openfda": {"status": "offline-snapshot"} if OPENFDA_OFFLINE else self.openfda.snapshot(),
+            "llm": {**self.llm.snapshot(), "configured": FAL_KEY is not None},
+        }
+
+
+def _collect_probes() -> List[str]:
+    if _health_prober is None:
+        return []
+    lines = [
+        "# HELP drug_api_upstream_up Whether the last background probe reached the upstream.",
+        "# TYPE drug_api_upstream_up gauge",
+    ]
+    for name, state in _health_prober.snapshot().items():
+        if state.get("probes"):
+            lines.append(f'drug_api_upstream_up{{upstream="{name}"}} {1 if state["status"] == "healthy" else 0}')
+    return lines
+
+
+register_collector(_collect_probes)
+
+
+# --------------- Global singleton ---------------
+
+_health_prober: Optional[HealthProber] = None
+
+
+async def start_health_prober() -> HealthProber:
+    """Create the prober and start probing (called from the app lifespan)."""
+    global _health_prober
+    if _health_prober is None:
+        _health_prober = HealthProber(HEALTH_PROBE_INTERVAL_SECONDS, HEALTH_PROBE_TIMEOUT_SECONDS, HEALTH_PROBE_WINDOW)
+        await _health_prober.start()
+    return _health_prober
+
+
+async def stop_health_prober() -> None:
+    global _health_prober
+    if _health_prober is not None:
+        await _health_prober.stop()
+        _health_prober = None
+
+
+def get_health_prober() -> Optional[HealthProber]:
+    return _health_prober
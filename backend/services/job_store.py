@@ -0,0 +1,199 @@
+"""
+Analysis job store — SQLite file holding queued, running and finished jobs.
+
+Jobs survive restarts. A worker claims a queued job atomically and holds a
+lease on it that it renews while the job runs; queued jobs, and running jobs
+whose lease has lapsed (the owner crashed), are handed back to the worker
+pool. Finished jobs keep their result, not their input, for JOB_TTL_SECONDS
+and are then purged.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    stages TEXT NOT NULL DEFAULT '[]',
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    owner TEXT,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+"""
+
+# Columns added after the first release — created on stores that predate them
+_MIGRATIONS = {"owner": "ALTER TABLE jobs ADD COLUMN owner TEXT",
+               "lease_until": "ALTER TABLE jobs ADD COLUMN lease_until REAL"}
+
+_FINISHED = ("completed", "failed")
+
+
+class JobStore:
+    """SQLite-backed job records; one connection per thread, WAL journaling."""
+
+    def __init__(self, path: Path, ttl_seconds: float):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, statement in _MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, kind: str, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, created_at) VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(payload, ensure_ascii=False), time.time()),
+            )
+        return job_id
+
+    def get(self, job_id: str, with_payload: bool = False) -> Optional[Dict[str, Any]]:
+        """Job record as a dict (result/stages decoded), or None if unknown or expired."""
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        if row["status"] in _FINISHED and row["finished_at"] + self.ttl_seconds <= time.time():
+            return None
+
+        job = {
+            "id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "stages": json.loads(row["stages"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+        }
+        if with_payload:
+            job["payload"] = json.loads(row["payload"])
+        return job
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """Atomically move a queued job to running under `owner`; the job with its payload, or None if taken."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, lease_until = ?, started_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (owner, now + lease_seconds, now, job_id),
+            )
+        if cursor.rowcount != 1:
+            return None
+        return self.get(job_id, with_payload=True)
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Extend the lease on a running job; False if the job is no longer ours."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                (time.time() + lease_seconds, job_id, owner),
+            )
+        return cursor.rowcount == 1
+
+    def release(self, job_id: str, owner: str) -> None:
+        """Put a job `owner` holds back in the queue (its worker is shutting down)."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, lease_until = NULL, started_at = NULL "
+                "WHERE id = ? AND owner = ? AND status = 'running'",
+                (job_id, owner),
+            )
+
+    def set_stages(self, job_id: str, stages: List[Dict[str, Any]]) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET stages = ? WHERE id = ?", (json.dumps(stages), job_id))
+
+    def finish(
+        self,
+        job_id: str,
+        owner: str,
+        stages: List[Dict[str, Any]],
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        """Record the outcome of a job `owner` holds and drop its input (the raw anamnesis text)."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, stages = ?, result = ?, error = ?, finished_at = ?, "
+                "payload = '{}', owner = NULL, lease_until = NULL "
+                "WHERE id = ? AND owner = ? AND status = 'running'",
+                (
+                    "failed" if error else "completed",
+                    json.dumps(stages),
+                    json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                    owner,
+                ),
+            )
+        return cursor.rowcount == 1
+
+    def requeue_expired(self) -> List[str]:
+        """Hand running jobs whose lease lapsed (crashed or stalled owner) back to the queue → their ids."""
+        expired = "status = 'running' AND (lease_until IS NULL OR lease_until < ?)"
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT id FROM jobs WHERE {expired} ORDER BY created_at", (now,)).fetchall()
+            conn.execute(
+                f"UPDATE jobs SET status = 'queued', owner = NULL, lease_until = NULL, started_at = NULL WHERE {expired}",
+                (now,),
+            )
+        return [row["id"] for row in rows]
+
+    def unfinished(self) -> List[str]:
+        """Ids of queued jobs, oldest first, after re-queueing running jobs with a lapsed lease."""
+        self.requeue_expired()
+        rows = self._connect().execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at").fetchall()
+        return [row["id"] for row in rows]
+
+    def queued_before(self, job_id: str) -> int:
+        """Number of queued jobs submitted before this one."""
+        row = self._connect().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued' "
+            "AND created_at < (SELECT created_at FROM jobs WHERE id = ?)",
+            (job_id,),
+        ).fetchone()
+        return row[0]
+
+    def purge_expired(self) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND finished_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {"path": str(self.path), "ttl_seconds": self.ttl_seconds, **{row[0]: row[1] for row in rows}}
@@ -0,0 +1,240 @@
+"""
+Asynchronous analysis jobs — submit now, poll for the result.
+
+Submissions are recorded in the job store and queued; a fixed pool of
+JOB_WORKERS coroutines runs the pipelines, so at most that many analyses
+hold LLM calls at once regardless of how many HTTP clients are waiting.
+Per-stage timings are written back as each stage finishes.
+
+Workers claim jobs atomically and renew a JOB_LEASE_SECONDS lease while they
+run, so several processes can share one store: a job is only re-run once
+its owner has stopped renewing it.
+"""
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from backend.config import JOB_LEASE_SECONDS, JOB_MAX_QUEUED, JOB_STORE_PATH, JOB_TTL_SECONDS, JOB_WORKERS
+from backend.logger import get_logger
+from backend.services.anamnesis import extract_patient_info_from_text_async
+from backend.services.job_store import JobStore
+from backend.services.llm import analyze_with_openai_agent_async
+
+# Expired jobs are purged this often
+_PURGE_INTERVAL_SECONDS = 600
+
+
+class QueueFullError(Exception):
+    """Raised when JOB_MAX_QUEUED jobs are already waiting."""
+
+
+def _pipeline_stages(pipeline_steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{"stage": step["name"], "ms": step.get("processing_time_ms")} for step in pipeline_steps]
+
+
+async def _run_analyze(payload: Dict[str, Any], stages: List[Dict[str, Any]], report: Callable) -> Dict[str, Any]:
+    result, pipeline_steps = await analyze_with_openai_agent_async(
+        age=payload["age"],
+        gender=payload["gender"],
+        conditions=payload["conditions"],
+        current_medications=payload["current_medications"],
+        new_medications=payload["new_medications"],
+        track_pipeline=True,
+    )
+    stages.extend(_pipeline_stages(pipeline_steps))
+    return result
+
+
+async def _run_analyze_file(payload: Dict[str, Any], stages: List[Dict[str, Any]], report: Callable) -> Dict[str, Any]:
+    # The document was parsed at submission time; its timing comes with the payload
+    if "parse" in payload:
+        stages.append({"stage": "Document Parsing", "ms": payload["parse"]["processing_time_ms"]})
+    t0 = time.time()
+    extracted_info = await extract_patient_info_from_text_async(payload["anamnesis_text"])
+    stages.append({"stage": "Patient Info Extraction", "ms": round((time.time() - t0) * 1000, 2)})
+    await report()
+
+    result, pipeline_steps = await analyze_with_openai_agent_async(
+        age=extracted_info.get("age", 45),
+        gender=extracted_info.get("gender", "male"),
+        conditions=extracted_info.get("conditions", []),
+        current_medications=extracted_info.get("current_medications", []),
+        new_medications=payload["new_medications"],
+        track_pipeline=True,
+    )
+    stages.extend(_pipeline_stages(pipeline_steps))
+    result["extracted_patient_info"] = extracted_info
+    return result
+
+
+_HANDLERS: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]] = {
+    "analyze": _run_analyze,
+    "analyze_file": _run_analyze_file,
+}
+
+
+class JobQueue:
+    """Bounded worker pool over the job store."""
+
+    def __init__(self, store: JobStore, workers: int, max_queued: int, lease_seconds: float = JOB_LEASE_SECONDS):
+        self.store = store
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.lease_seconds = lease_seconds
+        # Identifies this process's claims in the shared store
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        # Queued jobs and jobs whose owner died go back to the front of the line
+        for job_id in await asyncio.to_thread(self.store.unfinished):
+            self._queue.put_nowait(job_id)
+        if self._queue.qsize():
+            print(f"🔁 Re-queued {self._queue.qsize()} unfinished jobs")
+
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._purge_loop()))
+        self._tasks.append(asyncio.create_task(self._lease_loop()))
+        print(f"🧵 Job queue: {self.workers} workers, store {self.store.path}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> str:
+        if kind not in _HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self._queue.qsize() >= self.max_queued:
+            raise QueueFullError(f"{self._queue.qsize()} jobs already queued")
+        job_id = await asyncio.to_thread(self.store.create, kind, payload)
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job and job["status"] == "queued":
+            job["queue_position"] = await asyncio.to_thread(self.store.queued_before, job_id)
+        return job
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                print(f"Job worker {worker_id} error on {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        """Renew the job's lease until cancelled."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self.store.renew_lease, job_id, self.owner, self.lease_seconds):
+                print(f"Job {job_id}: lease lost — another worker may re-run it")
+                return
+
+    async def _run(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.store.claim, job_id, self.owner, self.lease_seconds)
+        if job is None:
+            return
+
+        print(f"⚙️ Job {job_id} ({job['kind']}) started")
+        start = time.time()
+        stages: List[Dict[str, Any]] = []
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+
+        async def report() -> None:
+            await asyncio.to_thread(self.store.set_stages, job_id, list(stages))
+
+        try:
+            result = await _HANDLERS[job["kind"]](job["payload"], stages, report)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back instead of waiting for the lease to lapse
+            await asyncio.to_thread(self.store.release, job_id, self.owner)
+            raise
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            await asyncio.to_thread(self.store.finish, job_id, self.owner, stages, None, f"{type(e).__name__}: {e}")
+            return
+        finally:
+            heartbeat.cancel()
+
+        await asyncio.to_thread(self.store.finish, job_id, self.owner, stages, result)
+        processing_time_ms = (time.time() - start) * 1000
+        print(f"✅ Job {job_id} completed in {processing_time_ms:.0f} ms")
+
+        logger = get_logger()
+        if logger.enabled:
+            logger.log_request(
+                endpoint=f"/jobs/{job['kind'].replace('_', '/')}",
+                method="POST",
+                client_ip="job-worker",
+                user_agent="job-worker",
+                request_data={"job_id": job_id},
+                response_data=result,
+                status_code=200,
+                processing_time_ms=processing_time_ms,
+            )
+
+    async def _lease_loop(self) -> None:
+        """Pick up jobs whose owner (another process, or a worker here) stopped renewing its lease."""
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                expired = await asyncio.to_thread(self.store.requeue_expired)
+                for job_id in expired:
+                    self._queue.put_nowait(job_id)
+                if expired:
+                    print(f"🔁 Re-queued {len(expired)} jobs with a lapsed lease")
+            except Exception as e:
+                print(f"Job lease check error: {e}")
+
+    async def _purge_loop(self) -> None:
+        while True:
+            await asyncio.sleep(_PURGE_INTERVAL_SECONDS)
+            try:
+                purged = await asyncio.to_thread(self.store.purge_expired)
+                if purged:
+                    print(f"🧹 Purged {purged} expired jobs")
+            except Exception as e:
+                print(f"Job purge error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "queued_in_memory": self._queue.qsize(), **self.store.stats()}
+
+
+# --------------- Global singleton ---------------
+
+_job_queue: Optional[JobQueue] = None
+
+
+async def start_job_queue() -> JobQueue:
+    """Create the job queue and start its workers (called from the app lifespan)."""
+    global _job_queue
+    if _job_queue is None:
+        store = JobStore(Path(JOB_STORE_PATH), ttl_seconds=JOB_TTL_SECONDS)
+        _job_queue = JobQueue(store, workers=JOB_WORKERS, max_queued=JOB_MAX_QUEUED)
+        await _job_queue.start()
+    return _job_queue
+
+
+async def stop_job_queue() -> None:
+    global _job_queue
+    if _job_queue is not None:
+        await _job_queue.stop()
+        _job_queue = None
+
+
+def get_job_queue() -> JobQueue:
+    if _job_queue is None:
+        raise RuntimeError("Job queue is not running")
+    return _job_queue
@@ -0,0 +1,79 @@
+"""
+Incremental JSON parsing for streamed LLM output.
+
+The evaluator answers with one JSON object; JSONSectionParser is fed the
+response chunk by chunk and hands back each top-level member as soon as its
+value is complete, so callers can render `clinical_summary` while
+`interaction_details` is still being generated.
+"""
+
+import json
+from typing import Any, List, Tuple
+
+
+class JSONSectionParser:
+    """Yield (key, value) pairs of a streamed top-level JSON object as they complete."""
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = -1
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume the next chunk of output and return the members it completed."""
+        completed: List[Tuple[str, Any]] = []
+        if self.done or not chunk:
+            return completed
+
+        self._text += chunk
+        text = self._text
+        while self._pos < len(text):
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+
+            # Anything before the opening brace (markdown fences, preamble) is skipped
+            if self._member_start < 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._member_start = i + 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.extend(self._parse_member(self._member_start, i))
+                    self.done = True
+                    break
+            elif ch == "," and self._depth == 1:
+                completed.extend(self._parse_member(self._member_start, i))
+                self._member_start = i + 1
+
+        return completed
+
+    def _parse_member(self, start: int, end: int) -> List[Tuple[str, Any]]:
+        member = self._text[start:end].strip()
+        if not member:
+            return []
+        try:
+            return list(json.loads("{" + member + "}").items())
+        except json.JSONDecodeError:
+            # Malformed member — leave it to the full-response parse at the end
+            return []
@@ -0,0 +1,175 @@
+"""
+Offline OpenFDA label index — a read-only SQLite snapshot built from the
+openFDA `drug/label` bulk download (see backend/ingest_labels.py).
+
+Labels are stored once per set_id as zlib-compressed JSON in the same entry
+shape the label cache uses; generic and brand names point at them. The file is
+opened lazily and read through mmap, so startup cost does not grow with the
+corpus size.
+"""
+
+import json
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from backend.config import OPENFDA_SNAPSHOT_PATH
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    set_id TEXT PRIMARY KEY,
+    effective_time TEXT,
+    has_interactions INTEGER NOT NULL,
+    entry BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS names (
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    set_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Exact generic names win over brand names, which win over combination components.
+_KIND_RANK = "CASE n.kind WHEN 'generic' THEN 0 WHEN 'brand' THEN 1 ELSE 2 END"
+
+_MMAP_SIZE = 512 * 1024 * 1024
+
+
+def _compress(entry: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def _decompress(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class LabelIndexWriter:
+    """Builds a label index file; used only by the ingestion command."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.executescript(_SCHEMA)
+        self.label_count = 0
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """Add one label entry ({"found": True, "label": …, "meta_last_updated": …})."""
+        label = entry["label"]
+        set_id = label.get("set_id")
+        if not set_id:
+            return
+
+        names = set()
+        for generic in label.get("openfda", {}).get("generic_name", []):
+            generic = generic.lower().strip()
+            names.add((generic, "generic"))
+            for part in generic.replace(",", " and ").split(" and "):
+                if part.strip() and part.strip() != generic:
+                    names.add((part.strip(), "component"))
+        for brand in label.get("openfda", {}).get("brand_name", []):
+            names.add((brand.lower().strip(), "brand"))
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO labels (set_id, effective_time, has_interactions, entry) VALUES (?, ?, ?, ?)",
+            (set_id, label.get("effective_time"), int(bool(label.get("drug_interactions"))), _compress(entry)),
+        )
+        self.conn.executemany(
+            "INSERT INTO names (name, kind, set_id) VALUES (?, ?, ?)",
+            [(name, kind, set_id) for name, kind in names],
+        )
+        self.label_count += 1
+
+    def set_meta(self, key: str, value: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self) -> None:
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_names_name ON names (name)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_names_set_id ON names (set_id)")
+        self.conn.commit()
+        self.conn.execute("VACUUM")
+        self.conn.close()
+
+
+class LabelIndex:
+    """Read-only, lazily opened view of a label index file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self._meta: Optional[Dict[str, str]] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
+            self._local.conn = conn
+        return conn
+
+    def get(self, name_key: str) -> Optional[Dict[str, Any]]:
+        """Best label entry for a normalized generic/brand name, or None."""
+        row = self._connect().execute(
+            "SELECT l.entry FROM names n JOIN labels l ON l.set_id = n.set_id "
+            f"WHERE n.name = ? ORDER BY {_KIND_RANK}, l.has_interactions DESC, l.effective_time DESC LIMIT 1",
+            (name_key,),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _decompress(row[0])
+
+    def get_by_set_id(self, set_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute("SELECT entry FROM labels WHERE set_id = ?", (set_id,)).fetchone()
+        return _decompress(row[0]) if row else None
+
+    def iter_names(self) -> Iterator[tuple]:
+        """Yield (name, kind, generic) triples — vocabulary for drug-name resolution."""
+        rows = self._connect().execute(
+            "SELECT n.name, n.kind, COALESCE(g.name, n.name) FROM names n "
+            "LEFT JOIN names g ON n.kind = 'brand' AND g.set_id = n.set_id AND g.kind = 'generic' "
+            "GROUP BY n.name, n.kind"
+        )
+        for name, kind, generic in rows:
+            # Combination components are searchable generic names in their own right
+            yield name, "generic" if kind == "component" else kind, generic
+
+    def meta(self) -> Dict[str, str]:
+        # The file is read-only, so its metadata is read once
+        if self._meta is None:
+            self._meta = dict(self._connect().execute("SELECT key, value FROM meta").fetchall())
+        return self._meta
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": str(self.path), "hits": self.hits, "misses": self.misses, **self.meta()}
+
+
+# --------------- Global singleton ---------------
+
+_label_index: Optional[LabelIndex] = None
+_initialised = False
+
+
+def get_label_index() -> Optional[LabelIndex]:
+    """Return the offline label index, or None when OPENFDA_SNAPSHOT_PATH is not set."""
+    global _label_index, _initialised
+    if not _initialised:
+        _initialised = True
+        if OPENFDA_SNAPSHOT_PATH:
+            if Path(OPENFDA_SNAPSHOT_PATH).is_file():
+                _label_index = LabelIndex(Path(OPENFDA_SNAPSHOT_PATH))
+                print(f"📚 Offline label index: {OPENFDA_SNAPSHOT_PATH}")
+            else:
+                print(f"Offline label index not found at {OPENFDA_SNAPSHOT_PATH} — using OpenFDA API")
+    return _label_index
@@ -0,0 +1,130 @@
+"""
+Persistent OpenFDA label cache — SQLite file shared across restarts and workers.
+
+Names map to a label version (set_id + version); label payloads are stored once
+per version, so aliases that resolve to the same label share a single row.
+WAL journaling lets every uvicorn worker on the host read while one writes.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from backend.config import FDA_PERSISTENT_CACHE_DIR, FDA_PERSISTENT_CACHE_TTL_SECONDS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    set_id TEXT NOT NULL,
+    version TEXT NOT NULL,
+    effective_time TEXT,
+    entry TEXT NOT NULL,
+    PRIMARY KEY (set_id, version)
+);
+CREATE TABLE IF NOT EXISTS names (
+    name_key TEXT PRIMARY KEY,
+    set_id TEXT NOT NULL,
+    version TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+class LabelStore:
+    """SQLite-backed read-through store for OpenFDA label entries."""
+
+    def __init__(self, path: Path, ttl_seconds: float):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shared across threads — keep one per thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, name_key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached label entry for a normalized name, or None if missing/stale."""
+        try:
+            row = self._connect().execute(
+                "SELECT l.entry, n.fetched_at FROM names n "
+                "JOIN labels l ON l.set_id = n.set_id AND l.version = n.version "
+                "WHERE n.name_key = ?",
+                (name_key,),
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Label store read error for {name_key}: {e}")
+            row = None
+
+        if row is None or row[1] + self.ttl_seconds <= time.time():
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, name_key: str, entry: Dict[str, Any]) -> None:
+        """Store a found label entry under its name and label version."""
+        label = entry.get("label", {})
+        set_id = label.get("set_id") or name_key
+        version = str(label.get("version") or label.get("effective_time") or "")
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO labels (set_id, version, effective_time, entry) VALUES (?, ?, ?, ?)",
+                    (set_id, version, label.get("effective_time"), json.dumps(entry, ensure_ascii=False)),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO names (name_key, set_id, version, fetched_at) VALUES (?, ?, ?, ?)",
+                    (name_key, set_id, version, time.time()),
+                )
+            self.writes += 1
+        except sqlite3.Error as e:
+            print(f"Label store write error for {name_key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """In-process counters only — cheap enough for every analysis log."""
+        return {
+            "path": str(self.path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+
+# --------------- Global singleton ---------------
+
+_label_store: Optional[LabelStore] = None
+_initialised = False
+
+
+def get_label_store() -> Optional[LabelStore]:
+    """Return the persistent store, or None when FDA_PERSISTENT_CACHE_DIR is not set."""
+    global _label_store, _initialised
+    if not _initialised:
+        _initialised = True
+        if FDA_PERSISTENT_CACHE_DIR:
+            try:
+                _label_store = LabelStore(
+                    Path(FDA_PERSISTENT_CACHE_DIR) / "openfda_labels.sqlite3",
+                    ttl_seconds=FDA_PERSISTENT_CACHE_TTL_SECONDS,
+                )
+                print(f"💾 Persistent label cache: {_label_store.path}")
+            except (OSError, sqlite3.Error) as e:
+                print(f"Persistent label cache disabled: {e}")
+    return _label_store
@@ -2,12 +2,29 @@
 LLM evaluation service — system prompt, OpenFDA evaluation, and main analysis pipeline.
 """
 
+import asyncio
+import copy
+import hashlib
 import json
 import time
-from typing import Any, Dict, List
-
-from backend.config import llm_client, LLM_MODEL
-from backend.services.openfda import analyze_drug_interactions_openfda
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from backend.config import (
+    ANALYSIS_CACHE_MAX_ENTRIES,
+    ANALYSIS_CACHE_TTL_SECONDS,
+    LLM_MODEL,
+)
+from backend.metrics import LLM_FALLBACKS, STAGE_SECONDS
+from backend.services import llm_gateway
+from backend.services.cache import SingleFlight, TTLCache
+from backend.services.drug_names import resolve_drug_names
+from backend.services.json_stream import JSONSectionParser
+from backend.services.prescreen import prescreen_interactions
+from backend.services.prompt import build_evaluation_payload, iter_label_items
+from backend.services.openfda import (
+    analyze_drug_interactions_openfda_async,
+    cache_stats,
+)
 
 
 # ──────────────────── system prompt ────────────────────
@@ -101,43 +118,238 @@ def _extract_json(content: str) -> dict:
     return json.loads(content[start:end])
 
 
-def evaluate_with_openai(openfda_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Send OpenFDA data to the LLM for clinical evaluation and return structured JSON."""
+def _build_evaluation_messages(
+    openfda_data: Dict[str, Any],
+    prescreen: Optional[Dict[str, Any]] = None,
+    prompt_stats: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, str]]:
+    """Build the system + user messages for the clinical evaluation call; payload stats go into `prompt_stats`."""
+    if prescreen is None:
+        prescreen = prescreen_interactions(openfda_data)
+    payload, stats = build_evaluation_payload(openfda_data, prescreen=prescreen)
+    if prompt_stats is not None:
+        prompt_stats.update(stats)
     user_message = f"""
-Based on this OpenFDA API data, provide comprehensive clinical drug interaction evaluation:
+Based on this OpenFDA API data (compact JSON; long label sections are trimmed, marked with "…"), provide comprehensive clinical drug interaction evaluation:
 
-{json.dumps(openfda_data, indent=2, ensure_ascii=False)}
+{payload}
 
 Analyze all medication combinations and return your evaluation in the specified JSON format.
+"prescreen_pairs" lists the drug pairs whose labels mention each other, with the matching label text.
 Focus on:
-1. Drug-drug interactions between current and new medications
+1. Drug-drug interactions between current and new medications — the prescreen pairs first, but report any other clinically significant interaction too
 2. Contraindications and warnings
 3. Patient-specific risks (age, conditions)
 4. Monitoring recommendations
 """
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_message},
+    ]
+
+
+def _parse_evaluation(content: str) -> Dict[str, Any]:
+    print(f"🤖 Raw AI Response: {content[:100]}...")
+    try:
+        return _extract_json(content)
+    except (ValueError, json.JSONDecodeError):
+        return json.loads(content)
+
+
+def _evaluation_fallback() -> Dict[str, Any]:
+    return {**_FALLBACK_RESPONSE, "clinical_summary": "AI değerlendirme servisi şu anda yanıt veremiyor. Lütfen tekrar deneyin."}
+
+
+def _failed_evaluation(operation: str) -> Dict[str, Any]:
+    """Record a failed LLM evaluation and return the fallback response (upstream status is counted by the gateway)."""
+    LLM_FALLBACKS.inc(operation=operation)
+    return _evaluation_fallback()
+
+
+def _prescreen_evaluation(prescreen: Dict[str, Any]) -> Dict[str, Any]:
+    """Degraded answer built from the local prescreen when the LLM is unavailable."""
+    pairs = prescreen.get("pairs", [])
+    if pairs:
+        summary = (
+            "AI değerlendirme servisi şu anda yanıt veremiyor. Prospektüs metinlerinin ön taramasında "
+            f"{len(pairs)} olası ilaç etkileşimi bulundu; sonuçlar klinik olarak doğrulanmalıdır."
+        )
+    else:
+        summary = (
+            "AI değerlendirme servisi şu anda yanıt veremiyor. Prospektüs metinlerinin ön taramasında "
+            "ilaçlar arasında etkileşim ifadesi bulunamadı. Lütfen tekrar deneyin."
+        )
+    return {
+        **_FALLBACK_RESPONSE,
+        "results_found": bool(pairs),
+        "clinical_summary": summary,
+        "interaction_details": [
+            {
+                "drugs": pair["drugs"],
+                "severity": "High" if pair["severity_hint"] == "contraindicated" else "Medium",
+                "mechanism": pair["mentions"][0]["snippet"],
+            }
+            for pair in pairs
+        ],
+        "degraded": True,
+    }
+
 
+async def evaluate_with_openai_async(
+    openfda_data: Dict[str, Any],
+    prescreen: Optional[Dict[str, Any]] = None,
+    prompt_stats: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Send OpenFDA data to the LLM for clinical evaluation and return structured JSON.
+    The evaluation payload's stats are written into `prompt_stats` when given.
+    """
+    start = time.perf_counter()
     try:
-        response = llm_client.chat.completions.create(
+        response = await llm_gateway.complete_async(
+            "evaluate",
             model=LLM_MODEL,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_message},
-            ],
+            messages=_build_evaluation_messages(openfda_data, prescreen, prompt_stats),
             temperature=0.1,
             response_format={"type": "json_object"},
         )
+        return _parse_evaluation(response.choices[0].message.content)
 
-        content = response.choices[0].message.content
-        print(f"🤖 Raw AI Response: {content[:100]}...")
+    except Exception as e:
+        print(f"OpenAI evaluation error: {e}")
+        return _failed_evaluation("evaluate")
 
-        try:
-            return _extract_json(content)
-        except (ValueError, json.JSONDecodeError):
-            return json.loads(content)
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage="llm_evaluate")
+
+
+async def stream_evaluation_async(
+    openfda_data: Dict[str, Any],
+    prescreen: Optional[Dict[str, Any]] = None,
+    prompt_stats: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming variant of evaluate_with_openai_async.
+
+    Yields ("section", (key, value)) for every top-level member of the LLM's
+    JSON as soon as it is complete, then ("evaluation", full_result). Errors
+    end the stream with the usual fallback evaluation.
+    """
+    parser = JSONSectionParser()
+    chunks: List[str] = []
+    stream = None
+    start = time.perf_counter()
+    try:
+        stream = await llm_gateway.stream_async(
+            "evaluate_stream",
+            model=LLM_MODEL,
+            messages=_build_evaluation_messages(openfda_data, prescreen, prompt_stats),
+            temperature=0.1,
+            response_format={"type": "json_object"},
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                chunks.append(content)
+                for section in parser.feed(content):
+                    yield "section", section
+        evaluation = _parse_evaluation("".join(chunks))
 
     except Exception as e:
-        print(f"OpenAI evaluation error: {e}")
-        return {**_FALLBACK_RESPONSE, "clinical_summary": "AI değerlendirme servisi şu anda yanıt veremiyor. Lütfen tekrar deneyin."}
+        print(f"OpenAI streaming evaluation error: {e}")
+        evaluation = _failed_evaluation("evaluate_stream")
+
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage="llm_evaluate")
+        if stream is not None:
+            await stream.close()
+
+    yield "evaluation", evaluation
+
+
+# ──────────────────── analysis cache ────────────────────
+
+# key: hash of the normalized regimen + label versions, value: LLM evaluation
+ANALYSIS_CACHE = TTLCache(
+    max_entries=ANALYSIS_CACHE_MAX_ENTRIES,
+    ttl_seconds=ANALYSIS_CACHE_TTL_SECONDS,
+    name="analysis_results",
+)
+
+# Identical concurrent analyses share one LLM call
+_ANALYSIS_INFLIGHT = SingleFlight(name="analysis_evaluations")
+
+_GENDER_ALIASES = {"erkek": "male", "kadın": "female"}
+
+
+def _age_band(age: int) -> str:
+    for upper, band in ((2, "infant"), (12, "child"), (18, "adolescent"), (65, "adult"), (75, "65-74"), (85, "75-84")):
+        if age < upper:
+            return band
+    return "85+"
+
+
+def _analysis_cache_key(openfda_data: Dict[str, Any]) -> str:
+    """
+    Key an evaluation by what the LLM actually sees: age band, gender, sorted
+    conditions, the current/new drug sets, and the version of every label used.
+    Drugs are keyed by resolved and typed name together — the evaluation text
+    names drugs as the user typed them ("Coumadin", not "warfarin").
+    """
+    patient = openfda_data.get("patient_info", {})
+    gender = str(patient.get("gender", "")).lower().strip()
+    current: List[Tuple[str, str]] = []
+    new: List[Tuple[str, str]] = []
+    labels: List[Tuple[str, Any, Any]] = []
+
+    for role, item in iter_label_items(openfda_data):
+        data = item.get("data", {})
+        typed = (data.get("drug_name") or item.get("drug_name") or "").lower().strip()
+        name = (data.get("search_name") or typed).lower().strip()
+        (current if role == "current" else new).append((name, typed))
+        if item.get("found"):
+            labels.append((name, data.get("effective_time"), data.get("meta_last_updated")))
+
+    key = {
+        "age_band": _age_band(int(patient.get("age", 0))),
+        "gender": _GENDER_ALIASES.get(gender, gender),
+        "conditions": sorted({c.lower().strip() for c in patient.get("conditions", []) if c and c.strip()}),
+        "current": sorted(current),
+        "new": sorted(new),
+        "labels": sorted(labels, key=lambda label: label[0]),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _is_fallback(evaluation: Dict[str, Any]) -> bool:
+    return evaluation == _evaluation_fallback()
+
+
+async def _evaluate_cached_async(
+    openfda_data: Dict[str, Any],
+    prescreen: Dict[str, Any],
+    prompt_stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    evaluate_with_openai_async behind the analysis cache → (evaluation, cache_hit); identical
+    in-flight analyses share one LLM call. `prompt_stats` is only filled by the caller that built the prompt.
+    """
+    key = _analysis_cache_key(openfda_data)
+    cached = ANALYSIS_CACHE.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached), True
+
+    async def evaluate() -> Dict[str, Any]:
+        evaluation = await evaluate_with_openai_async(openfda_data, prescreen, prompt_stats)
+        # Fallbacks are not cached — the next click should retry the LLM
+        if isinstance(evaluation, dict) and not _is_fallback(evaluation):
+            ANALYSIS_CACHE.set(key, evaluation)
+        return evaluation
+
+    evaluation = await _ANALYSIS_INFLIGHT.run(key, evaluate)
+    return copy.deepcopy(evaluation), False
 
 
 # ──────────────────── main pipeline ────────────────────
@@ -184,7 +396,82 @@ def _extract_latest_date(openfda_data: Dict[str, Any]) -> str:
     return latest_date
 
 
-def analyze_with_openai_agent(
+def _openfda_step(
+    age: int,
+    gender: str,
+    conditions: List[str],
+    current_med_names: List[str],
+    new_med_names: List[str],
+    openfda_data: Dict[str, Any],
+    elapsed_ms: float,
+) -> Dict[str, Any]:
+    return {
+        "step": 1,
+        "name": "OpenFDA Data Collection",
+        "description": "Direct OpenFDA API query for medication data",
+        "input": {
+            "age": age, "gender": gender, "conditions": conditions,
+            "current_medications": current_med_names, "new_medications": new_med_names,
+        },
+        "output": openfda_data,
+        "name_resolution": resolve_drug_names(current_med_names + new_med_names),
+        "cache_stats": cache_stats(),
+        "processing_time_ms": round(elapsed_ms, 2),
+    }
+
+
+def _prescreen_step(prescreen: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "step": 2,
+        "name": "Local Interaction Prescreen",
+        "description": "Multi-pattern scan of label interaction text for the other regimen drugs",
+        "input": {"scanned_labels": prescreen["scanned_labels"], "unscanned": prescreen["unscanned"]},
+        "output": prescreen["pairs"],
+        "processing_time_ms": prescreen["processing_time_ms"],
+    }
+
+
+def _evaluation_step(
+    openfda_data: Dict[str, Any],
+    evaluation: Dict[str, Any],
+    elapsed_ms: float,
+    cache_hit: bool = False,
+    prompt_stats: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    log_input = {
+        "patient_info": openfda_data.get("patient_info", {}),
+        "current_medications": openfda_data.get("current_medications", []),
+        "new_medications": openfda_data.get("new_medications", []),
+        "openfda_data_summary": {
+            "total_drugs": len(openfda_data.get("openfda_data", [])),
+            "drugs": [
+                {
+                    "name": (item.get("data", {}).get("drug_name", "unknown")
+                             if item.get("found") else item.get("drug_name", "unknown")),
+                    "found": item.get("found", False),
+                    "has_interactions": bool(item.get("data", {}).get("drug_interactions")),
+                    "has_contraindications": bool(item.get("data", {}).get("contraindications")),
+                    "data_size_kb": round(len(str(item.get("data", {}))) / 1024, 2) if item.get("found") else 0,
+                }
+                for item in openfda_data.get("openfda_data", [])
+            ],
+        },
+    }
+    return {
+        "step": 3,
+        "name": "Clinical Agent Analysis",
+        "description": "Claude Sonnet Assessment with Full OpenFDA Context",
+        "input": log_input,
+        "output": evaluation,
+        # None when no prompt was built here (cache hit, or another request's LLM call was shared)
+        "prompt": prompt_stats or None,
+        "cache_hit": cache_hit,
+        "cache_stats": ANALYSIS_CACHE.stats(),
+        "processing_time_ms": round(elapsed_ms, 2),
+    }
+
+
+async def analyze_with_openai_agent_async(
     age: int,
     gender: str,
     conditions: List[str],
@@ -194,9 +481,11 @@ def analyze_with_openai_agent(
 ) -> tuple:
     """
     Main analysis pipeline:
-      1. Fetch OpenFDA data
-      2. Evaluate with LLM
-      3. Return structured result
+      1. Fetch OpenFDA data (concurrent, batched)
+      2. Prescreen label text for pairs that mention each other
+      3. Evaluate with LLM (prescreen result if the LLM is unavailable)
+
+    Everything is awaited, so the event loop keeps serving other requests.
 
     Returns:
         (result, pipeline_steps) if track_pipeline else result
@@ -207,10 +496,10 @@ def analyze_with_openai_agent(
     new_med_names = [m["name"] for m in new_medications if m.get("name")]
 
     # Step 1 — OpenFDA data
-    print("🌐 Collecting OpenFDA data (Direct)...")
+    print("🌐 Collecting OpenFDA data (Direct, concurrent)...")
     t0 = time.time()
 
-    openfda_data = analyze_drug_interactions_openfda(
+    openfda_data = await analyze_drug_interactions_openfda_async(
         age=age,
         gender=gender,
         conditions=conditions,
@@ -221,57 +510,164 @@ def analyze_with_openai_agent(
     step1_ms = (time.time() - t0) * 1000
 
     if track_pipeline:
-        pipeline_steps.append({
-            "step": 1,
-            "name": "OpenFDA Data Collection",
-            "description": "Direct OpenFDA API query for medication data",
-            "input": {
-                "age": age, "gender": gender, "conditions": conditions,
-                "current_medications": current_med_names, "new_medications": new_med_names,
-            },
-            "output": openfda_data,
-            "processing_time_ms": round(step1_ms, 2),
-        })
-
-    # Step 2 — LLM evaluation
+        pipeline_steps.append(
+            _openfda_step(age, gender, conditions, current_med_names, new_med_names, openfda_data, step1_ms)
+        )
+
+    # Step 2 — local prescreen (sub-millisecond; also the degraded answer)
+    prescreen = prescreen_interactions(openfda_data)
+    print(f"🔎 Prescreen: {len(prescreen['pairs'])} flagged pairs in {prescreen['processing_time_ms']} ms")
+
+    if track_pipeline:
+        pipeline_steps.append(_prescreen_step(prescreen))
+
+    # Step 3 — LLM evaluation
     print("🤖 LLM Agent: Evaluating OpenFDA data...")
     t1 = time.time()
 
-    evaluation = evaluate_with_openai(openfda_data)
+    prompt_stats: Dict[str, Any] = {}
+    evaluation, cache_hit = await _evaluate_cached_async(openfda_data, prescreen, prompt_stats)
+    if cache_hit:
+        print("⚡ Analysis cache hit — skipping LLM call")
+    elif _is_fallback(evaluation):
+        print("⚠️ LLM unavailable — returning prescreen result")
+        evaluation = _prescreen_evaluation(prescreen)
 
-    step2_ms = (time.time() - t1) * 1000
+    step3_ms = (time.time() - t1) * 1000
 
     if track_pipeline:
-        log_input = {
-            "patient_info": openfda_data.get("patient_info", {}),
-            "current_medications": openfda_data.get("current_medications", []),
-            "new_medications": openfda_data.get("new_medications", []),
-            "openfda_data_summary": {
-                "total_drugs": len(openfda_data.get("openfda_data", [])),
-                "drugs": [
-                    {
-                        "name": (item.get("data", {}).get("drug_name", "unknown")
-                                 if item.get("found") else item.get("drug_name", "unknown")),
-                        "found": item.get("found", False),
-                        "has_interactions": bool(item.get("data", {}).get("drug_interactions")),
-                        "has_contraindications": bool(item.get("data", {}).get("contraindications")),
-                        "data_size_kb": round(len(str(item.get("data", {}))) / 1024, 2) if item.get("found") else 0,
-                    }
-                    for item in openfda_data.get("openfda_data", [])
-                ],
-            },
-        }
-        pipeline_steps.append({
-            "step": 2,
-            "name": "Clinical Agent Analysis",
-            "description": "Claude Sonnet Assessment with Full OpenFDA Context",
-            "input": log_input,
-            "output": evaluation,
-            "processing_time_ms": round(step2_ms, 2),
-        })
-
-    # Inject latest update date
+        pipeline_steps.append(_evaluation_step(openfda_data, evaluation, step3_ms, cache_hit, prompt_stats))
+
+    # Inject latest update date and the prescreen matrix
     if isinstance(evaluation, dict):
         evaluation["last_updated"] = _extract_latest_date(openfda_data)
+        evaluation["prescreen"] = prescreen
 
     return (evaluation, pipeline_steps) if track_pipeline else evaluation
+
+
+async def analyze_with_openai_agent_stream(
+    age: int,
+    gender: str,
+    conditions: List[str],
+    current_medications: List[Dict],
+    new_medications: List[Dict],
+    pipeline_steps: Optional[list] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Progressive variant of analyze_with_openai_agent_async for /analyze/stream.
+
+    Yields events in order:
+      {"event": "drug", ...}            one per medication as its OpenFDA lookup finishes
+      {"event": "openfda_complete", ...}
+      {"event": "prescreen", "data"}    local pair-mention matrix (preliminary result)
+      {"event": "section", "key", "value"}  each top-level evaluation field once complete
+      {"event": "result", "data"}       the full evaluation (same shape as /analyze)
+
+    Pipeline steps are appended to `pipeline_steps` when a list is given.
+    """
+    current_med_names = [m["name"] for m in current_medications if m.get("name")]
+    new_med_names = [m["name"] for m in new_medications if m.get("name")]
+
+    # Step 1 — OpenFDA data, relaying per-drug progress while lookups run
+    print("🌐 Collecting OpenFDA data (Direct, streaming)...")
+    t0 = time.time()
+
+    progress: asyncio.Queue = asyncio.Queue()
+    openfda_task = asyncio.ensure_future(
+        analyze_drug_interactions_openfda_async(
+            age=age,
+            gender=gender,
+            conditions=conditions,
+            current_medications=current_med_names,
+            new_medications=new_med_names,
+            on_progress=progress.put_nowait,
+        )
+    )
+    openfda_task.add_done_callback(lambda _: progress.put_nowait(None))
+
+    try:
+        while (event := await progress.get()) is not None:
+            yield {"event": "drug", **event}
+        openfda_data = openfda_task.result()
+    finally:
+        # Client went away mid-lookup — don't leave the fan-out running
+        openfda_task.cancel()
+
+    step1_ms = (time.time() - t0) * 1000
+    items = openfda_data.get("openfda_data", [])
+    yield {
+        "event": "openfda_complete",
+        "total": len(items),
+        "found": sum(1 for item in items if item.get("found")),
+        "processing_time_ms": round(step1_ms, 2),
+    }
+
+    if pipeline_steps is not None:
+        pipeline_steps.append(
+            _openfda_step(age, gender, conditions, current_med_names, new_med_names, openfda_data, step1_ms)
+        )
+
+    # Step 2 — local prescreen, sent as the preliminary result
+    prescreen = prescreen_interactions(openfda_data)
+    yield {"event": "prescreen", "data": prescreen}
+
+    if pipeline_steps is not None:
+        pipeline_steps.append(_prescreen_step(prescreen))
+
+    # Step 3 — LLM evaluation, streamed section by section
+    print("🤖 LLM Agent: Streaming evaluation of OpenFDA data...")
+    t1 = time.time()
+
+    key = _analysis_cache_key(openfda_data)
+    cached = ANALYSIS_CACHE.get(key)
+    cache_hit = cached is not None
+    prompt_stats: Dict[str, Any] = {}
+
+    if cache_hit or key in _ANALYSIS_INFLIGHT:
+        # Cached, or an identical analysis is already with the LLM: wait for its result
+        if cache_hit:
+            print("⚡ Analysis cache hit — skipping LLM call")
+            evaluation = copy.deepcopy(cached)
+        else:
+            print("⏳ Identical analysis in flight — waiting for its result")
+            evaluation = copy.deepcopy(
+                await _ANALYSIS_INFLIGHT.run(key, lambda: evaluate_with_openai_async(openfda_data, prescreen))
+            )
+        if _is_fallback(evaluation):
+            print("⚠️ LLM unavailable — returning prescreen result")
+            evaluation = _prescreen_evaluation(prescreen)
+        for section_key, value in evaluation.items():
+            yield {"event": "section", "key": section_key, "value": value}
+    else:
+        # Lead the flight: identical requests arriving meanwhile wait on `result`
+        result: asyncio.Future = asyncio.get_running_loop().create_future()
+        _ANALYSIS_INFLIGHT.start(key, lambda: asyncio.shield(result))
+        evaluation = _evaluation_fallback()
+        try:
+            async for kind, payload in stream_evaluation_async(openfda_data, prescreen, prompt_stats):
+                if kind == "section":
+                    section_key, value = payload
+                    yield {"event": "section", "key": section_key, "value": value}
+                else:
+                    evaluation = payload
+            if isinstance(evaluation, dict) and not _is_fallback(evaluation):
+                ANALYSIS_CACHE.set(key, copy.deepcopy(evaluation))
+        finally:
+            # Also resolved when this client disconnects mid-stream, so waiters get the fallback
+            if not result.done():
+                result.set_result(copy.deepcopy(evaluation))
+        if _is_fallback(evaluation):
+            print("⚠️ LLM unavailable — returning prescreen result")
+            evaluation = _prescreen_evaluation(prescreen)
+
+    step3_ms = (time.time() - t1) * 1000
+
+    if pipeline_steps is not None:
+        pipeline_steps.append(_evaluation_step(openfda_data, evaluation, step3_ms, cache_hit, prompt_stats))
+
+    if isinstance(evaluation, dict):
+        evaluation["last_updated"] = _extract_latest_date(openfda_data)
+        evaluation["prescreen"] = prescreen
+
+    yield {"event": "result", "data": evaluation}
@@ -0,0 +1,344 @@
+"""
+LLM gateway — the one way services talk to the LLM provider.
+
+Owns the pooled OpenAI-compatible clients and wraps every call with:
+- a per-call deadline covering the whole call, so a slow provider cannot
+  hold a request for the client's default timeout;
+- an optional hedged second request, sent when the first has not answered
+  within the operation's observed p95 latency — the first answer wins and
+  the other request is cancelled;
+- a circuit breaker: after consecutive provider failures (timeouts,
+  connection errors, 429/5xx) calls fail fast with CircuitOpenError for a
+  cooldown, then a single trial call decides whether to close it again.
+
+Services catch the error like any other LLM failure and return their
+fallback (_FALLBACK_RESPONSE for evaluations) without waiting on the provider.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import httpx
+import openai
+
+from backend.config import (
+    LLM_BASE_URL,
+    LLM_BREAKER_COOLDOWN_SECONDS,
+    LLM_BREAKER_FAILURE_THRESHOLD,
+    LLM_CONNECT_TIMEOUT_SECONDS,
+    LLM_HEADERS,
+    LLM_HEDGE_ENABLED,
+    LLM_HEDGE_MIN_DELAY_SECONDS,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_RETRIES,
+    LLM_TIMEOUT_SECONDS,
+)
+from backend.metrics import (
+    LLM_CIRCUIT_REJECTIONS,
+    LLM_HEDGED_REQUESTS,
+    UPSTREAM_RESPONSES,
+    register_collector,
+    upstream_error_status,
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit breaker is open."""
+
+
+# ──────────────────── circuit breaker ────────────────────
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a cooldown and a single half-open trial call."""
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        self.times_opened = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go to the provider now (claims the trial slot when half-open)."""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                self.state = HALF_OPEN
+            if self.state == CLOSED or (self.state == HALF_OPEN and not self._trial_in_flight):
+                self._trial_in_flight = self.state == HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.times_opened += 1
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """The call ended without a verdict (cancelled); let another one try."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.cooldown_seconds - (time.monotonic() - self.opened_at))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "retry_in_seconds": round(retry_in, 1) if retry_in is not None else None,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+
+def _is_provider_failure(error: BaseException) -> bool:
+    """Timeouts, connection errors, 429 and 5xx trip the breaker; 4xx request errors do not."""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    status = upstream_error_status(error)
+    return not status.isdigit() or int(status) == 429 or int(status) >= 500
+
+
+# ──────────────────── latency window ────────────────────
+
+class _LatencyWindow:
+    """Latencies of the last successful attempts of one operation."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+BREAKER = CircuitBreaker(LLM_BREAKER_FAILURE_THRESHOLD, LLM_BREAKER_COOLDOWN_SECONDS)
+_LATENCIES: Dict[str, _LatencyWindow] = {}
+
+
+def _latency(operation: str) -> _LatencyWindow:
+    window = _LATENCIES.get(operation)
+    if window is None:
+        window = _LATENCIES.setdefault(operation, _LatencyWindow())
+    return window
+
+
+def _hedge_delay(operation: str) -> Optional[float]:
+    """Seconds to wait before hedging — the operation's p95; None while hedging is off or unmeasured."""
+    window = _latency(operation)
+    if not LLM_HEDGE_ENABLED or len(window) < LLM_HEDGE_MIN_SAMPLES:
+        return None
+    return max(LLM_HEDGE_MIN_DELAY_SECONDS, window.percentile(0.95))
+
+
+# ──────────────────── clients ────────────────────
+
+_async_client: Optional[openai.AsyncOpenAI] = None
+
+
+def _client_options() -> Dict[str, Any]:
+    return {
+        "base_url": LLM_BASE_URL,
+        "api_key": "not-needed",
+        "default_headers": LLM_HEADERS,
+        "max_retries": LLM_MAX_RETRIES,
+        "timeout": httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+    }
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+
+
+def get_async_llm_client() -> openai.AsyncOpenAI:
+    global _async_client
+    if _async_client is None:
+        _async_client = openai.AsyncOpenAI(
+            **_client_options(),
+            http_client=openai.DefaultAsyncHttpxClient(limits=_pool_limits()),
+        )
+    return _async_client
+
+
+async def close_llm_clients() -> None:
+    """Close the pooled clients and release their connections (app shutdown)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+
+
+# ──────────────────── calls ────────────────────
+
+def _admit(operation: str) -> None:
+    if not BREAKER.allow():
+        LLM_CIRCUIT_REJECTIONS.inc(operation=operation)
+        raise CircuitOpenError("LLM circuit breaker is open — failing fast")
+
+
+def _record_error(error: BaseException) -> None:
+    UPSTREAM_RESPONSES.inc(upstream="llm", status=upstream_error_status(error))
+    if _is_provider_failure(error):
+        BREAKER.record_failure()
+    else:
+        BREAKER.release()
+
+
+async def _attempt(operation: str, params: Dict[str, Any]) -> Any:
+    start = time.perf_counter()
+    response = await get_async_llm_client().chat.completions.create(**params)
+    _latency(operation).add(time.perf_counter() - start)
+    UPSTREAM_RESPONSES.inc(upstream="llm", status=200)
+    return response
+
+
+async def _hedged(operation: str, call: Callable[[], Awaitable[Any]]) -> Any:
+    """First answer of the call and, past the p95 delay, one identical backup call."""
+    delay = _hedge_delay(operation)
+    primary = asyncio.ensure_future(call())
+    if delay is None:
+        return await primary
+
+    pending = {primary}
+    backup: Optional[asyncio.Future] = None
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if not done:
+            backup = asyncio.ensure_future(call())
+            pending.add(backup)
+
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if backup is not None:
+                        LLM_HEDGED_REQUESTS.inc(operation=operation, winner="backup" if task is backup else "primary")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def complete_async(
+    operation: str,
+    timeout: float = LLM_TIMEOUT_SECONDS,
+    hedge: bool = True,
+    **params: Any,
+) -> Any:
+    """Chat completion with a deadline, optional hedging and the circuit breaker."""
+    _admit(operation)
+    # A half-open trial is a single probe of a provider that just failed — never duplicate it
+    hedge = hedge and BREAKER.state == CLOSED
+    params = {**params, "timeout": timeout}
+    try:
+        if hedge:
+            response = await asyncio.wait_for(_hedged(operation, lambda: _attempt(operation, params)), timeout)
+        else:
+            response = await asyncio.wait_for(_attempt(operation, params), timeout)
+    except asyncio.CancelledError:
+        BREAKER.release()
+        raise
+    except Exception as e:
+        _record_error(e)
+        raise
+    BREAKER.record_success()
+    return response
+
+
+async def stream_async(operation: str, timeout: float = LLM_TIMEOUT_SECONDS, **params: Any) -> Any:
+    """
+    Open a streaming chat completion (the caller iterates and closes it).
+
+    The deadline covers opening the stream and bounds each wait for the next
+    chunk; streams are never hedged.
+    """
+    _admit(operation)
+    try:
+        stream = await asyncio.wait_for(
+            get_async_llm_client().chat.completions.create(stream=True, timeout=timeout, **params),
+            timeout,
+        )
+    except asyncio.CancelledError:
+        BREAKER.release()
+        raise
+    except Exception as e:
+        _record_error(e)
+        raise
+    UPSTREAM_RESPONSES.inc(upstream="llm", status=200)
+    BREAKER.record_success()
+    return stream
+
+
+# ──────────────────── monitoring ────────────────────
+
+def gateway_state() -> Dict[str, Any]:
+    """Breaker state, hedging settings and per-operation latency for /health and monitoring."""
+    latency = {}
+    for operation, window in sorted(_LATENCIES.items()):
+        p50, p95 = window.percentile(0.5), window.percentile(0.95)
+        latency[operation] = {
+            "samples": len(window),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+    return {
+        "circuit": BREAKER.snapshot(),
+        "hedging_enabled": LLM_HEDGE_ENABLED,
+        "latency": latency,
+    }
+
+
+def _collect_breaker() -> List[str]:
+    state = BREAKER.snapshot()
+    lines = [
+        "# HELP drug_api_llm_circuit_state LLM circuit breaker state (0 closed, 1 half-open, 2 open).",
+        "# TYPE drug_api_llm_circuit_state gauge",
+        f"drug_api_llm_circuit_state {[CLOSED, HALF_OPEN, OPEN].index(state['state'])}",
+        "# HELP drug_api_llm_circuit_opened_total Times the LLM circuit breaker opened.",
+        "# TYPE drug_api_llm_circuit_opened_total counter",
+        f"drug_api_llm_circuit_opened_total {state['times_opened']}",
+    ]
+    return lines
+
+
+register_collector(_collect_breaker)
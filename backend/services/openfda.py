@@ -2,15 +2,49 @@
 OpenFDA API client — drug data fetching, caching, and prefetching.
 """
 
+import asyncio
+import re
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import httpx
 
-from backend.config import OPENFDA_BASE_URL
-
-# In-memory cache  —  key: drug_name (lowercase), value: {"openfda_data": {…}, "timestamp": …}
-FDA_DATA_CACHE: Dict[str, Dict[str, Any]] = {}
+from backend.config import (
+    FDA_CACHE_MAX_ENTRIES,
+    FDA_CACHE_TTL_SECONDS,
+    FDA_ERROR_CACHE_TTL_SECONDS,
+    FDA_NEGATIVE_CACHE_TTL_SECONDS,
+    OPENFDA_BASE_URL,
+    OPENFDA_BATCH_LIMIT,
+    OPENFDA_BATCH_SIZE,
+    OPENFDA_OFFLINE,
+    OPENFDA_MAX_CONCURRENCY,
+    OPENFDA_MAX_CONNECTIONS,
+    OPENFDA_TIMEOUT_SECONDS,
+)
+
+from backend.metrics import STAGE_SECONDS, UPSTREAM_RESPONSES, upstream_error_status
+from backend.services.cache import SingleFlight, TTLCache
+from backend.services.drug_names import get_drug_name_resolver, resolve_drug_name
+from backend.services.label_index import get_label_index
+from backend.services.label_store import get_label_store
+
+# In-memory label cache  —  key: normalized search name, value: label entry (see _entry_from_response)
+FDA_DATA_CACHE = TTLCache(
+    max_entries=FDA_CACHE_MAX_ENTRIES,
+    ttl_seconds=FDA_CACHE_TTL_SECONDS,
+    name="openfda_labels",
+)
+
+# Short-lived cache of misses — not-found names and 429/5xx/transport failures
+FDA_NEGATIVE_CACHE = TTLCache(
+    max_entries=FDA_CACHE_MAX_ENTRIES,
+    ttl_seconds=FDA_NEGATIVE_CACHE_TTL_SECONDS,
+    name="openfda_negative",
+)
+
+# Concurrent lookups of the same name share one upstream request
+_INFLIGHT = SingleFlight(name="openfda_lookups")
 
 
 # ──────────────────── helpers ────────────────────
@@ -25,167 +59,490 @@ def limit_text_length(text: Any, max_len: int = 1500) -> Any:
     return text
 
 
-# Turkish → US drug-name mapping (common equivalents)
-_NAME_MAP = {
-    "paracetamol": "acetaminophen",
-    "asetaminofen": "acetaminophen",
-    "adrenalin": "epinephrine",
-    "kloramfenikol": "chloramphenicol",
-}
+# ──────────────────── HTTP clients ────────────────────
 
+# Long-lived connection pools — one TCP+TLS handshake per connection instead of per drug.
+_async_client: Optional[httpx.AsyncClient] = None
 
-# ──────────────────── core API ────────────────────
 
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=OPENFDA_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENFDA_MAX_CONNECTIONS,
+    )
+
+
+def init_openfda_client() -> httpx.AsyncClient:
+    """Create the shared async OpenFDA client (owned by the app lifespan)."""
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(timeout=OPENFDA_TIMEOUT_SECONDS, limits=_pool_limits())
+    return _async_client
+
+
+async def close_openfda_client():
+    """Close the shared async OpenFDA client and release its connections."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def get_openfda_client() -> httpx.AsyncClient:
+    """Return the shared async client, creating it lazily if the lifespan did not."""
+    return _async_client or init_openfda_client()
+
+
+# ──────────────────── response parsing ────────────────────
+
+# Label sections kept in the cache; minimal/full filtering happens on read.
+_LABEL_SECTIONS = (
+    "drug_interactions",
+    "contraindications",
+    "boxed_warning",
+    "warnings_and_precautions",
+    "dosage_and_administration",
+    "geriatric_use",
+    "pregnancy",
+    "nursing_mothers",
+    "adverse_reactions",
+    "laboratory_tests",
+)
+
+# Longest per-section limit used by either mode (minimal drug_interactions)
+_CACHED_SECTION_MAX_LEN = 2000
 
-def search_openfda_by_drug(drug_name: str, minimal: bool = False) -> Dict[str, Any]:
-    """
-    Query the OpenFDA API for a single drug.
 
-    Args:
-        drug_name: Drug name (generic).
-        minimal: If True, return only drug_interactions (for current medications).
+_QUERY_UNSAFE = re.compile(r'["\\]')
 
-    Returns:
-        Filtered drug information dict.
+
+def _phrase(search_name: str) -> str:
+    """Quoted search phrase; quotes and backslashes in a typed name would break the query syntax."""
+    return '"' + _QUERY_UNSAFE.sub("", search_name) + '"'
+
+
+def _search_params(search_name: str) -> Dict[str, Any]:
+    return {"search": f"openfda.generic_name:{_phrase(search_name)}", "limit": 1}
+
+
+def _batch_params(search_names: List[str]) -> Dict[str, Any]:
+    # Space-separated terms are OR-ed; URL-encoded this is ("a"+"b"+…)
+    terms = " ".join(_phrase(name) for name in search_names)
+    return {"search": f"openfda.generic_name:({terms})", "limit": OPENFDA_BATCH_LIMIT}
+
+
+def _normalize(drug_name: str) -> str:
+    return drug_name.lower().strip()
+
+
+def trim_label(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the label fields we use, pre-truncated so cache entries stay small."""
+    trimmed = {
+        "openfda": {
+            "generic_name": result.get("openfda", {}).get("generic_name", []),
+            "brand_name": result.get("openfda", {}).get("brand_name", []),
+            "pharm_class_epc": result.get("openfda", {}).get("pharm_class_epc", []),
+        },
+        "effective_time": result.get("effective_time", "20240101"),
+        "set_id": result.get("set_id"),
+        "version": result.get("version"),
+    }
+    for section in _LABEL_SECTIONS:
+        if section in result:
+            trimmed[section] = limit_text_length(result[section], _CACHED_SECTION_MAX_LEN)
+    return trimmed
+
+
+def _filter_label(
+    result: Dict[str, Any],
+    drug_name: str,
+    search_name: str,
+    minimal: bool,
+    meta_last_updated: Optional[str],
+) -> Dict[str, Any]:
+    """Reduce an OpenFDA label to the fields the evaluator uses."""
+    if minimal:
+        return {
+            "drug_name": drug_name,
+            "search_name": search_name,
+            "generic_names": result.get("openfda", {}).get("generic_name", []),
+            "brand_names": result.get("openfda", {}).get("brand_name", []),
+            "pharm_classes": result.get("openfda", {}).get("pharm_class_epc", []),
+            "drug_interactions": limit_text_length(result.get("drug_interactions", []), 2000),
+            "contraindications": [],
+            "boxed_warning": [],
+            "warnings_and_precautions": [],
+            "dosage_and_administration": [],
+            "geriatric_use": [],
+            "pregnancy": [],
+            "nursing_mothers": [],
+            "adverse_reactions": [],
+            "laboratory_tests": [],
+            "effective_time": result.get("effective_time", "20240101"),
+            "meta_last_updated": meta_last_updated,
+        }
+
+    return {
+        "drug_name": drug_name,
+        "search_name": search_name,
+        "generic_names": result.get("openfda", {}).get("generic_name", []),
+        "brand_names": result.get("openfda", {}).get("brand_name", []),
+        "pharm_classes": result.get("openfda", {}).get("pharm_class_epc", []),
+        "drug_interactions": limit_text_length(result.get("drug_interactions", [])),
+        "contraindications": limit_text_length(result.get("contraindications", [])),
+        "boxed_warning": limit_text_length(result.get("boxed_warning", [])),
+        "warnings_and_precautions": limit_text_length(result.get("warnings_and_precautions", [])),
+        "dosage_and_administration": limit_text_length(result.get("dosage_and_administration", [])),
+        "geriatric_use": limit_text_length(result.get("geriatric_use", [])),
+        "pregnancy": limit_text_length(result.get("pregnancy", [])),
+        "nursing_mothers": limit_text_length(result.get("nursing_mothers", [])),
+        "adverse_reactions": limit_text_length(result.get("adverse_reactions", [])),
+        "laboratory_tests": limit_text_length(result.get("laboratory_tests", [])),
+        "effective_time": result.get("effective_time", "20240101"),
+        "meta_last_updated": meta_last_updated,
+    }
+
+
+_NOT_FOUND_ENTRY: Dict[str, Any] = {"found": False, "message": "OpenFDA'da bulunamadı"}
+_ERROR_ENTRY: Dict[str, Any] = {"found": False, "error": "İlaç verileri alınırken bir hata oluştu."}
+
+
+def _entry_from_response(response: httpx.Response) -> Dict[str, Any]:
+    """Turn an OpenFDA HTTP response into a cacheable label entry."""
+    # OpenFDA answers a search with no matches with 404 NOT_FOUND
+    if response.status_code == 404:
+        return dict(_NOT_FOUND_ENTRY)
+    if response.status_code != 200:
+        return {"found": False, "error": f"API error: {response.status_code}", "status_code": response.status_code}
+
+    data = response.json()
+    meta_last_updated = data.get("meta", {}).get("last_updated")
+
+    if "results" not in data or not data["results"]:
+        return dict(_NOT_FOUND_ENTRY)
+
+    return {"found": True, "label": trim_label(data["results"][0]), "meta_last_updated": meta_last_updated}
+
+
+def _split_batch(data: Dict[str, Any], name_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Assign each requested name the first label whose generic name equals it,
+    else the first one that contains it as a phrase (e.g. "warfarin sodium").
+    Names without a match are left out for the per-drug fallback.
     """
+    meta_last_updated = data.get("meta", {}).get("last_updated")
+    patterns = {key: re.compile(rf"\b{re.escape(key)}\b") for key in name_keys}
+    exact: Dict[str, Dict[str, Any]] = {}
+    partial: Dict[str, Dict[str, Any]] = {}
+
+    for result in data.get("results", []):
+        generics = [g.lower().strip() for g in result.get("openfda", {}).get("generic_name", [])]
+        for key, pattern in patterns.items():
+            if key in generics:
+                exact.setdefault(key, result)
+            elif any(pattern.search(g) for g in generics):
+                partial.setdefault(key, result)
+
+    matched = {**partial, **exact}
+    return {
+        key: {"found": True, "label": trim_label(result), "meta_last_updated": meta_last_updated}
+        for key, result in matched.items()
+    }
+
+
+def _result_from_entry(entry: Dict[str, Any], drug_name: str, search_name: str, minimal: bool) -> Dict[str, Any]:
+    """Build the per-drug result dict the pipeline consumes from a label entry."""
+    if not entry.get("found"):
+        result = {"found": False, "drug_name": drug_name}
+        result.update({k: entry[k] for k in ("error", "message") if k in entry})
+        return result
+
+    filtered = _filter_label(entry["label"], drug_name, search_name, minimal, entry.get("meta_last_updated"))
+    return {"found": True, "data": filtered}
+
+
+async def _fetch_entry_async(search_name: str) -> Dict[str, Any]:
     try:
-        search_name = _NAME_MAP.get(drug_name.lower(), drug_name)
-        params = {"search": f'openfda.generic_name:"{search_name}"', "limit": 1}
-
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(OPENFDA_BASE_URL, params=params)
-
-            if response.status_code != 200:
-                return {"found": False, "drug_name": drug_name, "error": f"API error: {response.status_code}"}
-
-            data = response.json()
-            meta_last_updated = data.get("meta", {}).get("last_updated")
-
-            if "results" not in data or not data["results"]:
-                return {"found": False, "drug_name": drug_name, "message": "OpenFDA'da bulunamadı"}
-
-            result = data["results"][0]
-
-            if minimal:
-                filtered = {
-                    "drug_name": drug_name,
-                    "search_name": search_name,
-                    "generic_names": result.get("openfda", {}).get("generic_name", []),
-                    "brand_names": result.get("openfda", {}).get("brand_name", []),
-                    "drug_interactions": limit_text_length(result.get("drug_interactions", []), 2000),
-                    "contraindications": [],
-                    "boxed_warning": [],
-                    "warnings_and_precautions": [],
-                    "dosage_and_administration": [],
-                    "geriatric_use": [],
-                    "pregnancy": [],
-                    "nursing_mothers": [],
-                    "adverse_reactions": [],
-                    "laboratory_tests": [],
-                    "effective_time": result.get("effective_time", "20240101"),
-                    "meta_last_updated": meta_last_updated,
-                }
-            else:
-                filtered = {
-                    "drug_name": drug_name,
-                    "search_name": search_name,
-                    "generic_names": result.get("openfda", {}).get("generic_name", []),
-                    "brand_names": result.get("openfda", {}).get("brand_name", []),
-                    "drug_interactions": limit_text_length(result.get("drug_interactions", [])),
-                    "contraindications": limit_text_length(result.get("contraindications", [])),
-                    "boxed_warning": limit_text_length(result.get("boxed_warning", [])),
-                    "warnings_and_precautions": limit_text_length(result.get("warnings_and_precautions", [])),
-                    "dosage_and_administration": limit_text_length(result.get("dosage_and_administration", [])),
-                    "geriatric_use": limit_text_length(result.get("geriatric_use", [])),
-                    "pregnancy": limit_text_length(result.get("pregnancy", [])),
-                    "nursing_mothers": limit_text_length(result.get("nursing_mothers", [])),
-                    "adverse_reactions": limit_text_length(result.get("adverse_reactions", [])),
-                    "laboratory_tests": limit_text_length(result.get("laboratory_tests", [])),
-                    "effective_time": result.get("effective_time", "20240101"),
-                    "meta_last_updated": meta_last_updated,
-                }
-
-            return {"found": True, "data": filtered}
+        response = await get_openfda_client().get(OPENFDA_BASE_URL, params=_search_params(search_name))
+        UPSTREAM_RESPONSES.inc(upstream="openfda", status=response.status_code)
+        return _entry_from_response(response)
+    except Exception as e:
+        UPSTREAM_RESPONSES.inc(upstream="openfda", status=upstream_error_status(e))
+        print(f"OpenFDA query error for {search_name}: {e}")
+        return dict(_ERROR_ENTRY)
+
 
+async def _fetch_batch_async(search_names: List[str], semaphore: asyncio.Semaphore) -> Dict[str, Dict[str, Any]]:
+    """
+    One OR-ed OpenFDA query for several names, split back out per name.
+    Unmatched names fall back to single lookups; every entry is cached.
+    """
+    keys = [_normalize(name) for name in search_names]
+    try:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await get_openfda_client().get(OPENFDA_BASE_URL, params=_batch_params(search_names))
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - start, stage="openfda_fetch")
+        UPSTREAM_RESPONSES.inc(upstream="openfda", status=response.status_code)
+        if response.status_code == 200:
+            entries = _split_batch(response.json(), keys)
+        elif response.status_code == 404 or response.status_code == 429 or response.status_code >= 500:
+            # 404 means none of the names matched; 429/5xx apply to all of them
+            entry = _entry_from_response(response)
+            entries = {key: dict(entry) for key in keys}
+        else:
+            # A rejected query (400) may be down to one name; look each one up on its own
+            entries = {}
     except Exception as e:
-        print(f"OpenFDA query error for {drug_name}: {e}")
-        return {"found": False, "drug_name": drug_name, "error": "İlaç verileri alınırken bir hata oluştu."}
+        UPSTREAM_RESPONSES.inc(upstream="openfda", status=upstream_error_status(e))
+        print(f"OpenFDA batch query error for {search_names}: {e}")
+        entries = {key: dict(_ERROR_ENTRY) for key in keys}
 
+    missing = [name for name, key in zip(search_names, keys) if key not in entries]
+    if missing:
+        print(f"  ↩️ Batch fallback to single lookups: {missing}")
 
-# ──────────────────── prefetch / cache ────────────────────
+        async def single(name: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await _fetch_entry_async(name)
 
+        for name, entry in zip(missing, await asyncio.gather(*(single(name) for name in missing))):
+            entries[_normalize(name)] = entry
 
-def prefetch_fda_data(drug_names: List[str]) -> Dict[str, Any]:
-    """Pre-fetch FDA data for a list of drugs and cache the results."""
-    cached_count = 0
-    new_fetches = 0
-    results = {}
+    def cache_all():
+        for key, entry in entries.items():
+            _cache_entry(key, entry)
+
+    await asyncio.to_thread(cache_all)
+    return entries
+
+
+def _has_disk_layers() -> bool:
+    return get_label_index() is not None or get_label_store() is not None
+
+
+def _disk_entry(search_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Read through the offline snapshot, the persistent store, then the negative
+    cache. Label hits are promoted into memory. Blocking (SQLite) — call it
+    off the event loop.
+    """
+    name_key = _normalize(search_name)
+    index = get_label_index()
+    entry = index.get(name_key) if index else None
+    if entry is None:
+        store = get_label_store()
+        entry = store.get(name_key) if store else None
+    if entry is None and OPENFDA_OFFLINE:
+        return dict(_NOT_FOUND_ENTRY)
+
+    if entry is not None:
+        FDA_DATA_CACHE.set(name_key, entry)
+        return entry
+    return FDA_NEGATIVE_CACHE.get(name_key)
+
+
+def _negative_ttl(entry: Dict[str, Any]) -> Optional[float]:
+    """TTL for caching a miss, or None if it should not be cached."""
+    if "message" in entry:
+        return FDA_NEGATIVE_CACHE_TTL_SECONDS
+    status_code = entry.get("status_code")
+    if status_code is None or status_code == 429 or status_code >= 500:
+        return FDA_ERROR_CACHE_TTL_SECONDS
+    return None
+
+
+def _cache_entry(search_name: str, entry: Dict[str, Any]) -> None:
+    name_key = _normalize(search_name)
+    if entry.get("found"):
+        FDA_DATA_CACHE.set(name_key, entry)
+        store = get_label_store()
+        if store:
+            store.put(name_key, entry)
+        return
+
+    ttl = _negative_ttl(entry)
+    if ttl is not None:
+        FDA_NEGATIVE_CACHE.set(name_key, entry, ttl_seconds=ttl)
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Stats for the in-memory caches, request coalescing and the optional local stores."""
+    store = get_label_store()
+    index = get_label_index()
+    return {
+        "memory": FDA_DATA_CACHE.stats(),
+        "negative": FDA_NEGATIVE_CACHE.stats(),
+        "in_flight": _INFLIGHT.stats(),
+        "persistent": store.stats() if store else None,
+        "snapshot": index.stats() if index else None,
+    }
+
+
+# ──────────────────── core API ────────────────────
+
+
+async def _resolve_locally(drug_names: List[str]) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    Resolve each name, then try every local layer → [(search_name, entry or None)].
 
-    for drug_name in drug_names:
-        drug_key = drug_name.lower().strip()
+    Memory is checked on the event loop; names it misses go to the SQLite
+    layers in a single worker-thread call. A name the (authoritative)
+    resolver cannot place is answered as not-found without an upstream call.
+    """
+    resolutions = [resolve_drug_name(name) for name in drug_names]
+    search_names = [resolution["resolved"] for resolution in resolutions]
+    entries: List[Optional[Dict[str, Any]]] = [FDA_DATA_CACHE.get(_normalize(name)) for name in search_names]
+
+    missed = [i for i, entry in enumerate(entries) if entry is None]
+    if missed:
+        def read_disk() -> List[Optional[Dict[str, Any]]]:
+            return [_disk_entry(search_names[i]) for i in missed]
+
+        found = await asyncio.to_thread(read_disk) if _has_disk_layers() else read_disk()
+        for i, entry in zip(missed, found):
+            if entry is None and not get_drug_name_resolver().should_query_upstream(resolutions[i]):
+                entry = dict(_NOT_FOUND_ENTRY)
+            entries[i] = entry
+    return list(zip(search_names, entries))
+
+
+async def _lookup_many_async(
+    drug_names: List[str],
+    on_result: Optional[Callable[[int, Dict[str, Any], str, bool], None]] = None,
+) -> List[Tuple[Dict[str, Any], str, bool]]:
+    """
+    Look up several drugs at once: local layers first, then one OR-ed OpenFDA
+    query per OPENFDA_BATCH_SIZE uncached names. Names another request is
+    already fetching join that request instead of being re-queried.
 
-        if drug_key in FDA_DATA_CACHE:
-            cached_count += 1
-            results[drug_name] = {"status": "cached", "data": FDA_DATA_CACHE[drug_key]}
+    `on_result(index, entry, search_name, from_cache)` is called as each
+    lookup completes, before the whole set is done.
+    """
+    resolved = await _resolve_locally(drug_names)
+    batch_tasks: Dict[str, "asyncio.Task"] = {}
+    new_names: List[str] = []
+    waiting: Dict[str, "asyncio.Task"] = {}
+
+    # Register every uncached name before the next await so concurrent callers coalesce
+    for search_name, entry in resolved:
+        key = _normalize(search_name)
+        if entry is not None or key in waiting:
             continue
+        if key not in _INFLIGHT:
+            new_names.append(search_name)
 
-        openfda_result = search_openfda_by_drug(drug_name)
+        async def from_batch(key: str = key) -> Dict[str, Any]:
+            return (await batch_tasks[key])[key]
 
-        FDA_DATA_CACHE[drug_key] = {
-            "openfda_data": openfda_result,
-            "timestamp": time.time(),
-        }
+        waiting[key] = _INFLIGHT.start(key, from_batch)
+
+    semaphore = asyncio.Semaphore(OPENFDA_MAX_CONCURRENCY)
+    for i in range(0, len(new_names), OPENFDA_BATCH_SIZE):
+        chunk = new_names[i:i + OPENFDA_BATCH_SIZE]
+        task = asyncio.ensure_future(_fetch_batch_async(chunk, semaphore))
+        for name in chunk:
+            batch_tasks[_normalize(name)] = task
+
+    if new_names:
+        print(f"🌐 OpenFDA: {len(new_names)} uncached drugs in {len(set(batch_tasks.values()))} batched queries")
+
+    async def lookup(i: int, search_name: str, entry: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], str, bool]:
+        from_cache = entry is not None
+        if not from_cache:
+            entry = await asyncio.shield(waiting[_normalize(search_name)])
+        if on_result:
+            on_result(i, entry, search_name, from_cache)
+        return entry, search_name, from_cache
+
+    return list(await asyncio.gather(*(lookup(i, search_name, entry) for i, (search_name, entry) in enumerate(resolved))))
 
-        new_fetches += 1
-        results[drug_name] = {"status": "fetched", "found": openfda_result.get("found", False)}
 
-    return {"total": len(drug_names), "cached": cached_count, "new_fetches": new_fetches, "results": results}
+# ──────────────────── prefetch / cache ────────────────────
+
+
+async def prefetch_fda_data_async(drug_names: List[str]) -> Dict[str, Any]:
+    """Pre-fetch FDA data for a list of drugs and cache the results (uncached drugs in batched queries)."""
+    lookups = await _lookup_many_async([name.strip() for name in drug_names])
+
+    results = {}
+    for drug_name, (entry, _, from_cache) in zip(drug_names, lookups):
+        results[drug_name] = {"status": "cached" if from_cache else "fetched", "found": entry.get("found", False)}
+
+    cached_count = sum(1 for _, _, from_cache in lookups if from_cache)
+    return {
+        "total": len(drug_names),
+        "cached": cached_count,
+        "new_fetches": len(lookups) - cached_count,
+        "results": results,
+        "cache": cache_stats(),
+    }
 
 
 # ──────────────────── analysis query ────────────────────
 
 
-def analyze_drug_interactions_openfda(
+def _empty_analysis_results(
     age: int,
     gender: str,
     conditions: List[str],
     current_medications: List[str],
     new_medications: List[str],
 ) -> Dict[str, Any]:
-    """Collect OpenFDA data for all medications involved in the analysis."""
-    results: Dict[str, Any] = {
+    return {
         "patient_info": {"age": age, "gender": gender, "conditions": conditions, "is_elderly": age >= 65},
         "current_medications": current_medications,
         "new_medications": new_medications,
         "openfda_data": [],
     }
 
-    # Current medications — minimal mode (interactions only)
-    print("📋 Fetching current medications (minimal mode)...")
-    for drug_name in current_medications:
-        if not drug_name or not drug_name.strip():
-            continue
-        drug_key = drug_name.lower().strip()
-        if drug_key in FDA_DATA_CACHE:
-            print(f"  ✅ Using cached data for: {drug_name}")
-            drug_info = FDA_DATA_CACHE[drug_key]["openfda_data"]
-        else:
-            print(f"  🌐 Fetching from OpenFDA (minimal): {drug_name}")
-            drug_info = search_openfda_by_drug(drug_name.strip(), minimal=True)
-        results["openfda_data"].append(drug_info)
-
-    # New medications — full mode (all fields)
-    print("💊 Fetching new medications (full mode)...")
-    for drug_name in new_medications:
-        if not drug_name or not drug_name.strip():
-            continue
-        drug_key = drug_name.lower().strip()
-        if drug_key in FDA_DATA_CACHE:
-            print(f"  ✅ Using cached data for: {drug_name}")
-            drug_info = FDA_DATA_CACHE[drug_key]["openfda_data"]
-        else:
-            print(f"  🌐 Fetching from OpenFDA (full): {drug_name}")
-            drug_info = search_openfda_by_drug(drug_name.strip(), minimal=False)
-        results["openfda_data"].append(drug_info)
 
+async def analyze_drug_interactions_openfda_async(
+    age: int,
+    gender: str,
+    conditions: List[str],
+    current_medications: List[str],
+    new_medications: List[str],
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Collect OpenFDA data for all medications involved in the analysis.
+
+    Current (minimal) and new (full) medications are looked up together:
+    uncached names go out as batched OpenFDA queries (per-drug fallback capped
+    at OPENFDA_MAX_CONCURRENCY). Results list current medications first, then
+    new ones.
+
+    `on_progress` receives one event per drug as soon as its lookup finishes
+    (status "cached", "found" or "not_found").
+    """
+    results = _empty_analysis_results(age, gender, conditions, current_medications, new_medications)
+
+    wanted = [(name.strip(), True) for name in current_medications if name and name.strip()]
+    wanted += [(name.strip(), False) for name in new_medications if name and name.strip()]
+
+    def report(i: int, entry: Dict[str, Any], search_name: str, from_cache: bool) -> None:
+        drug_name, minimal = wanted[i]
+        found = entry.get("found", False)
+        event = {
+            "drug_name": drug_name,
+            "search_name": search_name,
+            "mode": "minimal" if minimal else "full",
+            "found": found,
+            "status": "cached" if from_cache else ("found" if found else "not_found"),
+        }
+        if "error" in entry:
+            event["error"] = entry["error"]
+        on_progress(event)
+
+    lookups = await _lookup_many_async([name for name, _ in wanted], on_result=report if on_progress else None)
+
+    for (drug_name, minimal), (entry, search_name, from_cache) in zip(wanted, lookups):
+        mode = "minimal" if minimal else "full"
+        print(f"  {'✅ Using cached data for' if from_cache else f'🌐 Fetched from OpenFDA ({mode})'}: {drug_name}")
+        results["openfda_data"].append(_result_from_entry(entry, drug_name, search_name, minimal))
+
+    print(f"📦 Label cache: {cache_stats()}")
     return results
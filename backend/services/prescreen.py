@@ -0,0 +1,270 @@
+"""
+Local interaction prescreen — one multi-pattern (Aho-Corasick) scan per label.
+
+Each label's interactions / contraindications / boxed warning text is searched
+for every other regimen drug's generic names, brand names and drug classes.
+The result is a pair-mention matrix with the matching snippets: an instant
+preliminary answer, a focus list for the LLM prompt, and the degraded answer
+served when the LLM is unavailable.
+"""
+
+import re
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from backend.services.prompt import iter_label_items
+
+# Sections scanned for mentions of other drugs, most severe first
+_SCANNED_SECTIONS = ("contraindications", "boxed_warning", "drug_interactions")
+_SEVERE_SECTIONS = {"contraindications", "boxed_warning"}
+
+# Class terms as they are written in US label text, for common regimen drugs.
+# Labels fetched with openfda.pharm_class_epc add their own classes on top.
+_DRUG_CLASSES: Dict[str, Tuple[str, ...]] = {
+    "warfarin": ("anticoagulant", "vitamin k antagonist", "coumarin"),
+    "heparin": ("anticoagulant",),
+    "enoxaparin": ("anticoagulant", "low molecular weight heparin"),
+    "apixaban": ("anticoagulant", "factor xa inhibitor"),
+    "rivaroxaban": ("anticoagulant", "factor xa inhibitor"),
+    "dabigatran": ("anticoagulant", "thrombin inhibitor"),
+    "aspirin": ("nsaid", "nonsteroidal anti-inflammatory", "salicylate", "antiplatelet"),
+    "ibuprofen": ("nsaid", "nonsteroidal anti-inflammatory"),
+    "naproxen": ("nsaid", "nonsteroidal anti-inflammatory"),
+    "diclofenac": ("nsaid", "nonsteroidal anti-inflammatory"),
+    "meloxicam": ("nsaid", "nonsteroidal anti-inflammatory"),
+    "celecoxib": ("nsaid", "nonsteroidal anti-inflammatory", "cox-2 inhibitor"),
+    "clopidogrel": ("antiplatelet", "p2y12"),
+    "ticagrelor": ("antiplatelet", "p2y12"),
+    "citalopram": ("ssri", "selective serotonin reuptake inhibitor", "serotonergic"),
+    "escitalopram": ("ssri", "selective serotonin reuptake inhibitor", "serotonergic"),
+    "sertraline": ("ssri", "selective serotonin reuptake inhibitor", "serotonergic"),
+    "fluoxetine": ("ssri", "selective serotonin reuptake inhibitor", "serotonergic"),
+    "paroxetine": ("ssri", "selective serotonin reuptake inhibitor", "serotonergic"),
+    "venlafaxine": ("snri", "serotonin and norepinephrine reuptake inhibitor", "serotonergic"),
+    "duloxetine": ("snri", "serotonin and norepinephrine reuptake inhibitor", "serotonergic"),
+    "amitriptyline": ("tricyclic antidepressant", "serotonergic"),
+    "tramadol": ("opioid", "serotonergic", "cns depressant"),
+    "morphine": ("opioid", "cns depressant"),
+    "oxycodone": ("opioid", "cns depressant"),
+    "codeine": ("opioid", "cns depressant"),
+    "diazepam": ("benzodiazepine", "cns depressant"),
+    "lorazepam": ("benzodiazepine", "cns depressant"),
+    "clonazepam": ("benzodiazepine", "cns depressant"),
+    "atorvastatin": ("statin", "hmg-coa reductase inhibitor"),
+    "simvastatin": ("statin", "hmg-coa reductase inhibitor"),
+    "pravastatin": ("statin", "hmg-coa reductase inhibitor"),
+    "rosuvastatin": ("statin", "hmg-coa reductase inhibitor"),
+    "lisinopril": ("ace inhibitor", "angiotensin converting enzyme inhibitor"),
+    "enalapril": ("ace inhibitor", "angiotensin converting enzyme inhibitor"),
+    "ramipril": ("ace inhibitor", "angiotensin converting enzyme inhibitor"),
+    "losartan": ("angiotensin receptor blocker", "angiotensin ii receptor"),
+    "valsartan": ("angiotensin receptor blocker", "angiotensin ii receptor"),
+    "metoprolol": ("beta blocker", "beta-blocker", "beta-adrenergic blocking"),
+    "atenolol": ("beta blocker", "beta-blocker", "beta-adrenergic blocking"),
+    "bisoprolol": ("beta blocker", "beta-blocker", "beta-adrenergic blocking"),
+    "carvedilol": ("beta blocker", "beta-blocker", "beta-adrenergic blocking"),
+    "amlodipine": ("calcium channel blocker",),
+    "nifedipine": ("calcium channel blocker",),
+    "diltiazem": ("calcium channel blocker",),
+    "hydrochlorothiazide": ("thiazide", "diuretic"),
+    "indapamide": ("thiazide", "diuretic"),
+    "furosemide": ("loop diuretic", "diuretic"),
+    "torsemide": ("loop diuretic", "diuretic"),
+    "metformin": ("antidiabetic", "biguanide"),
+    "glipizide": ("antidiabetic", "sulfonylurea", "insulin secretagogue"),
+    "gliclazide": ("antidiabetic", "sulfonylurea", "insulin secretagogue"),
+    "insulin glargine": ("antidiabetic", "insulin"),
+    "sitagliptin": ("antidiabetic", "dpp-4 inhibitor"),
+    "empagliflozin": ("antidiabetic", "sglt2 inhibitor"),
+    "dapagliflozin": ("antidiabetic", "sglt2 inhibitor"),
+    "ketoconazole": ("azole antifungal", "strong cyp3a4 inhibitor"),
+    "itraconazole": ("azole antifungal", "strong cyp3a4 inhibitor"),
+    "clarithromycin": ("macrolide", "strong cyp3a4 inhibitor"),
+    "erythromycin": ("macrolide", "cyp3a4 inhibitor"),
+    "rifampin": ("strong cyp3a4 inducer",),
+    "sildenafil": ("pde5 inhibitor", "phosphodiesterase"),
+    "tadalafil": ("pde5 inhibitor", "phosphodiesterase"),
+    "nitroglycerin": ("nitrate",),
+    "omeprazole": ("proton pump inhibitor",),
+    "pantoprazole": ("proton pump inhibitor",),
+}
+
+_EPC_SUFFIX = re.compile(r"\s*\[epc\]\s*$")
+
+# Terms shorter than this match too much unrelated text
+_MIN_TERM_LEN = 3
+
+_SNIPPET_RADIUS = 100
+_MAX_SNIPPETS_PER_PAIR = 3
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher — one linear pass over the text for all patterns."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        for pattern in patterns:
+            self._add(pattern)
+        self._link()
+
+    def _add(self, pattern: str) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(pattern)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def search(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, pattern) for every occurrence, overlaps included."""
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for pattern in self._out[state]:
+                yield i + 1 - len(pattern), i + 1, pattern
+
+
+def _is_word_match(text: str, start: int, end: int) -> bool:
+    """Whole-word match, allowing a plural "s" ("NSAIDs", "anticoagulants")."""
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    if end < len(text) and text[end] == "s":
+        end += 1
+    return end >= len(text) or not text[end].isalnum()
+
+
+def _snippet(text: str, start: int, end: int) -> str:
+    left = max(0, start - _SNIPPET_RADIUS)
+    right = min(len(text), end + _SNIPPET_RADIUS)
+    if left > 0:
+        left = text.find(" ", left, start) + 1 or left
+    if right < len(text):
+        cut = text.rfind(" ", end, right)
+        right = cut if cut > 0 else right
+    return ("…" if left > 0 else "") + text[left:right].strip() + ("…" if right < len(text) else "")
+
+
+def _section_text(value: Any) -> str:
+    parts = value if isinstance(value, list) else [value]
+    return " ".join(part for part in parts if isinstance(part, str))
+
+
+def _drug_terms(item: Dict[str, Any]) -> Tuple[str, Dict[str, str]]:
+    """(display name, {term: kind}) for one regimen drug."""
+    data = item.get("data", {}) if item.get("found") else {}
+    name = data.get("drug_name") or item.get("drug_name") or ""
+    terms: Dict[str, str] = {}
+
+    def add(term: str, kind: str) -> None:
+        term = term.lower().strip()
+        if len(term) >= _MIN_TERM_LEN and term not in terms:
+            terms[term] = kind
+
+    generics = [name, data.get("search_name") or ""] + list(data.get("generic_names", []))
+    for generic in generics:
+        add(generic, "generic")
+    for brand in data.get("brand_names", []):
+        add(brand, "brand")
+    for pharm_class in data.get("pharm_classes", []):
+        add(_EPC_SUFFIX.sub("", pharm_class.lower()), "class")
+    for generic in generics:
+        for drug_class in _DRUG_CLASSES.get(generic.lower().strip(), ()):
+            add(drug_class, "class")
+    return name, terms
+
+
+def prescreen_interactions(openfda_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Scan every found label for mentions of the other regimen drugs.
+
+    Returns:
+        {"pairs": [...], "scanned_labels": n, "unscanned": [...], "processing_time_ms": ...}
+        where each pair is {"drugs", "sections", "severity_hint", "involves_new", "mentions"}.
+    """
+    start = time.perf_counter()
+    drugs: List[Tuple[str, str, Dict[str, Any], Dict[str, str]]] = []  # (name, role, item, terms)
+    for role, item in iter_label_items(openfda_data):
+        name, terms = _drug_terms(item)
+        drugs.append((name, role, item, terms))
+
+    # term → drugs it identifies (class terms are shared by several)
+    owners: Dict[str, Set[int]] = {}
+    for j, (_, _, _, terms) in enumerate(drugs):
+        for term in terms:
+            owners.setdefault(term, set()).add(j)
+    matcher = AhoCorasick(owners)
+
+    pairs: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    unscanned: List[str] = []
+    scanned = 0
+    for i, (name, role, item, own_terms) in enumerate(drugs):
+        if not item.get("found"):
+            unscanned.append(name)
+            continue
+        scanned += 1
+        data = item["data"]
+        for section in _SCANNED_SECTIONS:
+            text = _section_text(data.get(section))
+            lowered = text.lower()
+            for begin, end, term in matcher.search(lowered):
+                # A label naming its own drug is not an interaction
+                if own_terms.get(term) in ("generic", "brand") or not _is_word_match(lowered, begin, end):
+                    continue
+                for j in owners[term] - {i}:
+                    if drugs[j][0].lower() == name.lower():
+                        continue
+                    pair = pairs.setdefault((min(i, j), max(i, j)), {
+                        "drugs": [drugs[min(i, j)][0], drugs[max(i, j)][0]],
+                        "sections": [],
+                        "severity_hint": "interaction",
+                        "involves_new": "new" in (drugs[i][1], drugs[j][1]),
+                        "mentions": [],
+                    })
+                    if section not in pair["sections"]:
+                        pair["sections"].append(section)
+                    if section in _SEVERE_SECTIONS:
+                        pair["severity_hint"] = "contraindicated"
+                    if len(pair["mentions"]) < _MAX_SNIPPETS_PER_PAIR and not any(
+                        m["source"] == name and m["section"] == section and m["term"] == term
+                        for m in pair["mentions"]
+                    ):
+                        pair["mentions"].append({
+                            "source": name,
+                            "section": section,
+                            "term": term,
+                            "kind": drugs[j][3][term],
+                            "snippet": _snippet(text, begin, end),
+                        })
+
+    ordered = sorted(
+        pairs.values(),
+        key=lambda p: (p["severity_hint"] != "contraindicated", not p["involves_new"], p["drugs"]),
+    )
+    return {
+        "pairs": ordered,
+        "scanned_labels": scanned,
+        "unscanned": unscanned,
+        "processing_time_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
@@ -0,0 +1,210 @@
+"""
+Token-budgeted prompt payload for the clinical evaluation call.
+
+Replaces the pretty-printed `openfda_data` dump with compact JSON: empty fields
+are dropped, label boilerplate repeated across labels is sent once, and the
+label text shares one token budget by clinical priority — the new drugs'
+interactions and contraindications first, adverse reactions last.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from backend.config import LLM_PROMPT_TOKEN_BUDGET
+
+# Label sections in budget order: (priority tier, role, section).
+# Lower tiers are filled first; sections within a tier share what is left.
+_SECTION_PRIORITY: List[Tuple[int, str, str]] = [
+    (0, "new", "drug_interactions"),
+    (0, "new", "contraindications"),
+    (0, "new", "boxed_warning"),
+    (1, "current", "drug_interactions"),
+    (2, "new", "warnings_and_precautions"),
+    (2, "new", "geriatric_use"),
+    (2, "new", "dosage_and_administration"),
+    (3, "new", "pregnancy"),
+    (3, "new", "nursing_mothers"),
+    (3, "new", "laboratory_tests"),
+    (4, "new", "adverse_reactions"),
+]
+
+# Interaction text of drugs the prescreen found no partner for ranks with adverse reactions
+_UNFLAGGED_TIER = 4
+
+# Numbered SPL headings ("7 DRUG INTERACTIONS", "5.1 Bleeding Risk") carry no content
+_HEADING_RE = re.compile(r"^\s*\d+(\.\d+)*\s+[A-Z][A-Z ,&/()-]*?(?=\s+(\d|[A-Z][a-z])|\s*$)")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Sentences shorter than this are too generic to be worth deduplicating
+_MIN_DEDUP_CHARS = 40
+
+_TRUNCATION_MARK = " …"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) — good enough for budgeting."""
+    return (len(text) + 3) // 4
+
+
+def iter_label_items(openfda_data: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (role, item) for each OpenFDA result, role being "current" or "new"."""
+    n_current = len([m for m in openfda_data.get("current_medications", []) if m and m.strip()])
+    for i, item in enumerate(openfda_data.get("openfda_data", [])):
+        yield ("current" if i < n_current else "new"), item
+
+
+def _clean_section(value: Any, seen: set) -> str:
+    """Join a label section into one string without headings or already-sent sentences."""
+    parts = value if isinstance(value, list) else [value]
+    sentences = []
+    for part in parts:
+        if not isinstance(part, str):
+            continue
+        text = _WHITESPACE_RE.sub(" ", _HEADING_RE.sub("", part)).strip()
+        for sentence in _SENTENCE_RE.split(text):
+            key = sentence.lower()
+            if len(sentence) >= _MIN_DEDUP_CHARS:
+                if key in seen:
+                    continue
+                seen.add(key)
+            sentences.append(sentence)
+    return " ".join(sentences)
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= len(_TRUNCATION_MARK):
+        return ""
+    cut = text[:max_chars - len(_TRUNCATION_MARK)]
+    # Prefer ending on a sentence, then on a word
+    boundary = cut.rfind(". ")
+    if boundary < len(cut) * 0.6:
+        boundary = cut.rfind(" ")
+    if boundary > 0:
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + _TRUNCATION_MARK
+
+
+def _allocate(lengths: List[int], budget_chars: int) -> List[int]:
+    """Split a character budget across sections: short ones whole, long ones an equal share."""
+    allocation = [0] * len(lengths)
+    remaining = budget_chars
+    pending = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    while pending:
+        share = remaining // len(pending)
+        i = pending.pop(0)
+        allocation[i] = min(lengths[i], share)
+        remaining -= allocation[i]
+    return allocation
+
+
+def _compact(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def _prescreen_pairs(prescreen: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flagged pairs with their evidence snippets, deduplicated, for the payload."""
+    pairs = []
+    for pair in prescreen.get("pairs", []):
+        evidence = list(dict.fromkeys(m["snippet"] for m in pair.get("mentions", [])))
+        pairs.append({"drugs": pair["drugs"], "sections": pair["sections"], "evidence": evidence})
+    return pairs
+
+
+def build_evaluation_payload(
+    openfda_data: Dict[str, Any],
+    token_budget: Optional[int] = None,
+    prescreen: Optional[Dict[str, Any]] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Serialize `openfda_data` for the evaluation prompt within `token_budget`.
+
+    With a `prescreen` result, the flagged pairs and their evidence go in
+    first, and interaction text of drugs in no flagged pair is demoted.
+
+    Returns:
+        (payload_json, stats) — stats carry the token estimate of the old
+        pretty-printed dump and of the compact payload, for the pipeline log.
+    """
+    budget = LLM_PROMPT_TOKEN_BUDGET if token_budget is None else token_budget
+    patient = openfda_data.get("patient_info", {})
+    flagged = None
+    if prescreen is not None:
+        flagged = {name.lower() for pair in prescreen.get("pairs", []) for name in pair["drugs"]}
+
+    labels: List[Dict[str, Any]] = []
+    raw_sections: List[Tuple[int, int, str, Any]] = []  # (tier, label index, section, label text)
+    for role, item in iter_label_items(openfda_data):
+        if not item.get("found"):
+            labels.append({"drug": item.get("drug_name"), "role": role, "found": False})
+            continue
+
+        data = item.get("data", {})
+        label = {"drug": data.get("drug_name"), "role": role}
+        if data.get("generic_names"):
+            label["generic"] = data["generic_names"]
+        if data.get("brand_names"):
+            label["brand"] = data["brand_names"][:3]
+        labels.append(label)
+
+        for tier, tier_role, section in _SECTION_PRIORITY:
+            if tier_role != role or not data.get(section):
+                continue
+            if section == "geriatric_use" and not patient.get("is_elderly"):
+                continue
+            if flagged is not None and section == "drug_interactions" and label["drug"].lower() not in flagged:
+                tier = _UNFLAGGED_TIER
+            raw_sections.append((tier, len(labels) - 1, section, data[section]))
+
+    # Clean in priority order so repeated boilerplate is kept where it matters most
+    sections: List[Tuple[int, int, str, str]] = []
+    seen: set = set()
+    for tier, label_index, section, value in sorted(raw_sections, key=lambda s: s[0]):
+        text = _clean_section(value, seen)
+        if text:
+            sections.append((tier, label_index, section, text))
+
+    payload = {
+        "patient": {k: v for k, v in patient.items() if v not in (None, "", [])},
+        "current_medications": [m for m in openfda_data.get("current_medications", []) if m],
+        "new_medications": [m for m in openfda_data.get("new_medications", []) if m],
+        "labels": labels,
+    }
+    if prescreen is not None:
+        payload["prescreen_pairs"] = _prescreen_pairs(prescreen)
+
+    # Budget left for label text once the fixed skeleton is paid for
+    remaining = None if budget <= 0 else budget * 4 - len(_compact(payload))
+    truncated = dropped = 0
+    for tier in sorted({s[0] for s in sections}):
+        in_tier = [s for s in sections if s[0] == tier]
+        if remaining is None:
+            allocation = [len(s[3]) for s in in_tier]
+        else:
+            # JSON quoting and the key cost a little on top of the text itself
+            overhead = [len(s[2]) + 6 for s in in_tier]
+            allocation = _allocate([len(s[3]) for s in in_tier], max(0, remaining - sum(overhead)))
+
+        for (_, label_index, section, text), max_chars in zip(in_tier, allocation):
+            text = _truncate(text, max_chars)
+            if not text:
+                dropped += 1
+                continue
+            truncated += text.endswith(_TRUNCATION_MARK)
+            labels[label_index][section] = text
+            if remaining is not None:
+                remaining -= len(text) + len(section) + 6
+
+    compact = _compact(payload)
+    stats = {
+        "token_budget": budget,
+        "tokens_before": estimate_tokens(json.dumps(openfda_data, indent=2, ensure_ascii=False)),
+        "tokens_after": estimate_tokens(compact),
+        "sections_included": len(sections) - dropped,
+        "sections_truncated": truncated,
+        "sections_dropped": dropped,
+    }
+    return compact, stats
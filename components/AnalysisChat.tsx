@@ -22,6 +22,8 @@ export default function AnalysisChat({ analysisResult, patient, medicines }: Ana
     const [inputValue, setInputValue] = useState('');
     const [isLoading, setIsLoading] = useState(false);
     const messagesEndRef = useRef<HTMLDivElement>(null);
+    // Server-side chat session: the context is sent on the first turn only
+    const sessionIdRef = useRef<string | null>(null);
 
     const scrollToBottom = () => {
         messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -31,6 +33,10 @@ export default function AnalysisChat({ analysisResult, patient, medicines }: Ana
         scrollToBottom();
     }, [messages]);
 
+    useEffect(() => {
+        sessionIdRef.current = null;
+    }, [analysisResult, patient]);
+
     const handleSendMessage = async () => {
         if (!inputValue.trim() || isLoading) return;
 
@@ -66,20 +72,30 @@ export default function AnalysisChat({ analysisResult, patient, medicines }: Ana
                 medications: medicines.map(m => m.name)
             } : {};
 
-            const response = await fetch('/api/chat', {
+            const sendChat = (sessionId: string | null) => fetch('/api/chat', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify({
-                    message: userMessage.content,
-                    context: simplifyAnalysis(analysisResult),
-                    patient_info: simplifyPatient(patient),
-                    history: messages.map(m => ({ role: m.role, content: m.content }))
-                }),
+                body: JSON.stringify(sessionId
+                    ? { message: userMessage.content, session_id: sessionId }
+                    : {
+                        message: userMessage.content,
+                        context: simplifyAnalysis(analysisResult),
+                        patient_info: simplifyPatient(patient),
+                        history: messages.map(m => ({ role: m.role, content: m.content }))
+                    }),
             });
 
+            let response = await sendChat(sessionIdRef.current);
+            if (response.status === 404 && sessionIdRef.current) {
+                // Session expired on the server: register the context again
+                sessionIdRef.current = null;
+                response = await sendChat(null);
+            }
+
             if (!response.ok) throw new Error('Network response was not ok');
+            sessionIdRef.current = response.headers.get('X-Chat-Session') || null;
 
             // Create a placeholder assistant message for streaming
             const botMessageId = (Date.now() + 1).toString();